@@ -4,73 +4,164 @@ Scrat-Backup Icon Builder
 Erstellt PNG- und ICO-Dateien aus dem SVG-Master-Icon
 
 Requirements:
-    pip install cairosvg pillow
+    pip install resvg-py pillow     (empfohlen, Rust-Renderer)
+    pip install cairosvg pillow     (Fallback)
 
 Usage:
     python build_icons.py
 """
 
+import io
+import os
+import struct
 import sys
 from pathlib import Path
-from typing import List
+from typing import List, Optional, Tuple
 
 try:
-    import cairosvg
     from PIL import Image
+
+    # resvg parst und rastert komplett nativ – deutlich schneller als cairosvg
+    try:
+        import resvg_py
+
+        Tree = PNGSurface = None
+    except ImportError:
+        resvg_py = None
+        from cairosvg.parser import Tree
+        from cairosvg.surface import PNGSurface
 except ImportError as e:
     print("❌ Fehlende Dependencies!")
     print()
     print("Bitte installieren:")
-    print("  pip install cairosvg pillow")
+    print("  pip install resvg-py pillow")
+    print("  (oder als Fallback: pip install cairosvg pillow)")
     print()
     print(f"Fehler: {e}")
     sys.exit(1)
 
 
-def svg_to_png(svg_path: Path, png_path: Path, size: int) -> None:
+_HERE = Path(__file__).resolve().parent
+
+
+def svg_to_png(svg_bytes: bytes, png_path: Path, size: int) -> bytes:
     """
     Konvertiert SVG zu PNG mit spezifischer Größe
 
     Args:
-        svg_path: Pfad zur SVG-Datei
+        svg_bytes: Inhalt der SVG-Datei
         png_path: Pfad zur Ziel-PNG-Datei
         size: Gewünschte Größe (Breite und Höhe)
+
+    Returns:
+        Die geschriebenen PNG-Bytes
     """
-    cairosvg.svg2png(
-        url=str(svg_path),
-        write_to=str(png_path),
-        output_width=size,
-        output_height=size
-    )
+    if resvg_py is not None:
+        png_bytes = bytes(
+            resvg_py.svg_to_bytes(
+                svg_string=svg_bytes.decode("utf-8"),
+                width=size,
+                height=size
+            )
+        )
+    else:
+        output = io.BytesIO()
+        surface = PNGSurface(
+            Tree(bytestring=svg_bytes),
+            output,
+            96,
+            output_width=size,
+            output_height=size
+        )
+        surface.finish()
+        png_bytes = output.getvalue()
+
+    png_path.write_bytes(png_bytes)
+    return png_bytes
 
 
-def create_ico(png_files: List[Path], ico_path: Path) -> None:
+def downscale_png(source: "Image.Image", png_path: Path, size: int) -> bytes:
     """
-    Erstellt .ico Datei aus mehreren PNG-Dateien
+    Erzeugt eine kleinere PNG-Größe aus dem großen Raster
 
     Args:
-        png_files: Liste von PNG-Dateien (verschiedene Größen)
+        source: Bereits gerendertes RGBA-Bild in voller Größe
+        png_path: Pfad zur Ziel-PNG-Datei
+        size: Gewünschte Größe (Breite und Höhe)
+
+    Returns:
+        Die geschriebenen PNG-Bytes
+    """
+    output = io.BytesIO()
+    source.resize((size, size), Image.LANCZOS).save(output, format="PNG", optimize=True)
+
+    png_bytes = output.getvalue()
+    png_path.write_bytes(png_bytes)
+    return png_bytes
+
+
+def create_ico(png_files: List[Tuple[int, Path]], ico_path: Path) -> None:
+    """
+    Erstellt .ico Datei mit eingebetteten PNG-Streams (Vista+ Format)
+
+    Die PNG-Bytes werden unverändert übernommen, statt sie wie Pillow
+    als unkomprimierte BMPs neu zu kodieren. Die Einträge werden einzeln
+    gelesen und geschrieben, das Verzeichnis am Ende nachgetragen –
+    es liegt also immer nur ein PNG-Stream im Speicher.
+
+    Args:
+        png_files: Liste von (Größe, PNG-Pfad)
         ico_path: Pfad zur Ziel-.ico-Datei
     """
-    images = []
-    for png_file in png_files:
-        if png_file.exists():
-            img = Image.open(png_file)
-            images.append(img)
-
-    if images:
-        images[0].save(
-            ico_path,
-            format='ICO',
-            sizes=[(img.width, img.height) for img in images],
-            append_images=images[1:]
-        )
+    if not png_files:
+        return
+
+    directory_size = 16 * len(png_files)
+    directory = []
+
+    with open(ico_path, "wb") as f:
+        # ICONDIR: reserved, type (1 = Icon), Anzahl – Verzeichnis folgt am Ende
+        f.write(struct.pack("<HHH", 0, 1, len(png_files)))
+        f.write(bytes(directory_size))
+        offset = 6 + directory_size
+
+        for size, png_file in png_files:
+            png_bytes = png_file.read_bytes()
+            f.write(png_bytes)
+
+            # ICONDIRENTRY: Breite/Höhe (0 = 256), Farben, reserved,
+            # Planes, Bit-Tiefe, Datengröße, Offset
+            dim = 0 if size >= 256 else size
+            directory.append(
+                struct.pack("<BBBBHHII", dim, dim, 0, 0, 1, 32, len(png_bytes), offset)
+            )
+            offset += len(png_bytes)
+            del png_bytes
+
+        f.seek(6)
+        f.write(b"".join(directory))
+
+
+def _size(path: Path) -> Optional[int]:
+    """Dateigröße per einzelnem stat()-Aufruf, None wenn nicht vorhanden"""
+    try:
+        return os.stat(path).st_size
+    except OSError:
+        return None
+
+
+def _mtime(path: Path) -> float:
+    """Änderungszeit per einzelnem stat()-Aufruf, 0 wenn nicht vorhanden"""
+    try:
+        return os.stat(path).st_mtime
+    except OSError:
+        return 0
 
 
 def main():
     """Hauptfunktion"""
     # Pfade
-    script_dir = Path(__file__).parent
+    script_dir = _HERE
     svg_file = script_dir / "scrat.svg"
 
     if not svg_file.exists():
@@ -90,29 +181,75 @@ def main():
     # PNG-Dateien erstellen
     print("Erstelle PNG-Dateien...")
     png_files = []
+    ico_entries = []  # (Größe, Pfad) – die Bytes liest create_ico() selbst
+
+    # Ausgaben, die jünger als das SVG sind, werden nicht neu erzeugt
+    svg_mtime = _mtime(svg_file)
+    rebuilt = False
+
+    # Nur die größte Variante wird aus dem SVG gerendert,
+    # alle kleineren entstehen per Lanczos-Downscaling daraus
+    render_size = max(sizes)
+    big_png = script_dir / f"scrat-{render_size}.png"
+    print(f"  ├─ {big_png.name} ({render_size}x{render_size})", end=" ")
 
-    for size in sizes:
+    big_bytes = None
+    if _mtime(big_png) >= svg_mtime:
+        print("(cached)")
+    else:
+        try:
+            big_bytes = svg_to_png(svg_file.read_bytes(), big_png, render_size)
+        except Exception as e:
+            print(f"❌ Fehler: {e}")
+            sys.exit(1)
+        rebuilt = True
+        print("✅")
+
+    png_files.append(big_png)
+    ico_entries.append((render_size, big_png))
+
+    big = None
+    for size in sorted((s for s in sizes if s != render_size), reverse=True):
         png_file = script_dir / f"scrat-{size}.png"
         print(f"  ├─ {png_file.name} ({size}x{size})", end=" ")
 
+        if _mtime(png_file) >= svg_mtime:
+            png_files.append(png_file)
+            ico_entries.append((size, png_file))
+            print("(cached)")
+            continue
+
         try:
-            svg_to_png(svg_file, png_file, size)
+            # Großes Raster erst dekodieren, wenn eine Größe neu entstehen muss
+            if big is None:
+                source = io.BytesIO(big_bytes) if big_bytes is not None else big_png
+                with Image.open(source) as img:
+                    big = img.convert("RGBA")
+
+            downscale_png(big, png_file, size)
             png_files.append(png_file)
+            ico_entries.append((size, png_file))
+            rebuilt = True
             print("✅")
         except Exception as e:
             print(f"❌ Fehler: {e}")
 
+    # Dekodiertes Raster wird ab hier nicht mehr gebraucht
+    del big
     print()
 
     # .ico Datei erstellen
     ico_file = script_dir / "scrat.ico"
     print(f"Erstelle Windows Icon: {ico_file.name}", end=" ")
 
-    try:
-        create_ico(png_files, ico_file)
-        print("✅")
-    except Exception as e:
-        print(f"❌ Fehler: {e}")
+    if not rebuilt and _mtime(ico_file) >= svg_mtime:
+        print("(cached)")
+    else:
+        try:
+            create_ico(ico_entries, ico_file)
+            print("✅")
+        except Exception as e:
+            print(f"❌ Fehler: {e}")
 
     print()
     print("=" * 60)
@@ -121,12 +258,10 @@ def main():
     print()
     print("Erstellte Dateien:")
     for png_file in png_files:
-        if png_file.exists():
-            size = png_file.stat().st_size
+        if (size := _size(png_file)) is not None:
             print(f"  ✅ {png_file.name:20s} ({size:,} Bytes)")
 
-    if ico_file.exists():
-        size = ico_file.stat().st_size
+    if (size := _size(ico_file)) is not None:
         print(f"  ✅ {ico_file.name:20s} ({size:,} Bytes)")
 
     print()
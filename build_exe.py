@@ -5,17 +5,61 @@ Automatisiert den Build-Prozess mit PyInstaller
 """
 
 import os
-import shutil
+import re
 import subprocess
 import sys
+import threading
+import zipfile
+from concurrent.futures import ThreadPoolExecutor
+from importlib.metadata import distributions
 from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+
+_HERE = Path(__file__).resolve().parent
+
+# Bereits komprimierte Formate werden im ZIP nur gespeichert (ZIP_STORED)
+_PRECOMPRESSED = {".png", ".ico", ".zip", ".7z", ".gz", ".dll", ".pyd"}
+
+
+def _scan_tree(root: Path) -> Tuple[List[str], List[str]]:
+    """
+    Listet einen Verzeichnisbaum per os.scandir auf
+
+    DirEntry.is_dir() nutzt die Typ-Info aus readdir, es fällt also kein
+    zusätzlicher stat()-Aufruf pro Eintrag an (anders als bei Path.rglob).
+
+    Args:
+        root: Wurzelverzeichnis
+
+    Returns:
+        (Dateien, Verzeichnisse) – Verzeichnisse in Fundreihenfolge,
+        Eltern also immer vor ihren Kindern
+    """
+    files: List[str] = []
+    dirs: List[str] = []
+    stack = [str(root)]
+    while stack:
+        with os.scandir(stack.pop()) as it:
+            for entry in it:
+                if entry.is_dir(follow_symlinks=False):
+                    dirs.append(entry.path)
+                    stack.append(entry.path)
+                else:
+                    files.append(entry.path)
+    return files, dirs
+
+
+def _walk_count(root: Path) -> int:
+    """Zählt alle Einträge (Dateien und Verzeichnisse) unterhalb von root"""
+    files, dirs = _scan_tree(root)
+    return len(files) + len(dirs)
 
 
 class BuildScript:
     """Build-Script für Scrat-Backup"""
 
     def __init__(self):
-        self.project_root = Path(__file__).parent
+        self.project_root = _HERE
         self.dist_dir = self.project_root / "dist"
         self.build_dir = self.project_root / "build"
         self.spec_file = self.project_root / "scrat_backup.spec"
@@ -27,6 +71,26 @@ class BuildScript:
         print(f"  {text}")
         print("=" * 60 + "\n")
 
+    def _remove_tree(self, directory: Path):
+        """
+        Löscht ein Verzeichnis mit parallelen unlink()-Aufrufen
+
+        PyInstaller erzeugt zehntausende kleine Dateien – das Löschen ist
+        durch Metadaten-Syscalls gebunden, die sich in Threads überlappen.
+
+        Args:
+            directory: Zu löschendes Verzeichnis
+        """
+        files, dirs = _scan_tree(directory)
+
+        with ThreadPoolExecutor(max_workers=16) as executor:
+            list(executor.map(os.unlink, files))
+
+        # Verzeichnisse von innen nach außen entfernen
+        for path in reversed(dirs):
+            os.rmdir(path)
+        directory.rmdir()
+
     def clean_build_dirs(self):
         """Löscht alte Build-Verzeichnisse"""
         self.print_header("Bereinige alte Build-Verzeichnisse")
@@ -34,7 +98,7 @@ class BuildScript:
         for directory in [self.dist_dir, self.build_dir]:
             if directory.exists():
                 print(f"Lösche: {directory}")
-                shutil.rmtree(directory)
+                self._remove_tree(directory)
             else:
                 print(f"Nicht vorhanden: {directory}")
 
@@ -59,25 +123,35 @@ class BuildScript:
             print(f"  Erwartet: {icon_ico} oder {icon_png}")
             return False
 
+    def _probe_packages(self, packages: List[str]) -> Dict[str, Optional[str]]:
+        """
+        Ermittelt installierte Versionen über die Paket-Metadaten
+
+        Die .dist-info-Verzeichnisse werden nur einmal durchlaufen; es wird
+        kein Paket importiert.
+
+        Args:
+            packages: Zu prüfende Distributionsnamen
+
+        Returns:
+            Dict {paket: version} – None wenn nicht installiert
+        """
+
+        def normalize(name: str) -> str:
+            return re.sub(r"[-_.]+", "-", name).lower()
+
+        installed = {}
+        for dist in distributions():
+            name = dist.metadata["Name"]
+            if name:
+                installed.setdefault(normalize(name), dist.version)
+
+        return {name: installed.get(normalize(name)) for name in packages}
+
     def check_dependencies(self):
         """Prüft ob alle Dependencies installiert sind"""
         self.print_header("Prüfe Dependencies")
 
-        try:
-            import PyInstaller
-            print(f"✓ PyInstaller: {PyInstaller.__version__}")
-        except ImportError:
-            print("✗ PyInstaller nicht gefunden!")
-            print("  Installiere mit: pip install pyinstaller")
-            return False
-
-        try:
-            import PySide6
-            print(f"✓ PySide6: {PySide6.__version__}")
-        except ImportError:
-            print("✗ PySide6 nicht gefunden!")
-            return False
-
         # Weitere wichtige Dependencies
         required = [
             'cryptography',
@@ -86,19 +160,38 @@ class BuildScript:
             'keyring',
         ]
 
+        versions = self._probe_packages(["PyInstaller", "PySide6", *required])
+
+        if versions.get("PyInstaller") is None:
+            print("✗ PyInstaller nicht gefunden!")
+            print("  Installiere mit: pip install pyinstaller")
+            return False
+        print(f"✓ PyInstaller: {versions['PyInstaller']}")
+
+        if versions.get("PySide6") is None:
+            print("✗ PySide6 nicht gefunden!")
+            return False
+        print(f"✓ PySide6: {versions['PySide6']}")
+
         all_ok = True
         for pkg in required:
-            try:
-                __import__(pkg)
+            if versions.get(pkg) is not None:
                 print(f"✓ {pkg}")
-            except ImportError:
+            else:
                 print(f"✗ {pkg} nicht gefunden!")
                 all_ok = False
 
         return all_ok
 
-    def run_pyinstaller(self):
-        """Führt PyInstaller aus"""
+    def run_pyinstaller(self, clean: bool = False):
+        """
+        Führt PyInstaller aus
+
+        Args:
+            clean: PyInstaller-Cache verwerfen (--clean). Ohne den Cache
+                analysiert PyInstaller alle Abhängigkeiten neu, was bei
+                wiederholten Builds sehr viel Zeit kostet.
+        """
         self.print_header("Baue Executable mit PyInstaller")
 
         if not self.spec_file.exists():
@@ -109,44 +202,73 @@ class BuildScript:
         print("Dies kann einige Minuten dauern...\n")
 
         # PyInstaller ausführen
+        # UPX ist in der Spec-Datei abgeschaltet (LoadLibrary-Fehler unter
+        # Windows) – daher auch keine nachträgliche UPX-Kompression hier.
+        # --noupx selbst ist zusammen mit einer .spec-Datei nicht erlaubt.
         cmd = [
             sys.executable,
             "-m",
             "PyInstaller",
             str(self.spec_file),
-            "--clean",
             "--noconfirm",
         ]
-
-        try:
-            result = subprocess.run(
-                cmd,
-                cwd=self.project_root,
-                check=True,
-                capture_output=False,
-            )
-
-            print("\n✓ Build erfolgreich abgeschlossen!")
-            return True
-
-        except subprocess.CalledProcessError as e:
-            print(f"\n✗ Build fehlgeschlagen mit Exit-Code: {e.returncode}")
+        if clean:
+            cmd.append("--clean")
+
+        # Ausgabe über eine Pipe lesen: Konsole und Log-Datei gleichzeitig,
+        # der Build-Prozess bleibt dabei ansprechbar (z.B. für CI-Wrapper)
+        self.build_dir.mkdir(parents=True, exist_ok=True)
+        log_file = self.build_dir / "pyinstaller.log"
+
+        process = subprocess.Popen(
+            cmd,
+            cwd=self.project_root,
+            stdout=subprocess.PIPE,
+            stderr=subprocess.STDOUT,
+            bufsize=1,
+            text=True,
+            encoding="utf-8",
+            errors="replace",
+        )
+
+        def drain_output():
+            with open(log_file, "w", encoding="utf-8") as log:
+                for line in process.stdout:
+                    sys.stdout.write(line)
+                    log.write(line)
+
+        reader = threading.Thread(target=drain_output, daemon=True)
+        reader.start()
+        returncode = process.wait()
+        reader.join()
+
+        if returncode != 0:
+            print(f"\n✗ Build fehlgeschlagen mit Exit-Code: {returncode}")
+            print(f"  Log: {log_file}")
             return False
 
+        print("\n✓ Build erfolgreich abgeschlossen!")
+        return True
+
     def show_results(self):
         """Zeigt Build-Ergebnisse an"""
         self.print_header("Build-Ergebnisse")
 
         exe_path = self.dist_dir / "ScratBackup" / "ScratBackup.exe"
 
-        if exe_path.exists():
-            size_mb = exe_path.stat().st_size / (1024 * 1024)
+        try:
+            exe_stat = os.stat(exe_path)
+        except OSError:
+            exe_stat = None
+
+        if exe_stat is not None:
+            size_mb = exe_stat.st_size / (1024 * 1024)
             print(f"✓ Executable erstellt: {exe_path}")
             print(f"  Größe: {size_mb:.2f} MB")
 
             # Zähle Dateien im dist-Ordner
             dist_folder = exe_path.parent
-            file_count = len(list(dist_folder.rglob("*")))
+            file_count = _walk_count(dist_folder)
             print(f"  Dateien im dist-Ordner: {file_count}")
 
             print("\nZum Testen:")
@@ -173,7 +295,22 @@ class BuildScript:
         print(f"Erstelle: {zip_path}.zip")
 
         try:
-            shutil.make_archive(str(zip_path), 'zip', dist_folder)
+            files, dirs = _scan_tree(dist_folder)
+            with zipfile.ZipFile(f"{zip_path}.zip", "w", allowZip64=True) as archive:
+                # Verzeichnis-Einträge wie bei shutil.make_archive (auch leere Ordner)
+                for directory in dirs:
+                    archive.write(directory, os.path.relpath(directory, dist_folder))
+                for path in files:
+                    if os.path.splitext(path)[1].lower() in _PRECOMPRESSED:
+                        compress_type = zipfile.ZIP_STORED
+                    else:
+                        compress_type = zipfile.ZIP_DEFLATED
+                    archive.write(
+                        path,
+                        os.path.relpath(path, dist_folder),
+                        compress_type=compress_type,
+                        compresslevel=1,
+                    )
             zip_size = (zip_path.parent / f"{zip_name}.zip").stat().st_size / (1024 * 1024)
             print(f"✓ ZIP erstellt: {zip_path}.zip ({zip_size:.2f} MB)")
             return True
@@ -181,7 +318,12 @@ class BuildScript:
             print(f"✗ Fehler beim Erstellen des ZIP: {e}")
             return False
 
-    def run(self, skip_clean: bool = False, create_zip: bool = True):
+    def run(
+        self,
+        skip_clean: bool = False,
+        create_zip: bool = True,
+        pyinstaller_clean: bool = False,
+    ):
         """Führt kompletten Build-Prozess aus"""
         print("""
 ╔══════════════════════════════════════════════════════════════╗
@@ -203,7 +345,7 @@ class BuildScript:
             return False
 
         # 4. PyInstaller ausführen
-        if not self.run_pyinstaller():
+        if not self.run_pyinstaller(clean=pyinstaller_clean):
             print("\n✗ Build abgebrochen: PyInstaller-Fehler")
             return False
 
@@ -235,10 +377,19 @@ if __name__ == "__main__":
         action="store_true",
         help="Erstelle kein ZIP-Archiv",
     )
+    parser.add_argument(
+        "--pyinstaller-clean",
+        action="store_true",
+        help="PyInstaller-Cache verwerfen (langsamer, vollständige Neu-Analyse)",
+    )
 
     args = parser.parse_args()
 
     builder = BuildScript()
-    success = builder.run(skip_clean=args.skip_clean, create_zip=not args.no_zip)
+    success = builder.run(
+        skip_clean=args.skip_clean,
+        create_zip=not args.no_zip,
+        pyinstaller_clean=args.pyinstaller_clean,
+    )
 
     sys.exit(0 if success else 1)
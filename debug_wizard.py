@@ -4,6 +4,7 @@ Debug-Script für Wizard-Problem
 Testet check_first_run() Logik
 """
 
+import json
 import logging
 import sys
 from pathlib import Path
@@ -33,22 +34,33 @@ def debug_check_first_run():
     print(f"\n1. Config-Verzeichnis: {config_dir}")
     print(f"   Existiert: {config_dir.exists()}")
 
+    # Ein stat() liefert Existenz und Größe
+    try:
+        config_size = config_file.stat().st_size
+    except FileNotFoundError:
+        config_size = None
+
     print(f"\n2. Config-Datei: {config_file}")
-    print(f"   Existiert: {config_file.exists()}")
+    print(f"   Existiert: {config_size is not None}")
 
-    if config_file.exists():
-        print(f"   Größe: {config_file.stat().st_size} Bytes")
+    if config_size is not None:
+        print(f"   Größe: {config_size} Bytes")
         print("\n3. Inhalt der config.json:")
+        data = None
         try:
-            with open(config_file, 'r') as f:
-                content = f.read()
-                print(f"   {content[:500]}")  # Erste 500 Zeichen
+            with open(config_file, 'rb') as f:
+                data = json.load(f)
+            print(f"   {json.dumps(data, ensure_ascii=False)[:500]}")  # Erste 500 Zeichen
         except Exception as e:
             print(f"   Fehler beim Lesen: {e}")
 
         print("\n4. Lade mit ConfigManager:")
         try:
-            config_manager = ConfigManager(config_file)
+            # Bereits geparste Daten wiederverwenden statt Datei erneut zu lesen
+            if data is not None:
+                config_manager = ConfigManager.from_dict(data, config_file)
+            else:
+                config_manager = ConfigManager(config_file)
             print(f"   ✓ ConfigManager geladen")
 
             print("\n5. Prüfe Quellen:")
@@ -8,14 +8,12 @@ import sys
 from pathlib import Path
 
 # Füge src/ zum Python-Path hinzu
-project_root = Path(__file__).parent
+project_root = Path(__file__).resolve().parent
 sys.path.insert(0, str(project_root / "src"))
 sys.path.insert(0, str(project_root))
 
 if __name__ == "__main__":
     import logging
-    from PySide6.QtWidgets import QApplication
-    from PySide6.QtCore import QTranslator, QLibraryInfo
 
     # Logging konfigurieren
     logging.basicConfig(
@@ -23,22 +21,20 @@ if __name__ == "__main__":
         format="%(asctime)s - %(name)s - %(levelname)s - %(message)s",
     )
 
-    # Theme Manager importieren
-    from gui.theme_manager import ThemeManager
-
-    # Wizard importieren
-    from gui.wizard_v2 import SetupWizardV2
-
-    # Version importieren
+    # Version importieren (reines Python, kein Qt)
     from src import __version__
 
-    from PySide6.QtGui import QIcon
+    # Qt erst laden, wenn die QApplication tatsächlich gebaut wird
+    from PySide6.QtWidgets import QApplication
 
     # QApplication erstellen
     app = QApplication(sys.argv)
     app.setApplicationName(f"Scrat-Backup Wizard v{__version__}")
     app.setOrganizationName("Scrat")
 
+    from PySide6.QtCore import QLibraryInfo, QTranslator
+    from PySide6.QtGui import QIcon
+
     # App-Icon setzen (wird von allen Fenstern geerbt)
     icon_path = project_root / "assets" / "icons" / "scrat.ico"
     if icon_path.exists():
@@ -54,17 +50,21 @@ if __name__ == "__main__":
         logging.warning("Deutsche Qt-Übersetzungen nicht gefunden")
 
     # Theme Manager initialisieren
+    from gui.theme_manager import ThemeManager
+
     theme_manager = ThemeManager(app)
     print(f"Theme: {theme_manager.get_theme_display_name()}")
 
-    # Config-Speicherung importieren
-    from src.main import save_wizard_config, start_backup_after_wizard
-
     # Wizard erstellen und modal ausführen
+    from gui.wizard_v2 import SetupWizardV2
+
     wizard = SetupWizardV2(version=__version__)
     result = wizard.exec()
 
     if result:
+        # Backup-Code nur laden, wenn der Wizard abgeschlossen wurde
+        from src.main import save_wizard_config, start_backup_after_wizard
+
         config = wizard.get_config()
         logging.info(f"Wizard abgeschlossen: {config}")
         try:
@@ -56,7 +56,6 @@ hidden_imports = [
     'src.gui.schedule_dialog',
     'src.gui.theme',
     'src.gui.theme_manager',
-    'src.gui.run_wizard',
     'src.gui.update_dialog',
     'src.core.update_checker',
 
@@ -6,12 +6,14 @@ Windows Backup-Tool für Privatnutzer
 from setuptools import setup, find_packages
 from pathlib import Path
 
+_HERE = Path(__file__).resolve().parent
+
 # Read README for long description
-readme_file = Path(__file__).parent / "README.md"
+readme_file = _HERE / "README.md"
 long_description = readme_file.read_text(encoding="utf-8") if readme_file.exists() else ""
 
 # Read requirements
-requirements_file = Path(__file__).parent / "requirements.txt"
+requirements_file = _HERE / "requirements.txt"
 requirements = []
 if requirements_file.exists():
     with open(requirements_file, 'r', encoding='utf-8') as f:
@@ -35,7 +37,8 @@ setup(
         "Documentation": "https://github.com/nicolettas-muggelbude/scrat-backup/blob/main/claude.md",
         "Source Code": "https://github.com/nicolettas-muggelbude/scrat-backup",
     },
-    packages=find_packages(),
+    # Nur das src-Paket ausliefern – tests/ wird nicht mitinstalliert
+    packages=find_packages(include=["src", "src.*"]),
     classifiers=[
         # Development Status
         "Development Status :: 2 - Pre-Alpha",
@@ -80,6 +83,10 @@ setup(
         "build": [
             "pyinstaller>=6.3.0",
         ],
+        "fast": [
+            "blake3>=0.4.1",     # Schnellere Inhalts-Hashes (Scanner.hash_file)
+            "orjson>=3.9.0",     # Schnelleres Laden/Speichern der Konfiguration
+        ],
     },
     entry_points={
         "console_scripts": [
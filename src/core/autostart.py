@@ -4,20 +4,114 @@ Unterstützt Windows, Linux und macOS
 """
 
 import logging
+import os
 import platform
 import sys
+import tempfile
+from functools import lru_cache
 from pathlib import Path
-from typing import Optional
+from typing import Callable, Dict, Optional, Tuple
 
 logger = logging.getLogger(__name__)
 
+# Plattform ändert sich zur Laufzeit nicht – einmal beim Import ermitteln
+_SYSTEM = platform.system()
+
+if _SYSTEM == "Windows":
+    import winreg
+else:
+    winreg = None
+
+_RUN_KEY_PATH = r"Software\Microsoft\Windows\CurrentVersion\Run"
+
+# Mögliche Icon-Pfade für die .desktop-Datei
+_ICON_CANDIDATES = (
+    Path(__file__).parent.parent.parent / "assets" / "scrat_icon.png",
+    Path("/usr/share/icons/hicolor/256x256/apps/scrat-backup.png"),
+    Path("/usr/local/share/icons/scrat-backup.png"),
+)
+
+_LINUX_DESKTOP_TMPL = """[Desktop Entry]
+Type=Application
+Name={name}
+Comment=Automatisches Backup im Hintergrund
+Exec={command}
+Icon={icon}
+Terminal=false
+Categories=Utility;
+X-GNOME-Autostart-enabled=true
+"""
+
+_MACOS_PLIST_TMPL = """<?xml version="1.0" encoding="UTF-8"?>
+<!DOCTYPE plist PUBLIC "-//Apple//DTD PLIST 1.0//EN" \
+"http://www.apple.com/DTDs/PropertyList-1.0.dtd">
+<plist version="1.0">
+<dict>
+    <key>Label</key>
+    <string>com.{name_lower}</string>
+    <key>ProgramArguments</key>
+    <array>
+        <string>{executable}</string>
+        <string>-m</string>
+        <string>scrat_backup</string>
+        <string>--tray</string>
+    </array>
+    <key>RunAtLoad</key>
+    <true/>
+    <key>KeepAlive</key>
+    <false/>
+</dict>
+</plist>
+"""
+
+
+def _write_file(path: Path, content: str, mode: int = 0o644) -> None:
+    """
+    Schreibt kleine Textdateien atomar (Temp-Datei im Zielordner, dann ersetzen)
+
+    Ein Absturz beim Schreiben hinterlässt so nie eine leere oder halbe
+    .desktop-/.plist-Datei.
+    """
+    fd, tmp_name = tempfile.mkstemp(dir=path.parent, prefix=f".{path.name}.", suffix=".tmp")
+    try:
+        with os.fdopen(fd, "wb") as f:
+            # write() eines gepufferten Datei-Objekts schreibt alle Bytes
+            f.write(content.encode("utf-8"))
+            f.flush()
+            os.fsync(f.fileno())
+        os.chmod(tmp_name, mode)  # mkstemp legt mit 0600 an
+        os.replace(tmp_name, path)
+    except BaseException:
+        Path(tmp_name).unlink(missing_ok=True)
+        raise
+
 
 class AutostartManager:
     """Verwaltet Autostart-Einträge plattformunabhängig"""
 
+    __slots__ = (
+        "app_name",
+        "_app_name_lower",
+        "_linux_path",
+        "_macos_path",
+        "_cached_enabled",
+    )
+
+    # Plattform → (enable, disable, check); wird nach der Klasse befüllt
+    _DISPATCH: Dict[str, Tuple[Callable, Callable, Callable]] = {}
+
+    system = _SYSTEM
+
     def __init__(self, app_name: str = "Scrat-Backup"):
         self.app_name = app_name
-        self.system = platform.system()
+        self._app_name_lower = app_name.lower()
+
+        # Autostart-Pfade werden beim ersten Zugriff berechnet und gemerkt
+        self._linux_path: Optional[Path] = None
+        self._macos_path: Optional[Path] = None
+
+        # Zuletzt bekannter Autostart-Zustand (None = noch nicht geprüft)
+        self._cached_enabled: Optional[bool] = None
 
     def enable_autostart(self, command: Optional[str] = None) -> bool:
         """
@@ -33,38 +127,49 @@ class AutostartManager:
             # Standard: Python-Interpreter + Tray-Modus
             command = f'"{sys.executable}" -m scrat_backup --tray'
 
-        if self.system == "Windows":
-            return self._enable_windows_autostart(command)
-        elif self.system == "Linux":
-            return self._enable_linux_autostart(command)
-        elif self.system == "Darwin":
-            return self._enable_macos_autostart(command)
-        else:
+        handlers = self._DISPATCH.get(self.system)
+        if handlers is None:
             logger.warning(f"Autostart für {self.system} nicht unterstützt")
             return False
 
+        success = handlers[0](self, command)
+        if success:
+            self._cached_enabled = True
+        return success
+
     def disable_autostart(self) -> bool:
         """Deaktiviert Autostart"""
-        if self.system == "Windows":
-            return self._disable_windows_autostart()
-        elif self.system == "Linux":
-            return self._disable_linux_autostart()
-        elif self.system == "Darwin":
-            return self._disable_macos_autostart()
-        else:
+        handlers = self._DISPATCH.get(self.system)
+        if handlers is None:
             return False
 
+        success = handlers[1](self)
+        if success:
+            self._cached_enabled = False
+        return success
+
     def is_autostart_enabled(self) -> bool:
-        """Prüft ob Autostart aktiviert ist"""
-        if self.system == "Windows":
-            return self._check_windows_autostart()
-        elif self.system == "Linux":
-            return self._check_linux_autostart()
-        elif self.system == "Darwin":
-            return self._check_macos_autostart()
-        else:
+        """
+        Prüft ob Autostart aktiviert ist
+
+        Das Ergebnis wird im Prozess gemerkt; enable/disable halten es
+        aktuell. Wurde der Eintrag von außen geändert, vorher invalidate()
+        aufrufen.
+        """
+        if self._cached_enabled is not None:
+            return self._cached_enabled
+
+        handlers = self._DISPATCH.get(self.system)
+        if handlers is None:
             return False
 
+        self._cached_enabled = handlers[2](self)
+        return self._cached_enabled
+
+    def invalidate(self) -> None:
+        """Verwirft den gemerkten Autostart-Zustand"""
+        self._cached_enabled = None
+
     # ======================================================================
     # WINDOWS
     # ======================================================================
@@ -72,13 +177,10 @@ class AutostartManager:
     def _enable_windows_autostart(self, command: str) -> bool:
         """Windows: Registry-Eintrag in CurrentVersion\\Run"""
         try:
-            import winreg
-
-            key_path = r"Software\Microsoft\Windows\CurrentVersion\Run"
-            key = winreg.OpenKey(winreg.HKEY_CURRENT_USER, key_path, 0, winreg.KEY_SET_VALUE)
-
-            winreg.SetValueEx(key, self.app_name, 0, winreg.REG_SZ, command)
-            winreg.CloseKey(key)
+            with winreg.OpenKey(
+                winreg.HKEY_CURRENT_USER, _RUN_KEY_PATH, 0, winreg.KEY_SET_VALUE
+            ) as key:
+                winreg.SetValueEx(key, self.app_name, 0, winreg.REG_SZ, command)
 
             logger.info("Windows-Autostart aktiviert")
             return True
@@ -90,18 +192,15 @@ class AutostartManager:
     def _disable_windows_autostart(self) -> bool:
         """Windows: Registry-Eintrag entfernen"""
         try:
-            import winreg
-
-            key_path = r"Software\Microsoft\Windows\CurrentVersion\Run"
-            key = winreg.OpenKey(winreg.HKEY_CURRENT_USER, key_path, 0, winreg.KEY_SET_VALUE)
+            with winreg.OpenKey(
+                winreg.HKEY_CURRENT_USER, _RUN_KEY_PATH, 0, winreg.KEY_SET_VALUE
+            ) as key:
+                try:
+                    winreg.DeleteValue(key, self.app_name)
+                    logger.info("Windows-Autostart deaktiviert")
+                except FileNotFoundError:
+                    logger.warning("Autostart-Eintrag existiert nicht")
 
-            try:
-                winreg.DeleteValue(key, self.app_name)
-                logger.info("Windows-Autostart deaktiviert")
-            except FileNotFoundError:
-                logger.warning("Autostart-Eintrag existiert nicht")
-
-            winreg.CloseKey(key)
             return True
 
         except Exception as e:
@@ -111,18 +210,15 @@ class AutostartManager:
     def _check_windows_autostart(self) -> bool:
         """Windows: Prüft ob Registry-Eintrag existiert"""
         try:
-            import winreg
-
-            key_path = r"Software\Microsoft\Windows\CurrentVersion\Run"
-            key = winreg.OpenKey(winreg.HKEY_CURRENT_USER, key_path, 0, winreg.KEY_READ)
-
-            try:
-                winreg.QueryValueEx(key, self.app_name)
-                winreg.CloseKey(key)
-                return True
-            except FileNotFoundError:
-                winreg.CloseKey(key)
-                return False
+            # Nur Lesezugriff auf Werte nötig – KEY_QUERY_VALUE statt KEY_READ
+            with winreg.OpenKey(
+                winreg.HKEY_CURRENT_USER, _RUN_KEY_PATH, 0, winreg.KEY_QUERY_VALUE
+            ) as key:
+                try:
+                    winreg.QueryValueEx(key, self.app_name)
+                    return True
+                except OSError:
+                    return False
 
         except Exception as e:
             logger.error(f"Fehler beim Prüfen von Windows-Autostart: {e}")
@@ -133,33 +229,28 @@ class AutostartManager:
     # ======================================================================
 
     def _get_linux_autostart_file(self) -> Path:
-        """Linux: Pfad zur .desktop-Datei in autostart"""
-        autostart_dir = Path.home() / ".config" / "autostart"
-        autostart_dir.mkdir(parents=True, exist_ok=True)
-        return autostart_dir / f"{self.app_name.lower()}.desktop"
+        """Linux: Pfad zur .desktop-Datei in autostart (gecacht, ohne mkdir)"""
+        if self._linux_path is None:
+            self._linux_path = (
+                Path.home() / ".config" / "autostart" / f"{self._app_name_lower}.desktop"
+            )
+        return self._linux_path
 
     def _enable_linux_autostart(self, command: str) -> bool:
         """Linux: .desktop-Datei in ~/.config/autostart/ erstellen"""
         try:
             desktop_file = self._get_linux_autostart_file()
+            desktop_file.parent.mkdir(parents=True, exist_ok=True)
 
             # Finde Icon-Pfad
             icon_path = self._find_icon_path()
 
             # .desktop-Inhalt
-            desktop_content = f"""[Desktop Entry]
-Type=Application
-Name={self.app_name}
-Comment=Automatisches Backup im Hintergrund
-Exec={command}
-Icon={icon_path}
-Terminal=false
-Categories=Utility;
-X-GNOME-Autostart-enabled=true
-"""
+            desktop_content = _LINUX_DESKTOP_TMPL.format(
+                name=self.app_name, command=command, icon=icon_path
+            )
 
-            desktop_file.write_text(desktop_content)
-            desktop_file.chmod(0o755)
+            _write_file(desktop_file, desktop_content)
 
             logger.info(f"Linux-Autostart aktiviert: {desktop_file}")
             return True
@@ -173,7 +264,7 @@ X-GNOME-Autostart-enabled=true
         try:
             desktop_file = self._get_linux_autostart_file()
 
-            if desktop_file.exists():
+            if os.path.lexists(desktop_file):
                 desktop_file.unlink()
                 logger.info("Linux-Autostart deaktiviert")
             else:
@@ -187,44 +278,32 @@ X-GNOME-Autostart-enabled=true
 
     def _check_linux_autostart(self) -> bool:
         """Linux: Prüft ob .desktop-Datei existiert"""
-        return self._get_linux_autostart_file().exists()
+        return os.path.lexists(self._get_linux_autostart_file())
 
     # ======================================================================
     # MACOS
     # ======================================================================
 
+    def _get_macos_plist_file(self) -> Path:
+        """macOS: Pfad zur LaunchAgent-plist (gecacht, ohne mkdir)"""
+        if self._macos_path is None:
+            self._macos_path = (
+                Path.home() / "Library" / "LaunchAgents" / f"com.{self._app_name_lower}.plist"
+            )
+        return self._macos_path
+
     def _enable_macos_autostart(self, command: str) -> bool:
         """macOS: LaunchAgent erstellen"""
         try:
-            launch_agents_dir = Path.home() / "Library" / "LaunchAgents"
-            launch_agents_dir.mkdir(parents=True, exist_ok=True)
-
-            plist_file = launch_agents_dir / f"com.{self.app_name.lower()}.plist"
+            plist_file = self._get_macos_plist_file()
+            plist_file.parent.mkdir(parents=True, exist_ok=True)
 
             # plist-Inhalt
-            apple_dtd = "http://www.apple.com/DTDs/PropertyList-1.0.dtd"
-            plist_content = f"""<?xml version="1.0" encoding="UTF-8"?>
-<!DOCTYPE plist PUBLIC "-//Apple//DTD PLIST 1.0//EN" "{apple_dtd}">
-<plist version="1.0">
-<dict>
-    <key>Label</key>
-    <string>com.{self.app_name.lower()}</string>
-    <key>ProgramArguments</key>
-    <array>
-        <string>{sys.executable}</string>
-        <string>-m</string>
-        <string>scrat_backup</string>
-        <string>--tray</string>
-    </array>
-    <key>RunAtLoad</key>
-    <true/>
-    <key>KeepAlive</key>
-    <false/>
-</dict>
-</plist>
-"""
+            plist_content = _MACOS_PLIST_TMPL.format(
+                name_lower=self._app_name_lower, executable=sys.executable
+            )
 
-            plist_file.write_text(plist_content)
+            _write_file(plist_file, plist_content)
             logger.info(f"macOS-Autostart aktiviert: {plist_file}")
             return True
 
@@ -235,11 +314,9 @@ X-GNOME-Autostart-enabled=true
     def _disable_macos_autostart(self) -> bool:
         """macOS: LaunchAgent entfernen"""
         try:
-            plist_file = (
-                Path.home() / "Library" / "LaunchAgents" / f"com.{self.app_name.lower()}.plist"
-            )
+            plist_file = self._get_macos_plist_file()
 
-            if plist_file.exists():
+            if os.path.lexists(plist_file):
                 plist_file.unlink()
                 logger.info("macOS-Autostart deaktiviert")
             else:
@@ -253,24 +330,40 @@ X-GNOME-Autostart-enabled=true
 
     def _check_macos_autostart(self) -> bool:
         """macOS: Prüft ob LaunchAgent existiert"""
-        plist_file = Path.home() / "Library" / "LaunchAgents" / f"com.{self.app_name.lower()}.plist"
-        return plist_file.exists()
+        return os.path.lexists(self._get_macos_plist_file())
 
     # ======================================================================
     # HELPERS
     # ======================================================================
 
-    def _find_icon_path(self) -> str:
-        """Sucht Icon-Datei (für Linux .desktop)"""
-        # Mögliche Icon-Pfade
-        possible_paths = [
-            Path(__file__).parent.parent.parent / "assets" / "scrat_icon.png",
-            Path("/usr/share/icons/hicolor/256x256/apps/scrat-backup.png"),
-            Path("/usr/local/share/icons/scrat-backup.png"),
-        ]
-
-        for path in possible_paths:
+    @staticmethod
+    @lru_cache(maxsize=1)
+    def _find_icon_path() -> str:
+        """Sucht Icon-Datei (für Linux .desktop) – Ergebnis wird gecacht"""
+        for path in _ICON_CANDIDATES:
             if path.exists():
                 return str(path)
 
         return "scrat-backup"  # Fallback: Icon-Name ohne Pfad
+
+
+AutostartManager._DISPATCH = {
+    "Linux": (
+        AutostartManager._enable_linux_autostart,
+        AutostartManager._disable_linux_autostart,
+        AutostartManager._check_linux_autostart,
+    ),
+    "Darwin": (
+        AutostartManager._enable_macos_autostart,
+        AutostartManager._disable_macos_autostart,
+        AutostartManager._check_macos_autostart,
+    ),
+}
+
+# Windows-Handler nur registrieren, wenn winreg tatsächlich verfügbar ist
+if winreg is not None:
+    AutostartManager._DISPATCH["Windows"] = (
+        AutostartManager._enable_windows_autostart,
+        AutostartManager._disable_windows_autostart,
+        AutostartManager._check_windows_autostart,
+    )
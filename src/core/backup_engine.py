@@ -4,24 +4,29 @@ Orchestriert Vollbackups und inkrementelle Backups
 """
 
 import hashlib
+import io
 import logging
+import os
 import platform
 import shutil
 import tempfile
-from dataclasses import dataclass, field
+import threading
+import time
+from concurrent.futures import Future, ThreadPoolExecutor
+from dataclasses import dataclass, field, replace
 from datetime import datetime
 from pathlib import Path
-from typing import Callable, List, Optional, Tuple
+from typing import BinaryIO, Callable, Dict, List, Optional, Tuple
 
 from src.core.compressor import Compressor
-from src.core.encryptor import Encryptor
+from src.core.encryptor import EncryptedFileWriter, Encryptor
 from src.core.metadata_manager import MetadataManager
-from src.core.scanner import FileInfo, Scanner
+from src.core.scanner import FileInfo, Scanner, ScanResult
 
 logger = logging.getLogger(__name__)
 
 
-@dataclass
+@dataclass(slots=True)
 class BackupConfig:
     """
     Konfiguration für ein Backup
@@ -35,6 +40,10 @@ class BackupConfig:
         split_size: Maximale Größe pro Archive-Teil in Bytes
         exclude_patterns: Set von Exclude-Patterns
         max_versions: Maximale Anzahl zu behaltender Versionen (Standard: 3)
+        dedup_min_size: Ab dieser Größe (Bytes) wird der Inhalts-Fingerabdruck
+            gespeichert und inhaltlich unveränderte Dateien übersprungen (0 = aus)
+        max_threads: Maximale Anzahl parallel komprimierter Archiv-Teile
+        compression_algorithm: 7z-Filter ("zstd", "lzma2" oder "copy")
     """
 
     sources: List[Path]
@@ -46,9 +55,12 @@ class BackupConfig:
     exclude_patterns: Optional[set] = None
     max_versions: int = 3
     auto_rotate: bool = False  # True = automatisches Backup (Rotation aktiv)
+    dedup_min_size: int = 0  # 0 = kein Fingerabdruck (liest große Dateien sonst doppelt)
+    max_threads: int = 4  # Parallel komprimierte Archiv-Teile (advanced.max_threads)
+    compression_algorithm: str = "zstd"
 
 
-@dataclass
+@dataclass(slots=True)
 class BackupProgress:
     """
     Fortschritts-Informationen für ein laufendes Backup
@@ -81,7 +93,7 @@ class BackupProgress:
         return (self.bytes_processed / self.bytes_total) * 100
 
 
-@dataclass
+@dataclass(slots=True)
 class BackupResult:
     """
     Ergebnis eines Backups
@@ -118,6 +130,13 @@ class BackupEngine:
     - Versionierungs-Verwaltung (Rotation)
     """
 
+    # Maximale Anzahl paralleler Verschlüsselungs-Threads
+    ENCRYPT_WORKERS = 4
+    # Maximale Anzahl gleichzeitig gescannter Quellen
+    SCAN_WORKERS = 4
+    # Mindestabstand zwischen zwei Progress-Updates derselben Phase (100 ms)
+    PROGRESS_INTERVAL_NS = 100_000_000
+
     def __init__(
         self,
         metadata_manager: MetadataManager,
@@ -135,20 +154,29 @@ class BackupEngine:
         self.metadata_manager = metadata_manager
         self.config = config
         self.progress_callback = progress_callback
+        self._last_report_ns = 0
+        self._last_report_phase: Optional[str] = None
+        # Scan-, Archiv- und Verschlüsselungs-Threads melden parallel
+        self._report_lock = threading.Lock()
 
         # Initialisiere Komponenten
         self.scanner = Scanner(exclude_patterns=config.exclude_patterns)
         self.compressor = Compressor(
-            compression_level=config.compression_level, split_size=config.split_size
+            compression_level=config.compression_level,
+            split_size=config.split_size,
+            max_workers=max(1, config.max_threads),
+            algorithm=config.compression_algorithm,
         )
-        self.encryptor = Encryptor(password=config.password)
+        # Neue Backups: speicherharte KDF (wird mit dem Salt in den Metadaten gespeichert)
+        self.encryptor = Encryptor(password=config.password, kdf=Encryptor.KDF_SCRYPT)
 
         # Password-Hash für Metadaten
         self.password_hash = self._hash_password(config.password)
 
         logger.info("Backup-Engine initialisiert")
 
-    def _hash_password(self, password: str) -> str:
+    @staticmethod
+    def _hash_password(password: str) -> str:
         """
         Erstellt Hash des Passworts für Metadaten
 
@@ -158,6 +186,8 @@ class BackupEngine:
         Returns:
             SHA256-Hash des Passworts
         """
+        # Bewusst SHA-256 (nicht BLAKE3 wie Scanner.hash_file): einmaliger Aufruf,
+        # und der Hash ist bereits in bestehenden Datenbanken gespeichert
         return hashlib.sha256(password.encode()).hexdigest()
 
     def create_full_backup(self) -> BackupResult:
@@ -184,6 +214,7 @@ class BackupEngine:
                 destination_path=str(self.config.destination_path),
                 encryption_key_hash=self.password_hash,
                 salt=self.encryptor.salt,
+                kdf=self.encryptor.kdf,
             )
 
             # Log: Backup gestartet
@@ -202,23 +233,17 @@ class BackupEngine:
 
             # 1. Scannen aller Quellen
             all_files: List[FileInfo] = []
+            file_paths: List[Path] = []
             total_size = 0
 
-            for source_path in self.config.sources:
-                logger.info(f"Scanne Quelle: {source_path}")
-
-                def scan_progress(file_path: Path) -> None:
-                    progress.current_file = str(file_path)
-                    self._report_progress(progress)
-
-                scan_result = self.scanner.scan_directory(
-                    source_path=source_path, progress_callback=scan_progress
-                )
-
+            for scan_result in self._scan_sources(progress):
                 all_files.extend(scan_result.new_files)
+                file_paths.extend(scan_result.backup_paths)
                 total_size += scan_result.total_size
                 progress.errors.extend(scan_result.errors)
 
+            all_files = self._skip_unchanged_content(all_files)
+
             progress.files_total = len(all_files)
             progress.bytes_total = total_size
             logger.info(
@@ -259,46 +284,23 @@ class BackupEngine:
             backup_dir = self.config.destination_path / backup_id
             backup_dir.mkdir(parents=True, exist_ok=True)
 
-            file_paths = [f.path for f in all_files]
-            encrypted_archives = self._compress_and_encrypt(
+            # 3. Parallel dazu: Datei-Informationen in DB speichern
+            encrypted_archives, size_compressed = self._archive_and_record(
+                db_backup_id=db_backup_id,
+                files=all_files,
                 file_paths=file_paths,
                 backup_dir=backup_dir,
                 progress=progress,
             )
 
-            # Berechne komprimierte Größe
-            size_compressed = sum(p.stat().st_size for p in encrypted_archives)
-
-            # 4. Metadaten speichern
-            progress.phase = "saving_metadata"
-            self._report_progress(progress)
-
-            # Speichere Datei-Informationen in DB
-            for file_info in all_files:
-                # Bestimme in welchem Archiv die Datei ist (vereinfacht)
-                archive_name = encrypted_archives[0].name if encrypted_archives else ""
-
-                self.metadata_manager.add_file_to_backup(
-                    backup_id=db_backup_id,
-                    source_path=str(file_info.source_dir),  # ✅ Quellverzeichnis statt Dateipfad!
-                    relative_path=str(file_info.relative_path),
-                    file_size=file_info.size,
-                    modified_timestamp=file_info.modified,
-                    archive_name=archive_name,
-                    archive_path=str(backup_dir),
-                )
-
             # Update Backup als abgeschlossen
             end_time = datetime.now()
-            self.metadata_manager.update_backup_progress(
+            self.metadata_manager.finalize_backup(
                 backup_id=db_backup_id,
-                files_processed=len(all_files),
+                files_total=len(all_files),
                 size_original=total_size,
                 size_compressed=size_compressed,
             )
-            self.metadata_manager.mark_backup_completed(
-                backup_id=db_backup_id, files_total=len(all_files)
-            )
 
             # Versionierungs-Rotation
             self._rotate_old_backups()
@@ -374,10 +376,10 @@ class BackupEngine:
             RuntimeError: Bei Backup-Fehler
         """
         # Prüfe Basis-Backup BEVOR try-Block (ValueError soll durchkommen)
-        base_backups = self.metadata_manager.get_all_backups()
-        completed_backups = [b for b in base_backups if b["status"] == "completed"]
+        # Neuestes Backup als Basis
+        base_backup = self.metadata_manager.get_latest_completed_backup()
 
-        if not completed_backups:
+        if base_backup is None:
             raise ValueError("Kein Basis-Backup gefunden. " "Erstelle zuerst ein Vollbackup.")
 
         start_time = datetime.now()
@@ -386,8 +388,6 @@ class BackupEngine:
         logger.info(f"Starte inkrementelles Backup: {backup_id}")
 
         try:
-            # Neuestes Backup als Basis
-            base_backup = completed_backups[0]
             base_backup_id = base_backup["id"]
 
             logger.info(f"Basis-Backup: {base_backup_id} vom {base_backup['timestamp']}")
@@ -399,6 +399,7 @@ class BackupEngine:
                 destination_path=str(self.config.destination_path),
                 encryption_key_hash=self.password_hash,
                 salt=self.encryptor.salt,
+                kdf=self.encryptor.kdf,
                 base_backup_id=base_backup_id,
             )
 
@@ -416,81 +417,70 @@ class BackupEngine:
 
             # 1. Scannen mit Basis-Backup-Vergleich
             all_changed_files: List[FileInfo] = []
+            file_paths: List[Path] = []
             total_size = 0
 
-            for source_path in self.config.sources:
-                logger.info(f"Scanne Quelle: {source_path}")
-
-                # Kumulativen Dateistand über die gesamte Backup-Kette aufbauen
-                all_previous_files = self.metadata_manager.get_cumulative_backup_files(base_backup_id)
-
-                # Filtere nach source_path
-                previous_files_list = [
-                    f for f in all_previous_files if f["source_path"].startswith(str(source_path))
-                ]
-
-                # Konvertiere zu Dict für Scanner
-                previous_files = {}
-                for pf in previous_files_list:
-                    # Konvertiere Timestamp-String zu datetime, falls nötig
-                    modified_ts = pf["modified_timestamp"]
-                    if isinstance(modified_ts, str):
-                        modified_ts = datetime.fromisoformat(modified_ts)
-
-                    # Rekonstruiere source_dir aus path und relative_path
-                    # (für alte Backups wo source_path = Dateipfad war)
-                    full_path = Path(pf["source_path"])
-                    rel_path = Path(pf["relative_path"])
-
-                    # Berechne source_dir: path ohne relative_path
-                    # z.B. C:/Music/68.jpg - 68.jpg = C:/Music
-                    if len(rel_path.parts) > 0:
-                        source_parts = full_path.parts[: -len(rel_path.parts)]
-                        calculated_source_dir = (
-                            Path(*source_parts) if source_parts else full_path.parent
-                        )
-                    else:
-                        calculated_source_dir = full_path.parent
-
-                    file_info = FileInfo(
-                        path=full_path,
-                        source_dir=calculated_source_dir,
-                        relative_path=rel_path,
-                        size=pf["file_size"],
-                        modified=modified_ts,
+            # Kumulativen Dateistand über die gesamte Backup-Kette einmalig aufbauen
+            # und nach source_path gruppieren (statt pro Quelle alle Einträge zu filtern)
+            previous_by_source: Dict[str, List[dict]] = {}
+            # (source_path, relative_path) → (Backup mit dem aktuellen Stand, Fingerabdruck)
+            previous_versions: Dict[Tuple[str, str], Tuple[int, Optional[str]]] = {}
+            for pf in self.metadata_manager.get_cumulative_backup_files(base_backup_id):
+                previous_by_source.setdefault(pf["source_path"], []).append(pf)
+                if self.config.dedup_min_size:
+                    previous_versions[(pf["source_path"], pf["relative_path"])] = (
+                        pf["backup_id"],
+                        pf["checksum"],
                     )
-                    previous_files[pf["relative_path"]] = file_info
 
-                def scan_progress(file_path: Path) -> None:
-                    progress.current_file = str(file_path)
-                    self._report_progress(progress)
-
-                # Scan mit Change Detection
-                scan_result = self.scanner.scan_directory(
-                    source_path=source_path,
-                    previous_files=previous_files,
-                    progress_callback=scan_progress,
-                )
-
-                # Nur neue und geänderte Dateien
-                changed_files = scan_result.files_to_backup
-                all_changed_files.extend(changed_files)
-                total_size += sum(f.size for f in changed_files)
+            def previous_files_for(source_path: Path) -> Dict[str, FileInfo]:
+                # Filtere nach source_path und konvertiere zu Dict für Scanner.
+                # Geprüft werden nur die (wenigen) verschiedenen source_path-Werte,
+                # nicht jede einzelne Datei.
+                source_prefix = str(source_path)
+                return {
+                    pf["relative_path"]: self._previous_file_info(pf)
+                    for stored_source, rows in previous_by_source.items()
+                    if stored_source.startswith(source_prefix)
+                    for pf in rows
+                }
+
+            # Scan mit Change Detection
+            for scan_result in self._scan_sources(progress, previous_files_for):
+                # Nur neue und geänderte Dateien (Pfade und Größe liefert der Scanner mit)
+                all_changed_files.extend(scan_result.new_files)
+                all_changed_files.extend(scan_result.modified_files)
+                file_paths.extend(scan_result.backup_paths)
+                total_size += scan_result.backup_size
                 progress.errors.extend(scan_result.errors)
 
                 # Speichere gelöschte Dateien
-                for deleted_file in scan_result.deleted_files:
-                    self.metadata_manager.add_file_to_backup(
-                        backup_id=db_backup_id,
-                        source_path=str(deleted_file.path),
-                        relative_path=str(deleted_file.relative_path),
-                        file_size=0,
-                        modified_timestamp=deleted_file.modified,
-                        archive_name="",
-                        archive_path="",
-                        is_deleted=True,
+                if scan_result.deleted_files:
+                    self.metadata_manager.add_files_to_backup(
+                        db_backup_id,
+                        (
+                            (
+                                deleted_file.path_str,
+                                deleted_file.relative_path_str,
+                                0,
+                                deleted_file.modified,
+                                "",
+                                "",
+                                True,
+                                None,
+                            )
+                            for deleted_file in scan_result.deleted_files
+                        ),
                     )
 
+            if self.config.dedup_min_size:
+                # Dateien mit neuem Zeitstempel, aber gleichem Inhalt entfallen
+                all_changed_files = self._skip_unchanged_content(
+                    all_changed_files, previous_versions
+                )
+                file_paths = [f.path for f in all_changed_files]
+                total_size = sum(f.size for f in all_changed_files)
+
             progress.files_total = len(all_changed_files)
             progress.bytes_total = total_size
 
@@ -534,42 +524,22 @@ class BackupEngine:
             backup_dir = self.config.destination_path / backup_id
             backup_dir.mkdir(parents=True, exist_ok=True)
 
-            file_paths = [f.path for f in all_changed_files]
-            encrypted_archives = self._compress_and_encrypt(
+            encrypted_archives, size_compressed = self._archive_and_record(
+                db_backup_id=db_backup_id,
+                files=all_changed_files,
                 file_paths=file_paths,
                 backup_dir=backup_dir,
                 progress=progress,
             )
 
-            size_compressed = sum(p.stat().st_size for p in encrypted_archives)
-
-            # Metadaten speichern
-            progress.phase = "saving_metadata"
-            self._report_progress(progress)
-
-            for file_info in all_changed_files:
-                archive_name = encrypted_archives[0].name if encrypted_archives else ""
-                self.metadata_manager.add_file_to_backup(
-                    backup_id=db_backup_id,
-                    source_path=str(file_info.source_dir),  # ✅ Quellverzeichnis statt Dateipfad!
-                    relative_path=str(file_info.relative_path),
-                    file_size=file_info.size,
-                    modified_timestamp=file_info.modified,
-                    archive_name=archive_name,
-                    archive_path=str(backup_dir),
-                )
-
             # Abschließen
             end_time = datetime.now()
-            self.metadata_manager.update_backup_progress(
+            self.metadata_manager.finalize_backup(
                 backup_id=db_backup_id,
-                files_processed=len(all_changed_files),
+                files_total=len(all_changed_files),
                 size_original=total_size,
                 size_compressed=size_compressed,
             )
-            self.metadata_manager.mark_backup_completed(
-                backup_id=db_backup_id, files_total=len(all_changed_files)
-            )
 
             # Versionierungs-Rotation
             self._rotate_old_backups()
@@ -632,6 +602,139 @@ class BackupEngine:
 
             raise RuntimeError(f"Backup fehlgeschlagen: {e}") from e
 
+    def _scan_sources(
+        self,
+        progress: "BackupProgress",
+        previous_files_for: Optional[Callable[[Path], Dict[str, FileInfo]]] = None,
+    ) -> List[ScanResult]:
+        """
+        Scannt alle konfigurierten Quellen parallel
+
+        Scannen ist I/O-gebunden (viele kleine stat-Aufrufe), daher laufen
+        mehrere Quellen gleichzeitig. Datenbank-Zugriffe bleiben beim Aufrufer
+        im Haupt-Thread.
+
+        Args:
+            progress: Progress-Objekt (current_file wird aktualisiert)
+            previous_files_for: Optional, liefert den Vergleichsstand je Quelle
+
+        Returns:
+            ScanResults in der Reihenfolge von config.sources
+        """
+        progress_lock = threading.Lock()
+
+        def scan_progress(file_path: Path) -> None:
+            with progress_lock:
+                progress.current_file = str(file_path)
+                self._report_progress(progress)
+
+        def scan_source(source_path: Path) -> ScanResult:
+            logger.info(f"Scanne Quelle: {source_path}")
+            return self.scanner.scan_directory(
+                source_path=source_path,
+                previous_files=previous_files_for(source_path) if previous_files_for else None,
+                progress_callback=scan_progress,
+            )
+
+        sources = self.config.sources
+        if len(sources) <= 1:
+            return [scan_source(source_path) for source_path in sources]
+
+        max_workers = min(self.SCAN_WORKERS, len(sources))
+        with ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="scan-source") as pool:
+            return list(pool.map(scan_source, sources))
+
+    def _skip_unchanged_content(
+        self,
+        files: List[FileInfo],
+        previous_versions: Optional[Dict[Tuple[str, str], Tuple[int, Optional[str]]]] = None,
+    ) -> List[FileInfo]:
+        """
+        Berechnet den Inhalts-Fingerabdruck großer Dateien (ab config.dedup_min_size)
+
+        Der Fingerabdruck landet in FileInfo.checksum und damit in
+        backup_files.checksum. Geänderte Dateien mit demselben Fingerabdruck wie
+        die gesicherte Version (z.B. nur Zeitstempel geändert) werden
+        aussortiert – ihr Inhalt liegt bereits im Backup-Stand. Der neue
+        Zeitstempel wird bei der gesicherten Version nachgetragen, damit der
+        nächste Scan die Datei nicht erneut als geändert meldet.
+
+        Args:
+            files: Zu sichernde Dateien
+            previous_versions: Optional, (source_path, relative_path) →
+                (Backup-ID, Fingerabdruck) der zuletzt gesicherten Version
+
+        Returns:
+            Weiterhin zu sichernde Dateien
+        """
+        min_size = self.config.dedup_min_size
+        if not min_size:
+            return files
+
+        kept: List[FileInfo] = []
+        touched: List[Tuple[int, str, str, datetime]] = []
+
+        for file_info in files:
+            if file_info.size < min_size:
+                kept.append(file_info)
+                continue
+
+            key = (str(file_info.source_dir), file_info.relative_path_str)
+            try:
+                checksum = Scanner.hash_file(file_info.path)
+            except OSError as e:
+                logger.warning(f"Fingerabdruck für {file_info.path} nicht möglich: {e}")
+                kept.append(file_info)
+                continue
+
+            previous_backup_id, previous_checksum = (previous_versions or {}).get(key, (None, None))
+            if file_info.is_modified and previous_checksum == checksum:
+                logger.debug("Inhalt unverändert, übersprungen: %s", file_info.relative_path_str)
+                touched.append((previous_backup_id, *key, file_info.modified))
+                continue
+
+            file_info.checksum = checksum
+            kept.append(file_info)
+
+        if touched:
+            self.metadata_manager.update_file_timestamps(touched)
+            logger.info(f"{len(touched)} Dateien mit unverändertem Inhalt übersprungen")
+        return kept
+
+    @staticmethod
+    def _previous_file_info(pf: dict) -> FileInfo:
+        """
+        Baut FileInfo aus einem backup_files-Eintrag des Basis-Backups
+
+        Args:
+            pf: Datei-Dict aus der Datenbank
+
+        Returns:
+            FileInfo für den Scanner-Vergleich
+        """
+        # Rekonstruiere source_dir aus path und relative_path
+        # (für alte Backups wo source_path = Dateipfad war)
+        full_path = Path(pf["source_path"])
+        rel_path = Path(pf["relative_path"])
+
+        # Berechne source_dir: path ohne relative_path
+        # z.B. C:/Music/68.jpg - 68.jpg = C:/Music
+        if len(rel_path.parts) > 0:
+            source_parts = full_path.parts[: -len(rel_path.parts)]
+            calculated_source_dir = Path(*source_parts) if source_parts else full_path.parent
+        else:
+            calculated_source_dir = full_path.parent
+
+        return FileInfo(
+            path=full_path,
+            source_dir=calculated_source_dir,
+            relative_path=rel_path,
+            size=pf["file_size"],
+            modified=pf["modified_timestamp"],
+            path_str=pf["source_path"],
+            relative_path_str=pf["relative_path"],
+        )
+
     def _rotate_old_backups(self) -> None:
         """
         Rotiert alte Backups nach Backup-Ketten (max_versions Ketten behalten).
@@ -643,9 +746,7 @@ class BackupEngine:
             logger.info("Rotation übersprungen: manuelles Backup")
             return
 
-        all_backups = self.metadata_manager.get_all_backups()
-        completed = [b for b in all_backups if b["status"] == "completed"]
-        completed.sort(key=lambda b: b["timestamp"])
+        completed = self.metadata_manager.get_completed_backups()
 
         # Ketten aufbauen: jedes Full-Backup beginnt eine neue Kette
         chains: list = []
@@ -756,91 +857,326 @@ class BackupEngine:
         )
         return None, msg
 
+    def _archive_and_record(
+        self,
+        db_backup_id: int,
+        files: List[FileInfo],
+        file_paths: List[Path],
+        backup_dir: Path,
+        progress: "BackupProgress",
+    ) -> Tuple[List[Path], int]:
+        """
+        Komprimiert/verschlüsselt und speichert gleichzeitig die Datei-Metadaten
+
+        Komprimierung und Verschlüsselung laufen in einem Hintergrund-Thread,
+        während der Haupt-Thread die Datei-Einträge in die Datenbank schreibt
+        (die SQLite-Verbindung bleibt im Haupt-Thread). Der Archiv-Name steht
+        erst danach fest und wird mit einem einzigen UPDATE nachgetragen.
+
+        Args:
+            db_backup_id: Datenbank-ID des Backups
+            files: Zu sichernde Dateien
+            file_paths: Pfade der zu sichernden Dateien (gleiche Dateien wie files)
+            backup_dir: Zielverzeichnis auf dem Backup-Medium
+            progress: Progress-Objekt (wird vom Hintergrund-Thread aktualisiert)
+
+        Returns:
+            (Liste der verschlüsselten Archive, Gesamtgröße in Bytes)
+        """
+        with ThreadPoolExecutor(max_workers=1, thread_name_prefix="scrat-archive") as stage:
+            archiving = stage.submit(
+                self._compress_and_encrypt,
+                file_paths=file_paths,
+                backup_dir=backup_dir,
+                progress=progress,
+                # Größen aus dem Scan – der Compressor muss nicht erneut stat() aufrufen
+                file_sizes={file_info.path: file_info.size for file_info in files},
+            )
+
+            # Speichere Datei-Informationen in DB (eine Transaktion)
+            archive_path = str(backup_dir)
+            self.metadata_manager.add_files_to_backup(
+                db_backup_id,
+                (
+                    (
+                        str(file_info.source_dir),  # ✅ Quellverzeichnis statt Dateipfad!
+                        file_info.relative_path_str,
+                        file_info.size,
+                        file_info.modified,
+                        "",  # Archiv-Name folgt nach der Komprimierung
+                        archive_path,
+                        False,
+                        file_info.checksum,
+                    )
+                    for file_info in files
+                ),
+            )
+
+            encrypted_archives, size_compressed = archiving.result()
+
+        # Metadaten vervollständigen
+        progress.phase = "saving_metadata"
+        self._report_progress(progress)
+
+        # Bestimme in welchem Archiv die Datei ist (vereinfacht)
+        archive_name = encrypted_archives[0].name if encrypted_archives else ""
+        self.metadata_manager.set_archive_name(db_backup_id, archive_name)
+
+        return encrypted_archives, size_compressed
+
     def _compress_and_encrypt(
         self,
         file_paths: List[Path],
         backup_dir: Path,
         progress: "BackupProgress",
-    ) -> List[Path]:
+        file_sizes: Optional[Dict[Path, int]] = None,
+    ) -> Tuple[List[Path], int]:
         """
         Komprimiert Dateien und verschlüsselt sie ins Backup-Verzeichnis.
 
-        Verwendet lokales Temp-Verzeichnis falls genug Speicher vorhanden
-        (schnell: kein doppelter USB-I/O). Fällt andernfalls auf direktes
-        Schreiben aufs Zielmedium zurück (langsamer, aber immer möglich).
+        Standardmäßig wird direkt in verschlüsselte Streams komprimiert
+        (jedes Byte nur einmal aufs Zielmedium). Ist das nicht möglich,
+        werden .7z-Zwischendateien verwendet: im lokalen Temp-Verzeichnis falls
+        genug Speicher vorhanden, sonst direkt auf dem Zielmedium.
 
         Args:
             file_paths: Zu sichernde Dateien
             backup_dir: Zielverzeichnis auf dem Backup-Medium
             progress: Progress-Objekt (wird für Phasen-Updates geändert)
+            file_sizes: Optional bekannte Dateigrößen (Pfad → Bytes) aus dem Scan
 
         Returns:
-            Liste der verschlüsselten Archive auf backup_dir
+            (Liste der verschlüsselten Archive auf backup_dir, Gesamtgröße in Bytes)
         """
-        total_size = sum(f.stat().st_size for f in file_paths if f.exists())
-        temp_dir_path, space_msg = self._find_temp_dir(total_size)
 
         def compress_progress(current: int, total: int, filename: str) -> None:
             progress.files_processed = current
             progress.current_file = filename
             self._report_progress(progress)
 
+        try:
+            return self._compress_encrypt_streaming(
+                file_paths=file_paths,
+                backup_dir=backup_dir,
+                progress=progress,
+                compress_progress=compress_progress,
+                file_sizes=file_sizes,
+            )
+        except io.UnsupportedOperation as e:
+            # py7zr schreibt nicht sequentiell genug für den Verschlüsselungs-Stream
+            logger.warning(
+                f"Direkte Verschlüsselung nicht möglich ({e}) – nutze Zwischendateien"
+            )
+            for partial in backup_dir.glob("data*.7z.enc"):
+                partial.unlink()
+
+        # Gesamtgröße ist seit dem Scan bekannt – kein erneutes stat() pro Datei
+        temp_dir_path, space_msg = self._find_temp_dir(progress.bytes_total)
+
         if temp_dir_path is not None:
             logger.info(f"Nutze Temp-Verzeichnis für Archivierung: {space_msg}")
-            progress.phase = "compressing"
-            self._report_progress(progress)
-
+            # tmp_dir wird nach dem Pipeline-Durchlauf automatisch aufgeräumt
             with tempfile.TemporaryDirectory(dir=temp_dir_path) as tmp_dir:
-                archive_base = Path(tmp_dir) / "data.7z"
-                archives = self.compressor.compress_files(
-                    files=file_paths,
-                    output_path=archive_base,
-                    progress_callback=compress_progress,
+                return self._compress_encrypt_pipeline(
+                    file_paths=file_paths,
+                    archive_base=Path(tmp_dir) / "data.7z",
+                    backup_dir=backup_dir,
+                    progress=progress,
+                    compress_progress=compress_progress,
+                    file_sizes=file_sizes,
                 )
-                logger.info(f"Komprimierung abgeschlossen: {len(archives)} Archive")
 
-                progress.phase = "encrypting"
-                self._report_progress(progress)
+        logger.warning(
+            f"ACHTUNG: Kein geeignetes Temp-Verzeichnis gefunden – {space_msg}. "
+            f"Archivierung direkt auf Zielmedium – Backup läuft deutlich langsamer!"
+        )
+        return self._compress_encrypt_pipeline(
+            file_paths=file_paths,
+            archive_base=backup_dir / "data.7z",
+            backup_dir=backup_dir,
+            progress=progress,
+            compress_progress=compress_progress,
+            file_sizes=file_sizes,
+        )
 
-                encrypted_archives: List[Path] = []
-                for archive_path in archives:
-                    progress.current_file = archive_path.name
-                    self._report_progress(progress)
-                    encrypted_path = backup_dir / f"{archive_path.name}.enc"
-                    self.encryptor.encrypt_file(archive_path, encrypted_path)
-                    encrypted_archives.append(encrypted_path)
-                    logger.debug(f"Verschlüsselt: {archive_path.name}")
-                # tmp_dir wird automatisch aufgeräumt
-        else:
-            logger.warning(
-                f"ACHTUNG: Kein geeignetes Temp-Verzeichnis gefunden – {space_msg}. "
-                f"Archivierung direkt auf Zielmedium – Backup läuft deutlich langsamer!"
-            )
-            progress.phase = "compressing"
-            self._report_progress(progress)
+    def _compress_encrypt_streaming(
+        self,
+        file_paths: List[Path],
+        backup_dir: Path,
+        progress: "BackupProgress",
+        compress_progress: Callable[[int, int, str], None],
+        file_sizes: Optional[Dict[Path, int]] = None,
+    ) -> Tuple[List[Path], int]:
+        """
+        Komprimiert direkt in einen Verschlüsselungs-Stream (ohne .7z-Zwischendatei)
+
+        Jeder Archiv-Teil wird nur einmal geschrieben – als .enc auf dem
+        Zielmedium. Es wird kein Temp-Speicher benötigt.
+
+        Args:
+            file_paths: Zu sichernde Dateien
+            backup_dir: Zielverzeichnis auf dem Backup-Medium
+            progress: Progress-Objekt (wird für Phasen-Updates geändert)
+            compress_progress: Progress-Callback für den Compressor
+            file_sizes: Optional bekannte Dateigrößen (Pfad → Bytes) aus dem Scan
+
+        Returns:
+            (verschlüsselte Archive in Archiv-Reihenfolge, Gesamtgröße in Bytes)
+
+        Raises:
+            io.UnsupportedOperation: Wenn der Compressor nicht streamen kann
+        """
+        progress.phase = "compressing"
+        self._report_progress(progress)
+
+        writers: List[EncryptedFileWriter] = []
+
+        def encrypted_sink(archive_path: Path) -> BinaryIO:
+            writer = self.encryptor.open_encrypted_writer(backup_dir / f"{archive_path.name}.enc")
+            writers.append(writer)
+            return writer
+
+        archives = self.compressor.compress_files(
+            files=file_paths,
+            output_path=backup_dir / "data.7z",
+            progress_callback=compress_progress,
+            sink_factory=encrypted_sink,
+            file_sizes=file_sizes,
+        )
+        logger.info(f"Komprimierung + Verschlüsselung abgeschlossen: {len(archives)} Archive")
+
+        # Verschlüsselung lief im selben Durchgang mit – Phase trotzdem melden,
+        # damit die UI denselben Ablauf sieht wie bei Zwischendateien
+        progress.phase = "encrypting"
+        self._report_progress(progress)
+
+        encrypted_archives = [backup_dir / f"{archive_path.name}.enc" for archive_path in archives]
+        return encrypted_archives, sum(writer.bytes_written for writer in writers)
+
+    def _compress_encrypt_pipeline(
+        self,
+        file_paths: List[Path],
+        archive_base: Path,
+        backup_dir: Path,
+        progress: "BackupProgress",
+        compress_progress: Callable[[int, int, str], None],
+        file_sizes: Optional[Dict[Path, int]] = None,
+    ) -> Tuple[List[Path], int]:
+        """
+        Komprimiert und verschlüsselt überlappend (Producer/Consumer).
+
+        Jeder fertige Archiv-Teil wird sofort an einen Thread-Pool zur
+        Verschlüsselung übergeben, während der Compressor bereits den nächsten
+        Teil schreibt. Ein Semaphore begrenzt die Anzahl wartender Teile, damit
+        der Temp-Speicher nicht unbegrenzt wächst. Die .7z-Teile werden von
+        einem eigenen Thread gelöscht, damit langsame Dateisystem-Operationen
+        (z.B. USB/exFAT) die Verschlüsselung nicht aufhalten.
+
+        Args:
+            file_paths: Zu sichernde Dateien
+            archive_base: Basis-Pfad für die unverschlüsselten 7z-Teile
+            backup_dir: Zielverzeichnis auf dem Backup-Medium
+            progress: Progress-Objekt (wird für Phasen-Updates geändert)
+            compress_progress: Progress-Callback für den Compressor
+            file_sizes: Optional bekannte Dateigrößen (Pfad → Bytes) aus dem Scan
+
+        Returns:
+            (verschlüsselte Archive in Archiv-Reihenfolge, Gesamtgröße in Bytes)
+        """
+        max_workers = min(self.ENCRYPT_WORKERS, os.cpu_count() or 1)
+        pending = threading.BoundedSemaphore(max_workers * 2)
+        futures: List[Future] = []
+        unlinks: List[Future] = []
+
+        progress.phase = "compressing"
+        self._report_progress(progress)
+
+        # unlink_pool zuerst öffnen: wird erst nach dem Verschlüsselungs-Pool
+        # beendet, der noch Löschaufträge einreiht
+        with ThreadPoolExecutor(
+            max_workers=1, thread_name_prefix="scrat-unlink"
+        ) as unlink_pool, ThreadPoolExecutor(
+            max_workers=max_workers, thread_name_prefix="scrat-encrypt"
+        ) as pool:
+
+            def schedule_unlink(archive_path: Path) -> None:
+                unlinks.append(unlink_pool.submit(archive_path.unlink))
+
+            def submit_archive(archive_path: Path) -> None:
+                # Blockiert den Compressor, wenn die Verschlüsselung hinterherhängt
+                pending.acquire()
+                future = pool.submit(
+                    self._encrypt_archive, archive_path, backup_dir, schedule_unlink
+                )
+                future.add_done_callback(lambda _: pending.release())
+                futures.append(future)
 
-            archive_base = backup_dir / "data.7z"
             archives = self.compressor.compress_files(
                 files=file_paths,
                 output_path=archive_base,
                 progress_callback=compress_progress,
+                archive_callback=submit_archive,
+                file_sizes=file_sizes,
             )
             logger.info(f"Komprimierung abgeschlossen: {len(archives)} Archive")
 
             progress.phase = "encrypting"
             self._report_progress(progress)
 
-            encrypted_archives = []
-            for archive_path in archives:
-                progress.current_file = archive_path.name
+            # Ergebnisse in Archiv-Reihenfolge einsammeln (erstes Archiv = Metadaten)
+            encrypted_archives: List[Path] = []
+            size_compressed = 0
+            for future in futures:
+                encrypted_path, encrypted_size = future.result()
+                progress.current_file = encrypted_path.name
                 self._report_progress(progress)
-                encrypted_path = backup_dir / f"{archive_path.name}.enc"
-                self.encryptor.encrypt_file(archive_path, encrypted_path)
                 encrypted_archives.append(encrypted_path)
-                archive_path.unlink()  # .7z nach Verschlüsselung löschen
-                logger.debug(f"Verschlüsselt (direkt): {archive_path.name}")
+                size_compressed += encrypted_size
+
+        # Fehler beim Löschen der .7z-Teile nicht verschlucken
+        for unlink in unlinks:
+            unlink.result()
+
+        return encrypted_archives, size_compressed
+
+    def _encrypt_archive(
+        self,
+        archive_path: Path,
+        backup_dir: Path,
+        schedule_unlink: Optional[Callable[[Path], None]] = None,
+    ) -> Tuple[Path, int]:
+        """
+        Verschlüsselt einen Archiv-Teil und löscht danach die .7z-Datei
 
-        return encrypted_archives
+        Läuft in einem Worker-Thread von _compress_encrypt_pipeline.
+
+        Args:
+            archive_path: Unverschlüsselter Archiv-Teil
+            backup_dir: Zielverzeichnis auf dem Backup-Medium
+            schedule_unlink: Optional, übernimmt das Löschen der .7z-Datei
+                (sonst wird direkt gelöscht)
+
+        Returns:
+            (Pfad zum verschlüsselten Archiv, geschriebene Bytes)
+        """
+        encrypted_path = backup_dir / f"{archive_path.name}.enc"
+        # fsync: .7z erst löschen, wenn die .enc-Datei sicher auf dem Medium liegt
+        # Ungepuffert in einen wiederverwendeten Puffer lesen (der Writer kopiert)
+        buffer = bytearray(Encryptor.CHUNK_SIZE)
+        view = memoryview(buffer)
+        with open(archive_path, "rb", buffering=0) as f_in, self.encryptor.open_encrypted_writer(
+            encrypted_path, fsync=True
+        ) as writer:
+            while n := f_in.readinto(buffer):
+                writer.write(view[:n])
+
+        # .7z nach Verschlüsselung löschen
+        if schedule_unlink is not None:
+            schedule_unlink(archive_path)
+        else:
+            archive_path.unlink()
+        logger.debug(f"Verschlüsselt: {archive_path.name}")
+        return encrypted_path, writer.bytes_written
 
     def _generate_backup_id(self, backup_type: str) -> str:
         """
@@ -879,18 +1215,34 @@ class BackupEngine:
         """
         Meldet Fortschritt via Callback
 
+        Updates innerhalb derselben Phase werden auf eines pro
+        PROGRESS_INTERVAL_NS gedrosselt; Phasenwechsel und das letzte
+        Update einer Phase (alle Dateien verarbeitet) werden immer gemeldet.
+        Solange die Gesamtanzahl noch unbekannt ist (Scan), wird gedrosselt.
+
         Args:
             progress: Aktuelle Progress-Informationen
         """
+        now = time.monotonic_ns()
+        with self._report_lock:
+            if (
+                progress.phase == self._last_report_phase
+                and now - self._last_report_ns < self.PROGRESS_INTERVAL_NS
+                and (progress.files_total == 0 or progress.files_processed < progress.files_total)
+            ):
+                return
+            self._last_report_ns = now
+            self._last_report_phase = progress.phase
+
         if self.progress_callback:
             # Sende Kopie, nicht Referenz (wichtig für korrekte Progress-Tracking)
-            from dataclasses import replace
-
             progress_copy = replace(progress, errors=progress.errors.copy())  # Auch errors kopieren
             self.progress_callback(progress_copy)
 
         logger.debug(
-            f"Progress: {progress.phase}, "
-            f"{progress.files_processed}/{progress.files_total} Dateien, "
-            f"{progress.progress_percentage:.1f}%"
+            "Progress: %s, %d/%d Dateien, %.1f%%",
+            progress.phase,
+            progress.files_processed,
+            progress.files_total,
+            progress.progress_percentage,
         )
@@ -4,24 +4,228 @@ Compressor für Scrat-Backup
 """
 
 import logging
+import os
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
 from pathlib import Path
-from typing import Callable, List, Optional
+from typing import BinaryIO, Callable, Dict, Iterator, List, Optional, Tuple, Union
 
 import py7zr
+from py7zr.callbacks import ExtractCallback
 
 logger = logging.getLogger(__name__)
 
 # Prüfe ob FILTER_ZSTD verfügbar ist (py7zr >= 0.20)
 _ZSTD_AVAILABLE = hasattr(py7zr, "FILTER_ZSTD")
 
+# Multi-Threaded zstd: py7zr erzeugt seinen zstd-Compressor ohne Worker-Threads.
+# Sofern die zstd-Bibliothek Worker unterstützt, ersetzt der Compressor während
+# er schreibt den Eintrag in py7zrs algorithm_class_map durch eine Variante mit
+# nb_workers (gleiches Frame-Format, Entpacken unverändert). Nach dem letzten
+# laufenden Schreibvorgang wird der Original-Eintrag wiederhergestellt; Worker
+# nutzt die Variante nur in Threads, die gerade ein Archiv des Compressors
+# schreiben – andere py7zr-Nutzer im Prozess bleiben single-threaded.
+try:
+    from py7zr import compressor as _py7zr_compressor
+
+    _zstd = _py7zr_compressor.zstd
+    _ZSTD_MT_AVAILABLE = (
+        _ZSTD_AVAILABLE
+        and _zstd.CompressionParameter.nb_workers.bounds()[1] > 0
+        and py7zr.FILTER_ZSTD in _py7zr_compressor.algorithm_class_map
+    )
+except (ImportError, AttributeError):
+    _ZSTD_MT_AVAILABLE = False
+
+# Gesamtzahl zstd-Worker pro Compressor-Aufruf (wird auf parallele Teile aufgeteilt)
+_ZSTD_THREADS = min(os.cpu_count() or 1, 8) if _ZSTD_MT_AVAILABLE else 1
+
+# zstd-Worker für im aktuellen Thread erzeugte Archive (0 = py7zr-Standard)
+_zstd_settings = threading.local()
+_zstd_install_lock = threading.Lock()
+# Laufende _zstd_worker_threads-Blöcke und der dabei ersetzte py7zr-Eintrag
+_zstd_active = 0
+_zstd_original_entry: Optional[tuple] = None
+
+if _ZSTD_MT_AVAILABLE:
+
+    class _MultiThreadZstdCompressor(_py7zr_compressor.ISevenZipCompressor):
+        """zstd-Compressor für py7zr mit Worker-Threads (nur innerhalb _zstd_worker_threads)"""
+
+        def __init__(self, level: int):
+            workers = getattr(_zstd_settings, "threads", 0)
+            options = {_zstd.CompressionParameter.compression_level: level}
+            if workers > 1:
+                options[_zstd.CompressionParameter.nb_workers] = workers
+            self.compressor = _zstd.ZstdCompressor(options=options)
+
+        def compress(self, data) -> bytes:
+            return self.compressor.compress(data)
+
+        def flush(self) -> bytes:
+            return self.compressor.flush()
+
+
+@contextmanager
+def _zstd_worker_threads(threads: int) -> Iterator[None]:
+    """
+    Aktiviert zstd-Worker für Archive, die im aktuellen Thread geschrieben werden
+
+    Der py7zr-Eintrag wird beim ersten aktiven Block ersetzt und beim Verlassen
+    des letzten wiederhergestellt (parallele Archiv-Teile teilen sich den Eintrag).
+
+    Args:
+        threads: Anzahl zstd-Worker (<= 1: ohne Worker)
+    """
+    global _zstd_active, _zstd_original_entry
+
+    if not _ZSTD_MT_AVAILABLE or threads <= 1:
+        yield
+        return
+
+    class_map = _py7zr_compressor.algorithm_class_map
+    with _zstd_install_lock:
+        if _zstd_active == 0:
+            _zstd_original_entry = class_map[py7zr.FILTER_ZSTD]
+            class_map[py7zr.FILTER_ZSTD] = (_MultiThreadZstdCompressor, _zstd_original_entry[1])
+        _zstd_active += 1
+
+    previous = getattr(_zstd_settings, "threads", 0)
+    _zstd_settings.threads = threads
+    try:
+        yield
+    finally:
+        _zstd_settings.threads = previous
+        with _zstd_install_lock:
+            _zstd_active -= 1
+            if _zstd_active == 0:
+                class_map[py7zr.FILTER_ZSTD] = _zstd_original_entry
+                _zstd_original_entry = None
+
+
+# Kernel-Readahead für kommende Quelldateien (Linux/BSD; nicht unter Windows/macOS)
+_FADVISE_AVAILABLE = hasattr(os, "posix_fadvise")
+
+
+def _advise_willneed(path: Path) -> None:
+    """
+    Kündigt dem Kernel an, dass eine Datei gleich gelesen wird
+
+    Der Kernel startet daraufhin asynchrones Readahead, sodass mehrere Dateien
+    gleichzeitig von der Platte geladen werden, während py7zr noch die
+    aktuelle komprimiert. Fehler werden ignoriert (reiner Performance-Hinweis).
+
+    Args:
+        path: Quelldatei
+    """
+    try:
+        fd = os.open(path, os.O_RDONLY)
+    except OSError:
+        return
+    try:
+        os.posix_fadvise(fd, 0, 0, os.POSIX_FADV_WILLNEED)
+    except OSError:
+        pass
+    finally:
+        os.close(fd)
+
+
+class _PrefetchReader(threading.Thread):
+    """
+    Liest kommende Quelldateien in einem Hintergrund-Thread vor
+
+    Ersatz für posix_fadvise auf Plattformen ohne Kernel-Readahead-Hinweis
+    (Windows/macOS): Der Thread liest bis zu `window` Dateien vor der gerade
+    komprimierten in einen wiederverwendeten Puffer. Die Daten landen so im
+    Page-Cache und py7zr liest sie anschließend ohne Platten-Wartezeit.
+    Große Dateien werden nur bis max_bytes vorgelesen – sequentielles Lesen
+    übernimmt dort ohnehin das Betriebssystem.
+    """
+
+    BUFFER_SIZE = 1024 * 1024
+
+    def __init__(self, files: List[Path], window: int, max_bytes: int):
+        super().__init__(name="scrat-prefetch", daemon=True)
+        self.files = files
+        self.max_bytes = max_bytes
+        self._slots = threading.Semaphore(window)
+        self._stopped = threading.Event()
+
+    def run(self) -> None:
+        buffer = bytearray(self.BUFFER_SIZE)
+        for file_path in self.files:
+            self._slots.acquire()
+            if self._stopped.is_set():
+                return
+            try:
+                with open(file_path, "rb", buffering=0) as f:
+                    remaining = self.max_bytes
+                    while remaining > 0:
+                        n = f.readinto(buffer)
+                        if not n:
+                            break
+                        remaining -= n
+            except OSError:
+                pass  # Reiner Performance-Hinweis, Fehler meldet py7zr selbst
+
+    def advance(self) -> None:
+        """Eine Datei wurde komprimiert – Fenster um eine Datei weiterschieben"""
+        self._slots.release()
+
+    def stop(self) -> None:
+        """Beendet den Thread (auch wenn noch Dateien ausstehen)"""
+        self._stopped.set()
+        self._slots.release()
+        self.join()
+
+
+class _ExtractProgress(ExtractCallback):
+    """
+    Meldet den Fortschritt pro Archiv-Eintrag, während py7zr noch entpackt
+
+    py7zr ruft die Methoden aus seinem Reporter-Thread auf; report_postprocess
+    folgt auf das letzte Eintrags-Event und signalisiert das Ende.
+    """
+
+    def __init__(self, progress_callback: Callable[[int, int, str], None], total: int):
+        self.progress_callback = progress_callback
+        self.total = total
+        self.done = 0
+        self.finished = threading.Event()
+
+    def report_start_preparation(self) -> None:
+        pass
+
+    def report_start(self, processing_file_path: str, processing_bytes: str) -> None:
+        pass
+
+    def report_update(self, decompressed_bytes: str) -> None:
+        pass
+
+    def report_end(self, processing_file_path: str, wrote_bytes: str) -> None:
+        self.done += 1
+        try:
+            self.progress_callback(self.done, self.total, processing_file_path)
+        except Exception as e:
+            # Fehler im Callback dürfen den Reporter-Thread nicht beenden
+            logger.warning(f"Progress-Callback beim Entpacken fehlgeschlagen: {e}")
+
+    def report_warning(self, message: str) -> None:
+        logger.warning(f"py7zr: {message}")
+
+    def report_postprocess(self) -> None:
+        self.finished.set()
+
 
 class Compressor:
     """
     Komprimiert Dateien zu 7z-Archiven
 
     Verantwortlichkeiten:
-    - 7z-Archive erstellen (zstd-Kompression, Fallback auf COPY)
-    - Split-Archive bei konfigurierbarer Größe
+    - 7z-Archive erstellen (zstd-Kompression, optional LZMA2, Fallback auf COPY)
+    - Split-Archive bei konfigurierbarer Größe (jeder Teil ist ein Solid-Block;
+      py7zr bietet keine kleinere Solid-Block-Größe, split_size bestimmt sie)
     - Progress-Callbacks für GUI
     - Entpacken von Archiven
     """
@@ -29,12 +233,27 @@ class Compressor:
     # Konstanten
     DEFAULT_COMPRESSION_LEVEL = 1  # zstd Level 1 (maximale Geschwindigkeit)
     DEFAULT_SPLIT_SIZE = 500 * 1024 * 1024  # 500 MB
-
+    READAHEAD_FILES = 32  # Anzahl Dateien, die vorab angekündigt werden
+    PREFETCH_FILES = 4  # Vorlese-Fenster ohne posix_fadvise (Dateien)
+    PREFETCH_MAX_BYTES = 8 * 1024 * 1024  # Pro Datei höchstens so viel vorlesen
+    DEFAULT_MAX_WORKERS = 4  # Parallel geschriebene Archiv-Teile (advanced.max_threads)
+    DEFAULT_ALGORITHM = "zstd"
+    EXTRACT_BUFFER_SIZE = 1024 * 1024  # Lese-Puffer für Archive (Python-Standard: 8 KiB)
+    EXTRACT_REPORT_TIMEOUT = 30  # Sekunden, die auf ausstehende Progress-Events gewartet wird
+    INFO_CACHE_SIZE = 256  # Maximale Anzahl gecachter get_archive_info()-Ergebnisse
+    # Unterstützte Algorithmen → 7z-Filter (Container bleibt .7z, Restore unverändert)
+    ALGORITHMS = {
+        "zstd": getattr(py7zr, "FILTER_ZSTD", None),
+        "lzma2": py7zr.FILTER_LZMA2,
+        "copy": py7zr.FILTER_COPY,
+    }
 
     def __init__(
         self,
         compression_level: int = DEFAULT_COMPRESSION_LEVEL,
         split_size: int = DEFAULT_SPLIT_SIZE,
+        max_workers: int = DEFAULT_MAX_WORKERS,
+        algorithm: str = DEFAULT_ALGORITHM,
     ):
         """
         Initialisiert Compressor
@@ -42,22 +261,48 @@ class Compressor:
         Args:
             compression_level: Komprimierungs-Level (0-9, Standard: 5)
             split_size: Maximale Größe pro Archive-Teil in Bytes (Standard: 500MB)
+            max_workers: Maximale Anzahl gleichzeitig geschriebener Archiv-Teile
+            algorithm: Kompressions-Algorithmus ("zstd", "lzma2" oder "copy")
         """
+        if algorithm not in self.ALGORITHMS:
+            raise ValueError(
+                f"Unbekannter Algorithmus '{algorithm}' "
+                f"(erlaubt: {', '.join(self.ALGORITHMS)})"
+            )
+
         if not 0 <= compression_level <= 9:
             raise ValueError("compression_level muss zwischen 0 und 9 liegen")
 
         if split_size < 1024 * 1024:  # Mindestens 1MB
             raise ValueError("split_size muss mindestens 1MB sein")
 
+        if max_workers < 1:
+            raise ValueError("max_workers muss mindestens 1 sein")
+
         self.compression_level = compression_level
         self.split_size = split_size
-
-        if _ZSTD_AVAILABLE:
+        self.max_workers = max_workers
+        self.algorithm = algorithm
+        # Archiv-Pfad → ((mtime_ns, Größe), Info) – spart erneutes Header-Parsen
+        self._info_cache: Dict[Path, Tuple[Tuple[int, int], dict]] = {}
+
+        if algorithm != "zstd":
+            # Filter-Konfiguration einmalig festlegen (gilt für alle Archiv-Teile)
+            self._filters = [{"id": self.ALGORITHMS[algorithm]}]
+            if algorithm == "lzma2":
+                self._filters[0]["preset"] = compression_level
             logger.info(
-                f"Compressor initialisiert: zstd Level={compression_level}, "
+                f"Compressor initialisiert: {algorithm} Level={compression_level}, "
                 f"Split-Size={split_size / 1024 / 1024:.0f}MB"
             )
+        elif _ZSTD_AVAILABLE:
+            self._filters = [{"id": py7zr.FILTER_ZSTD, "level": compression_level}]
+            logger.info(
+                f"Compressor initialisiert: zstd Level={compression_level} "
+                f"({_ZSTD_THREADS} Threads), Split-Size={split_size / 1024 / 1024:.0f}MB"
+            )
         else:
+            self._filters = [{"id": py7zr.FILTER_COPY}]
             logger.warning(
                 "FILTER_ZSTD nicht verfügbar (py7zr < 0.20) – "
                 "nutze FILTER_COPY (keine Kompression)"
@@ -73,6 +318,9 @@ class Compressor:
         output_path: Path,
         base_dir: Optional[Path] = None,
         progress_callback: Optional[Callable[[int, int, str], None]] = None,
+        archive_callback: Optional[Callable[[Path], None]] = None,
+        sink_factory: Optional[Callable[[Path], BinaryIO]] = None,
+        file_sizes: Optional[Dict[Path, int]] = None,
     ) -> List[Path]:
         """
         Komprimiert Dateien zu einem oder mehreren 7z-Archiven
@@ -82,6 +330,14 @@ class Compressor:
             output_path: Basis-Pfad für Output-Archive (z.B. backup.7z)
             base_dir: Basis-Verzeichnis für relative Pfade im Archiv
             progress_callback: Optional Callback(current, total, filename)
+            archive_callback: Optional Callback(archive_path), wird aufgerufen
+                sobald ein Archiv-Teil fertig geschrieben ist
+            sink_factory: Optional Factory(archive_path) → schreibbarer Stream.
+                Archive werden dann in diesen Stream statt nach archive_path
+                geschrieben (z.B. direkt verschlüsselt); der Stream wird nach
+                dem Schreiben geschlossen
+            file_sizes: Optional bereits bekannte Dateigrößen (z.B. aus dem Scan);
+                nur Dateien ohne Eintrag werden per stat() ermittelt
 
         Returns:
             Liste der erstellten Archive-Pfade
@@ -94,8 +350,9 @@ class Compressor:
         # Archive-Liste
         archives: List[Path] = []
 
-        # Prüfe, ob Split nötig ist
-        total_size = sum(f.stat().st_size for f in files if f.exists())
+        # Prüfe, ob Split nötig ist (jede Datei wird genau einmal ge-stat-et)
+        sized_files = self._stat_files(files, file_sizes)
+        total_size = sum(size for size, _ in sized_files)
         needs_split = total_size > self.split_size
 
         if needs_split:
@@ -103,20 +360,59 @@ class Compressor:
                 f"Gesamt-Größe {total_size / 1024 / 1024:.1f}MB "
                 f"überschreitet Split-Size, erstelle Multi-Volume-Archiv"
             )
-            archives = self._compress_split(files, output_path, base_dir, progress_callback)
+            archives = self._compress_split(
+                sized_files,
+                output_path,
+                base_dir,
+                progress_callback,
+                archive_callback,
+                sink_factory,
+            )
         else:
             logger.info("Erstelle Single-Volume-Archiv")
-            archives = [self._compress_single(files, output_path, base_dir, progress_callback)]
+            archives = [
+                self._compress_single(files, output_path, base_dir, progress_callback, sink_factory)
+            ]
+            if archive_callback:
+                archive_callback(archives[0])
 
         logger.info(f"Komprimierung abgeschlossen: {len(archives)} Archive erstellt")
         return archives
 
+    @staticmethod
+    def _stat_files(
+        files: List[Path], file_sizes: Optional[Dict[Path, int]] = None
+    ) -> List[Tuple[int, Path]]:
+        """
+        Ermittelt die Größe aller Dateien mit höchstens einem stat() pro Datei
+
+        Args:
+            files: Liste der Dateien
+            file_sizes: Optional bereits bekannte Größen (Pfad → Bytes)
+
+        Returns:
+            Liste von (Größe, Pfad); nicht mehr vorhandene Dateien fehlen
+        """
+        known = file_sizes or {}
+        sized_files: List[Tuple[int, Path]] = []
+        for file_path in files:
+            size = known.get(file_path)
+            if size is None:
+                try:
+                    size = os.stat(file_path).st_size
+                except OSError:
+                    continue
+            sized_files.append((size, file_path))
+        return sized_files
+
     def _compress_single(
         self,
         files: List[Path],
         output_path: Path,
         base_dir: Optional[Path] = None,
         progress_callback: Optional[Callable[[int, int, str], None]] = None,
+        sink_factory: Optional[Callable[[Path], BinaryIO]] = None,
+        zstd_threads: int = _ZSTD_THREADS,
     ) -> Path:
         """
         Komprimiert Dateien zu einem einzelnen 7z-Archiv
@@ -126,147 +422,250 @@ class Compressor:
             output_path: Output-Archiv-Pfad
             base_dir: Basis-Verzeichnis für relative Pfade
             progress_callback: Optional Callback
+            sink_factory: Optional Factory für den Ziel-Stream (statt output_path)
+            zstd_threads: zstd-Worker für dieses Archiv
 
         Returns:
             Pfad zum erstellten Archiv
         """
-        # Stelle sicher, dass Output-Verzeichnis existiert
-        output_path.parent.mkdir(parents=True, exist_ok=True)
-
-        # Filter-Konfiguration: zstd wenn verfügbar, sonst COPY
-        if _ZSTD_AVAILABLE:
-            filters = [{"id": py7zr.FILTER_ZSTD, "level": self.compression_level}]
-            logger.debug(f"Nutze zstd-Kompression (Level {self.compression_level})")
+        if sink_factory is not None:
+            sink = sink_factory(output_path)
+            try:
+                self._write_archive(files, sink, base_dir, progress_callback, zstd_threads)
+                archive_size = sink.tell()
+            finally:
+                sink.close()
         else:
-            filters = [{"id": py7zr.FILTER_COPY}]
-            logger.debug("Nutze COPY (kein zstd verfügbar)")
+            # Stelle sicher, dass Output-Verzeichnis existiert
+            output_path.parent.mkdir(parents=True, exist_ok=True)
+            self._write_archive(files, output_path, base_dir, progress_callback, zstd_threads)
+            archive_size = output_path.stat().st_size
+
+        logger.info(f"Archiv erstellt: {output_path.name} " f"({archive_size / 1024 / 1024:.1f}MB)")
+
+        return output_path
+
+    def _write_archive(
+        self,
+        files: List[Path],
+        target: Union[Path, BinaryIO],
+        base_dir: Optional[Path] = None,
+        progress_callback: Optional[Callable[[int, int, str], None]] = None,
+        zstd_threads: int = _ZSTD_THREADS,
+    ) -> None:
+        """
+        Schreibt Dateien als 7z-Archiv in einen Pfad oder Stream
+
+        Args:
+            files: Liste der zu komprimierenden Dateien
+            target: Archiv-Pfad oder schreibbarer, seekbarer Stream
+            base_dir: Basis-Verzeichnis für relative Pfade
+            progress_callback: Optional Callback
+            zstd_threads: zstd-Worker für dieses Archiv
+        """
+        # py7zr erzeugt den zstd-Compressor beim Öffnen und Schreiben im aktuellen Thread
+        with _zstd_worker_threads(zstd_threads):
+            self._write_archive_files(files, target, base_dir, progress_callback)
+
+    def _write_archive_files(
+        self,
+        files: List[Path],
+        target: Union[Path, BinaryIO],
+        base_dir: Optional[Path],
+        progress_callback: Optional[Callable[[int, int, str], None]],
+    ) -> None:
+        """Schreibt die Dateien ins Archiv (siehe _write_archive)"""
+        # Filter-Konfiguration aus __init__ (zstd wenn verfügbar, sonst COPY)
+        filters = self._filters
 
         try:
-            archive = py7zr.SevenZipFile(output_path, "w", filters=filters, multithread=True)
+            archive = py7zr.SevenZipFile(target, "w", filters=filters, multithread=True)
         except TypeError:
             # Fallback für ältere py7zr-Versionen ohne multithread-Argument
             logger.warning("py7zr unterstützt kein multithread-Argument - nutze Single-Thread")
-            archive = py7zr.SevenZipFile(output_path, "w", filters=filters)
+            archive = py7zr.SevenZipFile(target, "w", filters=filters)
 
-        with archive:
+        readahead = self.READAHEAD_FILES if _FADVISE_AVAILABLE else 0
+        for file_path in files[:readahead]:
+            _advise_willneed(file_path)
 
-            for idx, file_path in enumerate(files):
-                if not file_path.exists():
-                    logger.warning(f"Datei nicht gefunden, überspringe: {file_path}")
-                    continue
+        # Ohne Kernel-Hinweis: Lesen und Komprimieren über einen Vorlese-Thread überlappen
+        prefetcher: Optional[_PrefetchReader] = None
+        if not _FADVISE_AVAILABLE and len(files) > 1:
+            prefetcher = _PrefetchReader(files, self.PREFETCH_FILES, self.PREFETCH_MAX_BYTES)
+            prefetcher.start()
 
-                # Berechne relativen Pfad im Archiv
-                arcname: str
-                if base_dir:
-                    try:
-                        arcname = str(file_path.relative_to(base_dir))
-                    except ValueError:
-                        # Datei ist nicht unter base_dir
-                        arcname = file_path.name
-                else:
-                    arcname = file_path.name
-
-                # Füge Datei zum Archiv hinzu
-                archive.write(file_path, arcname=arcname)
+        # Präfix-Vergleich auf den Pfad-Teilen statt relative_to() pro Datei
+        # (spart den ValueError-Kontrollfluss bei Dateien außerhalb von base_dir)
+        base_parts = base_dir.parts if base_dir else ()
+        base_len = len(base_parts)
 
-                # Progress-Callback
-                if progress_callback:
-                    progress_callback(idx + 1, len(files), str(file_path))
+        try:
+            with archive:
+                for idx, file_path in enumerate(files):
+                    # Readahead-Fenster weiterschieben
+                    if readahead and idx + readahead < len(files):
+                        _advise_willneed(files[idx + readahead])
+                    if prefetcher is not None and idx:
+                        prefetcher.advance()
+
+                    # Berechne relativen Pfad im Archiv
+                    parts = file_path.parts
+                    if base_len and len(parts) > base_len and parts[:base_len] == base_parts:
+                        arcname = os.sep.join(parts[base_len:])
+                    else:
+                        # Kein base_dir oder Datei ist nicht unter base_dir
+                        arcname = file_path.name
 
-                logger.debug(f"Hinzugefügt: {arcname}")
+                    # Füge Datei zum Archiv hinzu. Bewusst per Pfad statt writef():
+                    # py7zr liest ohnehin in 1-MiB-Blöcken (kein Voll-Puffer), writef()
+                    # akzeptiert kein mmap und speichert weder mtime noch Attribute,
+                    # die extractall() beim Restore wiederherstellt.
+                    # Kein exists() vorab: py7zr stat-et die Datei ohnehin, bevor
+                    # sie ins Archiv aufgenommen wird
+                    try:
+                        archive.write(file_path, arcname=arcname)
+                    except FileNotFoundError:
+                        logger.warning(f"Datei nicht gefunden, überspringe: {file_path}")
+                        continue
 
-        archive_size = output_path.stat().st_size
-        logger.info(f"Archiv erstellt: {output_path.name} " f"({archive_size / 1024 / 1024:.1f}MB)")
+                    # Progress-Callback
+                    if progress_callback:
+                        progress_callback(idx + 1, len(files), str(file_path))
 
-        return output_path
+                    logger.debug("Hinzugefügt: %s", arcname)
+        finally:
+            if prefetcher is not None:
+                prefetcher.stop()
 
     def _compress_split(
         self,
-        files: List[Path],
+        sized_files: List[Tuple[int, Path]],
         output_path: Path,
         base_dir: Optional[Path] = None,
         progress_callback: Optional[Callable[[int, int, str], None]] = None,
+        archive_callback: Optional[Callable[[Path], None]] = None,
+        sink_factory: Optional[Callable[[Path], BinaryIO]] = None,
     ) -> List[Path]:
         """
         Komprimiert Dateien zu mehreren 7z-Archiven (Split)
 
         Args:
-            files: Liste der zu komprimierenden Dateien
+            sized_files: Liste von (Größe, Pfad) aus _stat_files
             output_path: Basis-Pfad für Output-Archive
             base_dir: Basis-Verzeichnis für relative Pfade
             progress_callback: Optional Callback
+            archive_callback: Optional Callback pro fertigem Archiv-Teil
+            sink_factory: Optional Factory für den Ziel-Stream pro Archiv-Teil
 
         Returns:
             Liste der erstellten Archive-Pfade
         """
+        chunks = self._pack_chunks(sized_files)
+
+        archive_paths = [
+            self._get_split_path(output_path, index) for index in range(1, len(chunks) + 1)
+        ]
+
+        # Fortschritt über alle Teile zählen (Teile laufen ggf. parallel)
+        total_files = sum(len(chunk) for chunk in chunks)
+        progress_lock = threading.Lock()
+        files_done = 0
+
+        def chunk_progress(current: int, total: int, filename: str) -> None:
+            nonlocal files_done
+            with progress_lock:
+                files_done += 1
+                if progress_callback:
+                    progress_callback(files_done, total_files, filename)
+
         archives: List[Path] = []
+        workers = min(self.max_workers, len(chunks))
+        # zstd-Worker auf die parallel geschriebenen Teile aufteilen (Gesamt-Obergrenze)
+        zstd_threads = max(1, _ZSTD_THREADS // max(workers, 1))
 
-        # Sortiere Dateien nach Größe (größte zuerst)
-        sorted_files = sorted(
-            files, key=lambda f: f.stat().st_size if f.exists() else 0, reverse=True
-        )
+        def write_chunk(chunk: List[Path], archive_path: Path) -> Path:
+            return self._compress_single(
+                chunk, archive_path, base_dir, chunk_progress, sink_factory, zstd_threads
+            )
 
-        # Teile Dateien in Chunks basierend auf split_size
-        current_chunk: List[Path] = []
-        current_size = 0
-        chunk_index = 1
+        if workers <= 1:
+            for chunk, archive_path in zip(chunks, archive_paths):
+                archives.append(write_chunk(chunk, archive_path))
+                # Fertigen Teil sofort weiterreichen (z.B. an Verschlüsselung)
+                if archive_callback:
+                    archive_callback(archive_path)
+            return archives
+
+        # Jeder Teil ist ein eigenständiges Archiv → parallel schreiben.
+        # zstd gibt den GIL während der Kompression frei, Threads genügen.
+        logger.info(f"Schreibe {len(chunks)} Archiv-Teile mit {workers} Threads")
+        with ThreadPoolExecutor(max_workers=workers, thread_name_prefix="scrat-7z") as pool:
+            futures = [
+                pool.submit(write_chunk, chunk, archive_path)
+                for chunk, archive_path in zip(chunks, archive_paths)
+            ]
+            # In Teil-Reihenfolge weiterreichen (erstes Archiv = Metadaten),
+            # Fehler eines Workers werden hier weitergereicht
+            for future in futures:
+                archive_path = future.result()
+                archives.append(archive_path)
+                if archive_callback:
+                    archive_callback(archive_path)
+        return archives
 
-        for file_path in sorted_files:
-            if not file_path.exists():
-                continue
+    def _pack_chunks(self, sized_files: List[Tuple[int, Path]]) -> List[List[Path]]:
+        """
+        Verteilt Dateien per First-Fit-Decreasing auf Archiv-Teile
 
-            file_size = file_path.stat().st_size
+        Jede Datei (größte zuerst) kommt in den ersten Teil, in dem noch Platz
+        ist – nicht nur in den zuletzt geöffneten. Kleine Dateien füllen so die
+        Lücken früherer Teile auf, es entstehen weniger, vollere Teile.
 
+        Args:
+            sized_files: Liste von (Größe, Pfad)
+
+        Returns:
+            Liste der Teile (Dateilisten) in Archiv-Reihenfolge
+        """
+        # Sortiere Dateien nach Größe (größte zuerst), Größen sind bereits bekannt
+        sorted_files = sorted(sized_files, key=lambda item: item[0], reverse=True)
+        if not sorted_files:
+            return []
+        smallest = sorted_files[-1][0]
+
+        chunks: List[List[Path]] = []
+        # Teile mit Restplatz: [freie Bytes, Index in chunks]
+        open_bins: List[List[int]] = []
+
+        for file_size, file_path in sorted_files:
             # Wenn aktuelle Datei alleine schon zu groß ist
             if file_size > self.split_size:
-                # Speichere aktuellen Chunk, falls vorhanden
-                if current_chunk:
-                    archive_path = self._get_split_path(output_path, chunk_index)
-                    archives.append(
-                        self._compress_single(
-                            current_chunk, archive_path, base_dir, progress_callback
-                        )
-                    )
-                    chunk_index += 1
-                    current_chunk = []
-                    current_size = 0
-
                 # Erstelle eigenes Archiv für große Datei
                 logger.warning(
                     f"Datei {file_path.name} ist größer als split_size "
                     f"({file_size / 1024 / 1024:.1f}MB), "
                     f"erstelle eigenes Archiv"
                 )
-                archive_path = self._get_split_path(output_path, chunk_index)
-                archives.append(
-                    self._compress_single([file_path], archive_path, base_dir, progress_callback)
-                )
-                chunk_index += 1
+                chunks.append([file_path])
                 continue
 
-            # Prüfe, ob Datei in aktuellen Chunk passt
-            if current_size + file_size > self.split_size and current_chunk:
-                # Speichere aktuellen Chunk
-                archive_path = self._get_split_path(output_path, chunk_index)
-                archives.append(
-                    self._compress_single(current_chunk, archive_path, base_dir, progress_callback)
-                )
-                chunk_index += 1
-                current_chunk = []
-                current_size = 0
-
-            # Füge Datei zu aktuellem Chunk hinzu
-            current_chunk.append(file_path)
-            current_size += file_size
-
-        # Speichere letzten Chunk
-        if current_chunk:
-            archive_path = self._get_split_path(output_path, chunk_index)
-            archives.append(
-                self._compress_single(current_chunk, archive_path, base_dir, progress_callback)
-            )
+            for open_bin in open_bins:
+                if open_bin[0] >= file_size:
+                    break
+            else:
+                open_bin = [self.split_size, len(chunks)]
+                open_bins.append(open_bin)
+                chunks.append([])
 
-        return archives
+            chunks[open_bin[1]].append(file_path)
+            open_bin[0] -= file_size
+
+            # Volle Teile nicht mehr durchsuchen (keine verbleibende Datei passt)
+            if open_bin[0] < smallest:
+                open_bins.remove(open_bin)
+
+        return chunks
 
     def _get_split_path(self, base_path: Path, index: int) -> Path:
         """
@@ -313,31 +712,36 @@ class Compressor:
 
         extracted_files: List[Path] = []
 
-        # Entpacke Archiv
-        with py7zr.SevenZipFile(archive_path, "r") as archive:
-            # Hole Liste aller Dateien im Archiv
-            all_names = archive.getnames()
-            total_files = len(all_names)
+        # Entpacke Archiv. Eigener Puffer statt 8 KiB: Header und kleine
+        # Member werden sonst in vielen kleinen read()-Aufrufen gelesen
+        with open(
+            archive_path, "rb", buffering=self.EXTRACT_BUFFER_SIZE
+        ) as archive_file, py7zr.SevenZipFile(archive_file, "r") as archive:
+            # Hole Einträge aus dem bereits geparsten Header (inkl. Datei/Verzeichnis)
+            entries = archive.list()
+            total_files = len(entries)
 
             logger.info(f"Archiv enthält {total_files} Dateien")
 
-            # Entpacke alle Dateien
-            archive.extractall(path=output_dir)
-
-            # Sammle entpackte Dateien (nur Dateien, keine Verzeichnisse!)
-            for idx, name in enumerate(all_names):
-                extracted_path = output_dir / name
-
-                # Nur Dateien hinzufügen, keine Verzeichnisse
-                if extracted_path.is_file():
-                    extracted_files.append(extracted_path)
-                    logger.debug(f"Entpackt (Datei): {name}")
+            # Entpacke alle Dateien; py7zr schreibt jeden Eintrag direkt auf die
+            # Platte, der Fortschritt wird pro Eintrag noch während des Entpackens gemeldet
+            if progress_callback:
+                reporter = _ExtractProgress(progress_callback, total_files)
+                archive.extractall(path=output_dir, callback=reporter)
+                # Reporter-Thread arbeitet die letzten Events nach extractall() ab
+                if not reporter.finished.wait(self.EXTRACT_REPORT_TIMEOUT):
+                    logger.warning("Progress-Events beim Entpacken nicht vollständig gemeldet")
+            else:
+                archive.extractall(path=output_dir)
+
+            # Sammle entpackte Dateien (nur Dateien, keine Verzeichnisse!) –
+            # klassifiziert über die Archiv-Metadaten statt is_file() pro Eintrag
+            for entry in entries:
+                if entry.is_directory:
+                    logger.debug("Entpackt (Verzeichnis, übersprungen): %s", entry.filename)
                 else:
-                    logger.debug(f"Entpackt (Verzeichnis, übersprungen): {name}")
-
-                # Progress-Callback
-                if progress_callback:
-                    progress_callback(idx + 1, total_files, name)
+                    extracted_files.append(output_dir / entry.filename)
+                    logger.debug("Entpackt (Datei): %s", entry.filename)
 
         logger.info(f"Entpacken abgeschlossen: {len(extracted_files)} Dateien")
         return extracted_files
@@ -351,19 +755,43 @@ class Compressor:
         """
         Entpackt mehrere Split-Archive
 
+        Die Teile sind eigenständige Archive mit disjunkten Dateien und werden
+        mit bis zu max_workers Threads parallel entpackt.
+
         Args:
             archive_paths: Liste der Archive-Pfade (in Reihenfolge)
             output_dir: Ziel-Verzeichnis
-            progress_callback: Optional Callback
+            progress_callback: Optional Callback (current/total je Archiv-Teil)
 
         Returns:
-            Liste aller entpackten Dateien
+            Liste aller entpackten Dateien (in Archiv-Reihenfolge)
         """
         all_extracted: List[Path] = []
 
-        for archive_path in archive_paths:
-            extracted = self.extract_archive(archive_path, output_dir, progress_callback)
-            all_extracted.extend(extracted)
+        workers = min(self.max_workers, len(archive_paths))
+        if workers <= 1:
+            for archive_path in archive_paths:
+                extracted = self.extract_archive(archive_path, output_dir, progress_callback)
+                all_extracted.extend(extracted)
+            return all_extracted
+
+        # Callback-Aufrufe aus mehreren Threads serialisieren
+        callback = None
+        if progress_callback:
+            callback_lock = threading.Lock()
+
+            def callback(current: int, total: int, filename: str) -> None:
+                with callback_lock:
+                    progress_callback(current, total, filename)
+
+        output_dir.mkdir(parents=True, exist_ok=True)
+        with ThreadPoolExecutor(max_workers=workers, thread_name_prefix="scrat-unzip") as pool:
+            futures = [
+                pool.submit(self.extract_archive, archive_path, output_dir, callback)
+                for archive_path in archive_paths
+            ]
+            for future in futures:
+                all_extracted.extend(future.result())
 
         return all_extracted
 
@@ -377,8 +805,16 @@ class Compressor:
         Returns:
             Dict mit Archiv-Informationen
         """
-        if not archive_path.exists():
-            raise FileNotFoundError(f"Archiv nicht gefunden: {archive_path}")
+        try:
+            st = archive_path.stat()
+        except FileNotFoundError:
+            raise FileNotFoundError(f"Archiv nicht gefunden: {archive_path}") from None
+
+        # Unverändertes Archiv (gleiche mtime und Größe): Header nicht erneut parsen
+        version = (st.st_mtime_ns, st.st_size)
+        cached = self._info_cache.get(archive_path)
+        if cached is not None and cached[0] == version:
+            return dict(cached[1])
 
         with py7zr.SevenZipFile(archive_path, "r") as archive:
             file_list = archive.list()
@@ -389,12 +825,15 @@ class Compressor:
 
             info = {
                 "path": str(archive_path),
-                "size": archive_path.stat().st_size,
+                "size": st.st_size,
                 "files": total_files,
                 "uncompressed_size": total_size,
-                "compression_ratio": (
-                    (1 - (archive_path.stat().st_size / total_size)) if total_size > 0 else 0
-                ),
+                "compression_ratio": (1 - (st.st_size / total_size)) if total_size > 0 else 0,
             }
 
-        return info
+        if archive_path not in self._info_cache and len(self._info_cache) >= self.INFO_CACHE_SIZE:
+            # Ältesten Eintrag verwerfen (dict behält die Einfüge-Reihenfolge)
+            del self._info_cache[next(iter(self._info_cache))]
+        self._info_cache[archive_path] = (version, info)
+
+        return dict(info)
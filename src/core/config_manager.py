@@ -5,11 +5,18 @@ Verwaltet Konfiguration in JSON-Datei
 
 import json
 import logging
+import os
+import tempfile
 from pathlib import Path
 from typing import Any, Dict, Optional
 
 from utils.paths import get_app_data_dir
 
+try:
+    import orjson  # Optional: C-Parser, schnelleres Laden/Speichern der Config
+except ImportError:
+    orjson = None
+
 logger = logging.getLogger(__name__)
 
 
@@ -86,12 +93,36 @@ class ConfigManager:
 
         logger.info(f"ConfigManager initialisiert: {self.config_file}")
 
+    @classmethod
+    def from_dict(
+        cls, data: Dict[str, Any], config_file: Optional[Path] = None
+    ) -> "ConfigManager":
+        """
+        Erstellt ConfigManager aus bereits geparsten Daten (ohne Datei-Lesen)
+
+        Args:
+            data: Geladene Konfiguration (wird mit Defaults gemerged)
+            config_file: Pfad zur Config-Datei für spätere save()-Aufrufe
+
+        Returns:
+            ConfigManager-Instanz
+        """
+        instance = cls.__new__(cls)
+        instance.config_file = (
+            config_file if config_file is not None else get_app_data_dir() / "config.json"
+        )
+        instance.config = instance._merge_config(cls.DEFAULTS, data)
+        return instance
+
     def load(self) -> None:
         """Lädt Konfiguration aus Datei"""
         if self.config_file.exists():
             try:
-                with open(self.config_file, "r", encoding="utf-8") as f:
-                    loaded_config = json.load(f)
+                if orjson is not None:
+                    loaded_config = orjson.loads(self.config_file.read_bytes())
+                else:
+                    with open(self.config_file, "r", encoding="utf-8") as f:
+                        loaded_config = json.load(f)
 
                 # Merge mit Defaults (neue Einstellungen hinzufügen)
                 self.config = self._merge_config(self.DEFAULTS, loaded_config)
@@ -113,9 +144,24 @@ class ConfigManager:
             # Erstelle Verzeichnis falls nötig
             self.config_file.parent.mkdir(parents=True, exist_ok=True)
 
-            # Speichere JSON
-            with open(self.config_file, "w", encoding="utf-8") as f:
-                json.dump(self.config, f, indent=2, ensure_ascii=False)
+            # Speichere JSON atomar: erst Temp-Datei, dann ersetzen – ein Absturz
+            # beim Schreiben hinterlässt nie eine halbe config.json
+            data = self._dump_json(self.config)
+            fd, tmp_name = tempfile.mkstemp(
+                dir=self.config_file.parent, prefix=f".{self.config_file.name}.", suffix=".tmp"
+            )
+            try:
+                with os.fdopen(fd, "wb") as f:
+                    f.write(data)
+                    f.flush()
+                    os.fsync(f.fileno())
+                if self.config_file.exists():
+                    # Rechte der bisherigen Datei beibehalten (mkstemp: 0600)
+                    os.chmod(tmp_name, self.config_file.stat().st_mode & 0o777)
+                os.replace(tmp_name, self.config_file)
+            except BaseException:
+                Path(tmp_name).unlink(missing_ok=True)
+                raise
 
             logger.info(f"Konfiguration gespeichert: {self.config_file}")
 
@@ -123,6 +169,25 @@ class ConfigManager:
             logger.error(f"Fehler beim Speichern der Konfiguration: {e}", exc_info=True)
             raise
 
+    @staticmethod
+    def _dump_json(config: Dict[str, Any]) -> bytes:
+        """
+        Serialisiert die Konfiguration als UTF-8-JSON (2 Leerzeichen Einrückung)
+
+        Args:
+            config: Konfiguration
+
+        Returns:
+            JSON als Bytes
+        """
+        if orjson is not None:
+            try:
+                return orjson.dumps(config, option=orjson.OPT_INDENT_2 | orjson.OPT_NON_STR_KEYS)
+            except TypeError:
+                # z.B. Integer > 64 Bit – stdlib json kann das
+                pass
+        return json.dumps(config, indent=2, ensure_ascii=False).encode("utf-8")
+
     def reset_to_defaults(self) -> None:
         """Setzt Konfiguration auf Defaults zurück"""
         self.config = self._deep_copy(self.DEFAULTS)
@@ -183,10 +248,12 @@ class ConfigManager:
 
     def _merge_config(self, defaults: Dict, loaded: Dict) -> Dict:
         """
-        Merged geladene Config mit Defaults (rekursiv)
+        Merged geladene Config mit Defaults (Sektion für Sektion)
 
         Neue Keys aus defaults werden hinzugefügt,
-        existierende Werte aus loaded bleiben erhalten.
+        existierende Werte aus loaded bleiben erhalten. DEFAULTS ist genau
+        zwei Ebenen tief (Sektion → Werte), daher genügt ein update() pro
+        Sektion statt einer Rekursion mit erneuter Kopie je Ebene.
 
         Args:
             defaults: Default-Konfiguration
@@ -198,9 +265,9 @@ class ConfigManager:
         result = self._deep_copy(defaults)
 
         for key, value in loaded.items():
-            if key in result and isinstance(result[key], dict) and isinstance(value, dict):
-                # Rekursiv mergen
-                result[key] = self._merge_config(result[key], value)
+            section = result.get(key)
+            if isinstance(section, dict) and isinstance(value, dict):
+                section.update(value)
             else:
                 # Wert übernehmen
                 result[key] = value
@@ -1,26 +1,276 @@
 """
 Encryptor für Scrat-Backup
-AES-256-GCM Verschlüsselung mit PBKDF2 Key-Derivation
+AES-256-GCM Verschlüsselung mit scrypt/PBKDF2 Key-Derivation
 """
 
+import atexit
+import ctypes
+import functools
+import hashlib
+import io
 import logging
+import os
+import platform
 import secrets
+import threading
+import time
+import weakref
+from collections import OrderedDict, deque
+from concurrent.futures import Future, ThreadPoolExecutor
 from pathlib import Path
-from typing import BinaryIO, Optional, Tuple
+from typing import Any, BinaryIO, Callable, Deque, Dict, Iterator, Optional, Tuple
 
+from cryptography.exceptions import InvalidTag
 from cryptography.hazmat.primitives import hashes
+from cryptography.hazmat.primitives.ciphers import Cipher, algorithms, modes
 from cryptography.hazmat.primitives.ciphers.aead import AESGCM
 from cryptography.hazmat.primitives.kdf.pbkdf2 import PBKDF2HMAC
+from cryptography.hazmat.primitives.kdf.scrypt import Scrypt
 
 logger = logging.getLogger(__name__)
 
 
+KEY_CACHE_SIZE = 8  # Maximale Anzahl zwischengespeicherter Keys
+
+# LRU-Cache abgeleiteter Keys: (SHA-256 des Passworts, Salt, KDF, Länge) -> Key.
+# Das Passwort selbst wird nicht als Cache-Schlüssel gehalten; Keys liegen in
+# bytearrays, damit sie beim Verdrängen/Leeren überschrieben werden können.
+_key_cache: "OrderedDict[Tuple[bytes, bytes, str, int], bytearray]" = OrderedDict()
+_key_cache_lock = threading.Lock()
+
+
+def _derive_key_cached(password: str, salt: bytes, kdf: str, length: int) -> bytes:
+    """
+    Key-Derivation (PBKDF2 oder scrypt) mit Cache für wiederholte (Passwort, Salt)-Paare
+
+    Mehrere Encryptor-Instanzen mit demselben Salt (z.B. beim Restore mehrerer
+    Archive eines Backups) leiten den Key so nur einmal ab.
+
+    Args:
+        password: Master-Passwort
+        salt: Salt für Key-Derivation
+        kdf: KDF-Kennung inkl. Parameter (z.B. "scrypt:n=32768,r=8,p=1")
+        length: Key-Länge in Bytes
+
+    Returns:
+        Abgeleiteter Key
+    """
+    cache_key = (hashlib.sha256(password.encode("utf-8")).digest(), salt, kdf, length)
+    with _key_cache_lock:
+        cached = _key_cache.get(cache_key)
+        if cached is not None:
+            _key_cache.move_to_end(cache_key)
+            return bytes(cached)
+
+    # Ableitung außerhalb des Locks (dauert je nach KDF bis zu ~100 ms)
+    key = _derive_key(password, salt, kdf, length)
+
+    with _key_cache_lock:
+        _key_cache[cache_key] = bytearray(key)
+        _key_cache.move_to_end(cache_key)
+        while len(_key_cache) > KEY_CACHE_SIZE:
+            _, evicted = _key_cache.popitem(last=False)
+            _wipe(evicted)
+    return key
+
+
+def _wipe(buffer: bytearray) -> None:
+    """
+    Überschreibt einen Puffer in-place mit Nullen (ohne Kopie)
+
+    Args:
+        buffer: Zu löschender Puffer
+    """
+    if buffer:
+        ctypes.memset(ctypes.addressof(ctypes.c_char.from_buffer(buffer)), 0, len(buffer))
+
+
+@atexit.register
+def _clear_key_cache() -> None:
+    """Überschreibt und verwirft alle zwischengespeicherten Keys"""
+    with _key_cache_lock:
+        for key in _key_cache.values():
+            _wipe(key)
+        _key_cache.clear()
+
+
+# Offene Encryptor-Instanzen; ihre Keys werden spätestens beim Beenden überschrieben
+_open_encryptors: "weakref.WeakSet[Encryptor]" = weakref.WeakSet()
+
+
+@atexit.register
+def _close_open_encryptors() -> None:
+    """Schließt alle noch offenen Encryptor-Instanzen"""
+    for encryptor in list(_open_encryptors):
+        encryptor.close()
+
+
+def _derive_key(password: str, salt: bytes, kdf: str, length: int) -> bytes:
+    """
+    Leitet einen Key per PBKDF2 oder scrypt ab (ohne Cache)
+
+    Args:
+        password: Master-Passwort
+        salt: Salt für Key-Derivation
+        kdf: KDF-Kennung inkl. Parameter (z.B. "scrypt:n=32768,r=8,p=1")
+        length: Key-Länge in Bytes
+
+    Returns:
+        Abgeleiteter Key
+    """
+    name, params = _parse_kdf(kdf)
+    if name == "scrypt":
+        derivation = Scrypt(salt=salt, length=length, n=params["n"], r=params["r"], p=params["p"])
+    else:
+        # OpenSSL-PBKDF2 berechnet die HMAC-ipad/opad-Zustände bereits nur einmal;
+        # eine eigene hashlib-Schleife wäre in Python um ein Vielfaches langsamer
+        derivation = PBKDF2HMAC(
+            algorithm=hashes.SHA256(),
+            length=length,
+            salt=salt,
+            iterations=params.get("i", Encryptor.PBKDF2_ITERATIONS),
+        )
+    return derivation.derive(password.encode("utf-8"))
+
+
+# Unter diesem AES-GCM-Durchsatz fehlt auf x86_64 vermutlich AES-NI (typisch: > 1 GB/s)
+AES_MIN_THROUGHPUT_MBPS = 500
+
+
+@functools.lru_cache(maxsize=1)
+def check_aes_throughput(size: int = 16 * 1024 * 1024) -> float:
+    """
+    Misst einmalig den AES-GCM-Durchsatz und warnt bei verdächtig langsamer Hardware
+
+    Ohne AES-NI (z.B. in VMs/Containern mit ausgeblendeten CPU-Features) ist
+    OpenSSL um ein Vielfaches langsamer; das soll im Log sichtbar werden statt
+    nur als langsames Backup.
+
+    Args:
+        size: Größe der Testdaten in Bytes
+
+    Returns:
+        Gemessener Durchsatz in MB/s
+    """
+    aead = AESGCM(secrets.token_bytes(32))
+    data = bytes(size)
+    start = time.perf_counter()
+    aead.encrypt(secrets.token_bytes(12), data, None)
+    elapsed = max(time.perf_counter() - start, 1e-9)
+    mbps = size / elapsed / (1024 * 1024)
+
+    logger.info("AES-GCM-Durchsatz: %.0f MB/s", mbps)
+    if mbps < AES_MIN_THROUGHPUT_MBPS and platform.machine().lower() in ("x86_64", "amd64"):
+        logger.warning(
+            "AES-GCM ist langsam (%.0f MB/s) – AES-NI scheint nicht aktiv zu sein, "
+            "OpenSSL-Build bzw. CPU-Features der VM prüfen",
+            mbps,
+        )
+    return mbps
+
+
+def _fadvise(fd: int, advice_name: str) -> None:
+    """
+    Gibt dem Kernel einen Zugriffshinweis für die ganze Datei (nur wo verfügbar)
+
+    Args:
+        fd: Datei-Deskriptor
+        advice_name: Name der Konstante in os (z.B. "POSIX_FADV_SEQUENTIAL")
+    """
+    advice = getattr(os, advice_name, None)
+    if advice is None or not hasattr(os, "posix_fadvise"):
+        return  # Windows/macOS: kein posix_fadvise
+    try:
+        os.posix_fadvise(fd, 0, 0, advice)
+    except OSError as e:
+        # Nur ein Hinweis – z.B. Pipes oder manche Netzwerk-Dateisysteme lehnen ab
+        logger.debug("posix_fadvise(%s) fehlgeschlagen: %s", advice_name, e)
+
+
+def _readinto_exact(f: BinaryIO, view: memoryview) -> int:
+    """
+    Füllt view vollständig aus f (wiederholt readinto() bei kurzen Reads)
+
+    Ungepufferte Reads können auf Netzwerk-/FUSE-Dateisystemen weniger Bytes
+    liefern als angefordert, ohne dass das Dateiende erreicht ist.
+
+    Args:
+        f: Lesbare Datei
+        view: Zu füllender Puffer
+
+    Returns:
+        Anzahl gelesener Bytes (kleiner als len(view) nur am Dateiende)
+    """
+    total = 0
+    while total < len(view):
+        read = f.readinto(view[total:])
+        if not read:
+            break
+        total += read
+    return total
+
+
+def _parse_kdf(kdf: str) -> Tuple[str, Dict[str, int]]:
+    """
+    Zerlegt eine KDF-Kennung ("name:key=wert,...") in Name und Parameter
+
+    Args:
+        kdf: KDF-Kennung
+
+    Returns:
+        Tuple (name, parameter)
+
+    Raises:
+        ValueError: Bei unbekannter KDF oder ungültigen Parametern
+    """
+    name, _, raw_params = kdf.partition(":")
+    try:
+        params = {
+            key: int(value)
+            for key, value in (item.split("=", 1) for item in raw_params.split(",") if item)
+        }
+    except ValueError:
+        raise ValueError(f"Ungültige KDF-Parameter: {kdf}") from None
+
+    if name not in ("pbkdf2", "scrypt"):
+        raise ValueError(f"Unbekannte Key-Derivation: {kdf}")
+    if name == "scrypt" and not {"n", "r", "p"} <= params.keys():
+        raise ValueError(f"scrypt benötigt n, r und p: {kdf}")
+    return name, params
+
+
+def _char_class(char: str) -> str:
+    """
+    Ordnet ein Zeichen einer Passwort-Zeichenklasse zu
+
+    Args:
+        char: Einzelnes Zeichen
+
+    Returns:
+        "U" (Großbuchstabe), "L" (Kleinbuchstabe), "D" (Ziffer),
+        "S" (Sonderzeichen) oder "" (sonstiger Buchstabe)
+    """
+    if char.isupper():
+        return "U"
+    if char.islower():
+        return "L"
+    if char.isdigit():
+        return "D"
+    if not char.isalnum():
+        return "S"
+    return ""
+
+
+# Übersetzungstabelle ASCII-Zeichen -> Zeichenklasse (für str.translate)
+_ASCII_CHAR_CLASSES = {code: _char_class(chr(code)) for code in range(128)}
+
+
 class Encryptor:
     """
     Verschlüsselt und entschlüsselt Daten mit AES-256-GCM
 
     Verantwortlichkeiten:
-    - Master-Key-Ableitung aus Passwort (PBKDF2)
+    - Master-Key-Ableitung aus Passwort (scrypt, PBKDF2 für ältere Backups)
     - AES-256-GCM Verschlüsselung/Entschlüsselung
     - Streaming-Unterstützung für große Dateien
     - Metadaten-Verwaltung (Salt, Nonce)
@@ -31,17 +281,30 @@ class Encryptor:
     NONCE_SIZE = 12  # 96 bits (GCM-Standard)
     KEY_SIZE = 32  # 256 bits
     PBKDF2_ITERATIONS = 100_000  # 100.000 Iterationen
-    CHUNK_SIZE = 8 * 1024 * 1024  # 8 MB Chunks für Streaming
-
-    def __init__(self, password: str, salt: Optional[bytes] = None):
+    # KDF-Kennungen (werden pro Backup in den Metadaten gespeichert)
+    KDF_PBKDF2 = "pbkdf2"  # Bestehende Backups (Metadaten ohne KDF-Angabe)
+    KDF_SCRYPT = "scrypt:n=32768,r=8,p=1"  # Speicherhart (32 MiB), für neue Backups
+    CHUNK_SIZE = 4 * 1024 * 1024  # 4 MB Chunks (encrypt_file und EncryptedFileWriter)
+    STREAM_BLOCK_SIZE = 1024 * 1024  # 1 MB Lese-Blöcke für encrypt_stream/decrypt_stream
+    TAG_SIZE = 16  # GCM Authentication-Tag
+    CRYPT_WORKERS = 4  # Maximale Anzahl parallel ver-/entschlüsselter Chunks pro Datei
+    CRYPT_MEMORY = 128 * 1024 * 1024  # Obergrenze für gleichzeitig gepufferte Chunks
+
+    def __init__(self, password: str, salt: Optional[bytes] = None, kdf: str = KDF_PBKDF2):
         """
         Initialisiert Encryptor
 
         Args:
             password: Master-Passwort
             salt: Optional Salt (wenn None: neuer Salt wird generiert)
+            kdf: KDF-Kennung (Standard: PBKDF2, kompatibel zu bestehenden Backups)
+
+        Raises:
+            ValueError: Bei ungültigem Salt oder unbekannter KDF
         """
+        _parse_kdf(kdf)
         self.password = password
+        self.kdf = kdf
 
         # Salt generieren oder verwenden
         if salt is None:
@@ -53,13 +316,48 @@ class Encryptor:
             self.salt = salt
             logger.debug("Existierender Salt verwendet")
 
-        # Master-Key ableiten
-        self.key = self._derive_key(password, self.salt)
-        logger.info("Encryption-Key abgeleitet (PBKDF2)")
+        # Master-Key ableiten (bytearray, damit close() ihn überschreiben kann)
+        self.key = bytearray(self._derive_key(password, self.salt))
+        # AESGCM einmal aufbauen (Key-Schedule) und für alle Chunks wiederverwenden
+        self._aead = AESGCM(self.key)
+        # Key-Hash einmal berechnen (u.a. für __repr__ in Log-Ausgaben)
+        self._key_hash = hashlib.sha256(self.key).hexdigest()
+        # Einmal pro Prozess: Hardware-Beschleunigung plausibilisieren
+        check_aes_throughput()
+        _open_encryptors.add(self)
+        logger.info(f"Encryption-Key abgeleitet ({kdf.partition(':')[0]})")
+
+    def close(self) -> None:
+        """
+        Überschreibt den Key im Speicher und macht den Encryptor unbrauchbar
+
+        Das Passwort (str) lässt sich in Python nicht überschreiben; die Referenz
+        wird nur verworfen. Mehrfacher Aufruf ist unkritisch.
+        """
+        _wipe(self.key)
+        self._aead = None
+        self.password = None
+        _open_encryptors.discard(self)
+
+    def _check_open(self) -> None:
+        """Verhindert Ver-/Entschlüsselung mit bereits überschriebenem Key"""
+        if self._aead is None:
+            raise ValueError("Encryptor wurde bereits geschlossen")
+
+    def __enter__(self) -> "Encryptor":
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb) -> None:
+        self.close()
+
+    def __del__(self) -> None:
+        # Auch bei Abbruch in __init__ (noch kein Key) ohne Fehler
+        if isinstance(getattr(self, "key", None), bytearray):
+            _wipe(self.key)
 
     def _derive_key(self, password: str, salt: bytes) -> bytes:
         """
-        Leitet Encryption-Key aus Passwort ab (PBKDF2-HMAC-SHA256)
+        Leitet Encryption-Key aus Passwort ab (gemäß self.kdf)
 
         Args:
             password: Master-Passwort
@@ -68,15 +366,12 @@ class Encryptor:
         Returns:
             32-Byte Encryption-Key
         """
-        kdf = PBKDF2HMAC(
-            algorithm=hashes.SHA256(),
-            length=self.KEY_SIZE,
-            salt=salt,
-            iterations=self.PBKDF2_ITERATIONS,
-        )
+        return _derive_key_cached(password, salt, self.kdf, self.KEY_SIZE)
 
-        key = kdf.derive(password.encode("utf-8"))
-        return key
+    @staticmethod
+    def clear_key_cache() -> None:
+        """Verwirft zwischengespeicherte Keys (z.B. beim Beenden der Anwendung)"""
+        _clear_key_cache()
 
     def get_key_hash(self) -> str:
         """
@@ -85,17 +380,21 @@ class Encryptor:
         Returns:
             Hex-String des Key-Hashes
         """
-        import hashlib
-
-        return hashlib.sha256(self.key).hexdigest()
-
-    def encrypt_bytes(self, plaintext: bytes, nonce: Optional[bytes] = None) -> Tuple[bytes, bytes]:
+        return self._key_hash
+
+    def encrypt_bytes(
+        self,
+        plaintext: bytes,
+        nonce: Optional[bytes] = None,
+        associated_data: Optional[bytes] = None,
+    ) -> Tuple[bytes, bytes]:
         """
         Verschlüsselt Bytes (für kleine Daten)
 
         Args:
             plaintext: Zu verschlüsselnde Daten
             nonce: Optional Nonce (wenn None: wird generiert)
+            associated_data: Optional mit-authentifizierte Daten (AAD, nicht verschlüsselt)
 
         Returns:
             Tuple (ciphertext, nonce)
@@ -107,19 +406,22 @@ class Encryptor:
             raise ValueError(f"Nonce muss {self.NONCE_SIZE} Bytes lang sein")
 
         # Verschlüsseln mit AES-256-GCM
-        aesgcm = AESGCM(self.key)
-        ciphertext = aesgcm.encrypt(nonce, plaintext, None)
+        self._check_open()
+        ciphertext = self._aead.encrypt(nonce, plaintext, associated_data)
 
-        logger.debug(f"Verschlüsselt: {len(plaintext)} Bytes → {len(ciphertext)} Bytes")
+        logger.debug("Verschlüsselt: %d Bytes → %d Bytes", len(plaintext), len(ciphertext))
         return ciphertext, nonce
 
-    def decrypt_bytes(self, ciphertext: bytes, nonce: bytes) -> bytes:
+    def decrypt_bytes(
+        self, ciphertext: bytes, nonce: bytes, associated_data: Optional[bytes] = None
+    ) -> bytes:
         """
         Entschlüsselt Bytes (für kleine Daten)
 
         Args:
             ciphertext: Verschlüsselte Daten
             nonce: Nonce der Verschlüsselung
+            associated_data: Bei der Verschlüsselung verwendete AAD
 
         Returns:
             Entschlüsselte Daten
@@ -131,10 +433,10 @@ class Encryptor:
             raise ValueError(f"Nonce muss {self.NONCE_SIZE} Bytes lang sein")
 
         # Entschlüsseln mit AES-256-GCM
-        aesgcm = AESGCM(self.key)
-        plaintext = aesgcm.decrypt(nonce, ciphertext, None)
+        self._check_open()
+        plaintext = self._aead.decrypt(nonce, ciphertext, associated_data)
 
-        logger.debug(f"Entschlüsselt: {len(ciphertext)} Bytes → {len(plaintext)} Bytes")
+        logger.debug("Entschlüsselt: %d Bytes → %d Bytes", len(ciphertext), len(plaintext))
         return plaintext
 
     def encrypt_file(
@@ -146,7 +448,7 @@ class Encryptor:
         Args:
             input_path: Quell-Datei
             output_path: Ziel-Datei (verschlüsselt)
-            nonce: Optional Nonce (wenn None: wird generiert)
+            nonce: Optional Nonce (wird nur zurückgegeben; wenn None: Basis-Nonce)
 
         Returns:
             Verwendeter Nonce
@@ -157,51 +459,138 @@ class Encryptor:
         if not input_path.exists():
             raise FileNotFoundError(f"Quell-Datei nicht gefunden: {input_path}")
 
-        # Nonce generieren oder verwenden
-        if nonce is None:
-            nonce = secrets.token_bytes(self.NONCE_SIZE)
-
         # Sicherstellen, dass Output-Verzeichnis existiert
         output_path.parent.mkdir(parents=True, exist_ok=True)
 
-        file_size = input_path.stat().st_size
-        logger.info(f"Verschlüssle Datei: {input_path.name} ({file_size:,} Bytes)")
-
-        # Verschlüsseln in Chunks (64MB) um RAM zu schonen
-        CHUNK_SIZE = 64 * 1024 * 1024  # 64 MB pro Chunk
-
-        with open(input_path, "rb") as f_in, open(output_path, "wb") as f_out:
-            # Schreibe Magic-Header für Chunked-Format
-            f_out.write(b"SCRAT001")  # Version Marker
-            f_out.write(CHUNK_SIZE.to_bytes(4, "big"))  # Chunk-Größe
-
-            chunk_count = 0
-            while True:
-                plaintext = f_in.read(CHUNK_SIZE)
-                if not plaintext:
-                    break
-
-                # Verschlüssele Chunk mit eigenem Nonce
-                ciphertext, used_nonce = self.encrypt_bytes(plaintext, nonce=None)
-
-                # Schreibe: [Chunk-Länge: 4 bytes][Nonce: 12 bytes][Ciphertext]
-                f_out.write(len(ciphertext).to_bytes(4, "big"))
-                f_out.write(used_nonce)
+        # Verschlüsseln in Chunks (CHUNK_SIZE) um RAM zu schonen: pro Worker liegen
+        # Klartext und Ciphertext eines Chunks im Speicher. Bewusst ein GCM-Tag pro
+        # Chunk statt eines durchgehenden GCM-Kontexts: decrypt_file schreibt nur
+        # authentifizierten Klartext, und EncryptedFileWriter kann den ersten
+        # Chunk nachträglich neu verschlüsseln. Overhead: 20 Bytes pro Chunk.
+        chunk_size = self.CHUNK_SIZE
+
+        # Basis-Nonce pro Datei; Chunk-Nonces werden daraus per Zähler abgeleitet –
+        # ein Zufallswert pro Datei statt einem pro Chunk (ein übergebener Nonce
+        # wird nur zurückgegeben, nie für mehrere Dateien genutzt)
+        base_nonce = secrets.token_bytes(self.NONCE_SIZE)
+        if nonce is None:
+            nonce = base_nonce  # Entspricht dem Nonce des ersten Chunks
+
+        # Ungepuffert lesen: readinto() füllt direkt die eigenen Chunk-Puffer
+        # (ein read-Syscall pro Chunk, keine Kopie über den 8-KB-Puffer von io)
+        with open(input_path, "rb", buffering=0) as f_in, open(output_path, "wb") as f_out:
+            # Größe über den offenen Deskriptor statt eines weiteren stat() auf den Pfad
+            file_size = os.fstat(f_in.fileno()).st_size
+            logger.info(f"Verschlüssle Datei: {input_path.name} ({file_size:,} Bytes)")
+
+            # Sequentielles Lesen ankündigen (aggressiveres Readahead)
+            _fadvise(f_in.fileno(), "POSIX_FADV_SEQUENTIAL")
+
+            if file_size <= chunk_size:
+                # Kleine Datei (häufigster Fall): ein GCM-Aufruf ohne Chunk-Verwaltung.
+                # Format SCRAT000: Magic + Nonce + Ciphertext/Tag (Magic als AAD)
+                plaintext = bytearray(file_size)
+                try:
+                    # Bis der Puffer voll ist oder das Dateiende erreicht ist
+                    read = _readinto_exact(f_in, memoryview(plaintext))
+                    if read < file_size:
+                        logger.warning(
+                            "Datei während des Lesens geschrumpft: %s (%d statt %d Bytes)",
+                            input_path.name,
+                            read,
+                            file_size,
+                        )
+                    ciphertext, _ = self.encrypt_bytes(
+                        memoryview(plaintext)[:read],
+                        nonce=base_nonce,
+                        associated_data=b"SCRAT000",
+                    )
+                finally:
+                    _wipe(plaintext)
+                f_out.write(b"SCRAT000" + base_nonce)
                 f_out.write(ciphertext)
+                chunk_count = 1
+            else:
+                # Schreibe Header für Chunked-Format: Version, Chunk-Größe, Basis-Nonce
+                header = b"SCRAT003" + chunk_size.to_bytes(4, "big") + base_nonce
+                f_out.write(header)
+
+                # Ein Lese-Puffer pro gleichzeitig verschlüsseltem Chunk statt 4 MB neu
+                # allokieren pro read() (kleine Dateien: ein Puffer in Dateigröße)
+                workers = self._chunk_workers(file_size, chunk_size)
+                buffer_size = max(1, min(chunk_size, file_size))
+                buffers = [bytearray(buffer_size) for _ in range(workers)]
+                views = [memoryview(buffer) for buffer in buffers]
+
+                def read_chunks():
+                    index = 0
+                    offset = 0
+                    while True:
+                        view = views[index % workers]
+                        # Volle Chunks auch bei kurzen Reads (SMB/FUSE)
+                        read = _readinto_exact(f_in, view)
+                        offset += read
+                        # Letzter Chunk (auch leer bei leerer Datei) wird als solcher markiert;
+                        # gelesen wird der Stand beim Öffnen (file_size)
+                        final = not read or offset >= file_size
+                        nonce = self._chunk_nonce(base_nonce, index)
+                        yield view[:read], nonce, self._chunk_aad(header, index, final)
+                        if final:
+                            return
+                        index += 1
+
+                def write_chunk(index: int, result: Tuple[bytes, bytes]) -> None:
+                    # Schreibe: [Chunk-Länge: 4 bytes][Ciphertext]
+                    ciphertext, _ = result
+                    f_out.write(len(ciphertext).to_bytes(4, "big"))
+                    f_out.write(ciphertext)
+                    logger.debug("Chunk %d verschlüsselt (%d Bytes)", index, len(ciphertext) - 16)
+
+                # Verschlüssele jeden Chunk mit eigenem (abgeleitetem) Nonce
+                try:
+                    chunk_count = self._run_chunks(
+                        self.encrypt_bytes, read_chunks(), write_chunk, workers
+                    )
+                finally:
+                    # Klartext nicht länger als nötig im Speicher lassen
+                    for buffer in buffers:
+                        _wipe(buffer)
 
-                chunk_count += 1
-                logger.debug(f"Chunk {chunk_count} verschlüsselt ({len(plaintext):,} Bytes)")
+                # Ende-Marker
+                f_out.write(b"\x00\x00\x00\x00")
+            output_size = f_out.tell()
 
-            # Ende-Marker
-            f_out.write(b"\x00\x00\x00\x00")
+            # Gelesene und geschriebene Seiten nicht im Page-Cache halten: bei großen
+            # Backups würden sie sonst den Cache anderer Programme verdrängen
+            f_out.flush()
+            _fadvise(f_in.fileno(), "POSIX_FADV_DONTNEED")
+            _fadvise(f_out.fileno(), "POSIX_FADV_DONTNEED")
 
-        output_size = output_path.stat().st_size
         logger.info(
             f"Datei verschlüsselt: {output_path.name} "
             f"({output_size:,} Bytes, {chunk_count} Chunks)"
         )
         return nonce  # Gib ersten Nonce zurück (für Kompatibilität)
 
+    def open_encrypted_writer(
+        self, output_path: Path, fsync: bool = False
+    ) -> "EncryptedFileWriter":
+        """
+        Öffnet einen Stream, der direkt ins Chunked-Format (SCRAT003) verschlüsselt
+
+        Damit kann z.B. der Compressor sein Archiv ohne unverschlüsselte
+        Zwischendatei schreiben. Das Ergebnis ist mit decrypt_file() lesbar.
+
+        Args:
+            output_path: Ziel-Datei (verschlüsselt)
+            fsync: Datei beim Schließen auf das Medium synchronisieren
+
+        Returns:
+            Schreibbarer Stream (muss geschlossen werden)
+        """
+        output_path.parent.mkdir(parents=True, exist_ok=True)
+        return EncryptedFileWriter(self, output_path, self.CHUNK_SIZE, fsync=fsync)
+
     def decrypt_file(self, input_path: Path, output_path: Path) -> None:
         """
         Entschlüsselt Datei (Nonce wird aus Datei gelesen)
@@ -237,34 +626,84 @@ class Encryptor:
             # Prüfe Format-Header
             header = f_in.read(8)
 
-            if header == b"SCRAT001":
-                # Neues Chunked-Format
+            if header == b"SCRAT000":
+                # Kleine Datei: ein einzelner GCM-Block mit Magic als AAD
+                nonce = f_in.read(self.NONCE_SIZE)
+                plaintext = self.decrypt_bytes(f_in.read(), nonce, associated_data=header)
+                f_out.write(plaintext)
+
+            elif header in (b"SCRAT001", b"SCRAT002", b"SCRAT003"):
+                # Chunked-Format (SCRAT001: Nonce pro Chunk gespeichert,
+                # SCRAT002: Chunk-Nonces aus Basis-Nonce im Header abgeleitet,
+                # SCRAT003: zusätzlich Header, Index und Ende-Flag als AAD)
                 chunk_size_bytes = f_in.read(4)
                 chunk_size = int.from_bytes(chunk_size_bytes, "big")
-                logger.debug(f"Chunked-Format erkannt (Chunk-Größe: {chunk_size:,} Bytes)")
-
-                chunk_count = 0
-                while True:
-                    # Lese Chunk-Länge
-                    length_bytes = f_in.read(4)
-                    if length_bytes == b"\x00\x00\x00\x00":
-                        # Ende-Marker
-                        break
-
-                    chunk_length = int.from_bytes(length_bytes, "big")
-
-                    # Lese Nonce für diesen Chunk
-                    nonce = f_in.read(self.NONCE_SIZE)
-
-                    # Lese Ciphertext
-                    ciphertext = f_in.read(chunk_length)
-
-                    # Entschlüssele Chunk
-                    plaintext = self.decrypt_bytes(ciphertext, nonce)
+                base_nonce = f_in.read(self.NONCE_SIZE) if header != b"SCRAT001" else None
+                aad_header = (
+                    header + chunk_size_bytes + base_nonce if header == b"SCRAT003" else None
+                )
+                logger.debug("Chunked-Format erkannt (Chunk-Größe: %d Bytes)", chunk_size)
+
+                # Kopf jedes Chunk-Eintrags: Länge (+ Nonce bei SCRAT001)
+                record_size = 4 if base_nonce is not None else 4 + self.NONCE_SIZE
+                end_marker = b"\x00\x00\x00\x00"
+
+                # Wiederverwendete Lese-Puffer für Ciphertext (Chunk + GCM-Tag) und den
+                # direkt folgenden Kopf des nächsten Chunks, einer pro gleichzeitig
+                # entschlüsseltem Chunk
+                workers = self._chunk_workers(file_size, chunk_size)
+                buffer_size = min(chunk_size + 16 + record_size, file_size)
+                views = [memoryview(bytearray(buffer_size)) for _ in range(workers)]
+
+                def read_record(size: int) -> bytes:
+                    record = bytearray(size)
+                    return bytes(record[: _readinto_exact(f_in, memoryview(record))])
+
+                def read_chunks():
+                    index = 0
+                    record = read_record(record_size)
+                    if aad_header is not None and record[:4] == end_marker:
+                        raise ValueError("Verschlüsselte Datei ist abgeschnitten (kein Chunk)")
+                    while record[:4] != end_marker:
+                        if len(record) < record_size:
+                            raise ValueError("Verschlüsselte Datei ist abgeschnitten")
+                        chunk_length = int.from_bytes(record[:4], "big")
+                        # Länge stammt aus der Datei: vor dem Allokieren begrenzen
+                        if chunk_length > chunk_size + 16 or chunk_length > file_size - f_in.tell():
+                            raise ValueError("Ungültige Chunk-Länge")
+
+                        # Nonce für diesen Chunk
+                        if base_nonce is None:
+                            nonce = record[4:]
+                        else:
+                            nonce = self._chunk_nonce(base_nonce, index)
+
+                        # Ciphertext und Kopf des nächsten Chunks in einem Zug
+                        slot = index % workers
+                        wanted = chunk_length + record_size
+                        if wanted > len(views[slot]):
+                            views[slot] = memoryview(bytearray(wanted))
+                        view = views[slot]
+                        read = _readinto_exact(f_in, view[:wanted])
+                        ciphertext = view[: min(read, chunk_length)]
+                        record = bytes(view[chunk_length:read])
+
+                        # Ende-Marker im nächsten Kopf = letzter Chunk
+                        aad = None
+                        if aad_header is not None:
+                            final = record[:4] == end_marker
+                            aad = self._chunk_aad(aad_header, index, final)
+                        index += 1
+                        yield ciphertext, nonce, aad
+
+                def write_chunk(index: int, plaintext: bytes) -> None:
                     f_out.write(plaintext)
+                    logger.debug("Chunk %d entschlüsselt (%d Bytes)", index, len(plaintext))
 
-                    chunk_count += 1
-                    logger.debug(f"Chunk {chunk_count} entschlüsselt ({len(plaintext):,} Bytes)")
+                # Entschlüssele Chunks (GCM-Tag wird vor dem Schreiben geprüft)
+                chunk_count = self._run_chunks(
+                    self.decrypt_bytes, read_chunks(), write_chunk, workers
+                )
 
                 logger.info(f"{chunk_count} Chunks entschlüsselt")
 
@@ -288,6 +727,118 @@ class Encryptor:
         output_size = output_path.stat().st_size
         logger.info(f"Entschlüsselung abgeschlossen: {output_path.name} ({output_size:,} Bytes)")
 
+    @staticmethod
+    def _chunk_nonce(base_nonce: bytes, index: int) -> bytes:
+        """
+        Leitet den Nonce eines Chunks aus dem Basis-Nonce der Datei ab
+
+        Die unteren 32 Bit des Basis-Nonce werden mit dem Chunk-Index XOR-verknüpft,
+        jeder Chunk einer Datei bekommt so einen eigenen Nonce.
+
+        Args:
+            base_nonce: Zufälliger Basis-Nonce der Datei (12 Bytes)
+            index: Chunk-Index (0-basiert, < 2**32)
+
+        Returns:
+            Nonce des Chunks (12 Bytes)
+        """
+        counter = int.from_bytes(base_nonce[8:], "big") ^ index
+        return base_nonce[:8] + counter.to_bytes(4, "big")
+
+    @staticmethod
+    def _chunk_aad(header: bytes, index: int, final: bool) -> bytes:
+        """
+        Baut die AAD eines Chunks: Datei-Header, Chunk-Index und Ende-Flag
+
+        Vertauschte, zwischen Dateien ausgetauschte oder am Ende abgeschnittene
+        Chunks schlagen so bei der Tag-Prüfung fehl.
+
+        Args:
+            header: Datei-Header (Version, Chunk-Größe, Basis-Nonce)
+            index: Chunk-Index (0-basiert)
+            final: True für den letzten Chunk der Datei
+
+        Returns:
+            Associated Data für AES-GCM
+        """
+        return header + index.to_bytes(8, "big") + (b"\x01" if final else b"\x00")
+
+    def _chunk_workers(self, file_size: int, chunk_size: int) -> int:
+        """
+        Bestimmt die Anzahl parallel ver-/entschlüsselter Chunks einer Datei
+
+        Args:
+            file_size: Dateigröße in Bytes
+            chunk_size: Chunk-Größe in Bytes
+
+        Returns:
+            Anzahl Threads (1 = sequentiell)
+        """
+        if file_size <= chunk_size:
+            return 1
+        # Speicher begrenzen: jeder Thread hält einen Klartext- und einen Ciphertext-Chunk
+        by_memory = self.CRYPT_MEMORY // max(chunk_size, 1)
+        return max(1, min(self.CRYPT_WORKERS, os.cpu_count() or 1, by_memory))
+
+    @staticmethod
+    def _run_chunks(
+        func: Callable[..., Any],
+        chunks: Iterator[tuple],
+        write: Callable[[int, Any], None],
+        workers: int,
+    ) -> int:
+        """
+        Wendet func auf alle Chunks an und übergibt die Ergebnisse in Reihenfolge
+
+        AES-GCM gibt während der Berechnung die GIL frei; mit mehreren Threads
+        laufen die (unabhängigen) Chunks parallel. Höchstens `workers` Chunks
+        sind gleichzeitig in Arbeit – der Erzeuger darf den Puffer des ältesten
+        Chunks wiederverwenden, sobald dessen Ergebnis vorliegt. Geschrieben wird
+        in einem eigenen Thread, so überlappen Lesen, Ver-/Entschlüsseln und
+        Schreiben (Dauer ≈ langsamste Stufe statt Summe aller Stufen).
+
+        Args:
+            func: Ver-/Entschlüsselungs-Funktion
+            chunks: Argument-Tupel je Chunk (in Datei-Reihenfolge)
+            write: Callback(index, ergebnis), 1-basierter Index
+            workers: Anzahl Threads (1 = sequentiell im aufrufenden Thread)
+
+        Returns:
+            Anzahl verarbeiteter Chunks
+        """
+        count = 0
+        if workers <= 1:
+            for args in chunks:
+                count += 1
+                write(count, func(*args))
+            return count
+
+        pending: Deque[Future] = deque()
+        writes: Deque[Future] = deque()
+
+        # Ein einzelner Schreib-Thread hält die Reihenfolge der Ergebnisse ein
+        with ThreadPoolExecutor(
+            max_workers=workers, thread_name_prefix="scrat-crypt"
+        ) as pool, ThreadPoolExecutor(max_workers=1, thread_name_prefix="scrat-write") as writer:
+
+            def hand_over() -> None:
+                nonlocal count
+                count += 1
+                writes.append(writer.submit(write, count, pending.popleft().result()))
+                # Ausstehende Schreibvorgänge begrenzen (Speicher) und Fehler melden
+                while writes and (writes[0].done() or len(writes) > workers):
+                    writes.popleft().result()
+
+            for args in chunks:
+                pending.append(pool.submit(func, *args))
+                if len(pending) >= workers:
+                    hand_over()
+            while pending:
+                hand_over()
+            while writes:
+                writes.popleft().result()
+        return count
+
     def encrypt_stream(
         self, input_stream: BinaryIO, output_stream: BinaryIO, nonce: Optional[bytes] = None
     ) -> bytes:
@@ -302,14 +853,25 @@ class Encryptor:
         Returns:
             Verwendeter Nonce
         """
-        # Kompletten Stream lesen und verschlüsseln
-        # (GCM benötigt komplette Daten für Authentication Tag)
-        plaintext = input_stream.read()
-        ciphertext, used_nonce = self.encrypt_bytes(plaintext, nonce=nonce)
-        output_stream.write(ciphertext)
+        if nonce is None:
+            nonce = secrets.token_bytes(self.NONCE_SIZE)
 
-        logger.debug(f"Stream verschlüsselt: {len(plaintext):,} Bytes")
-        return used_nonce
+        # Inkrementelles GCM in Blöcken: Ausgabe ist identisch zu encrypt_bytes
+        # (Ciphertext + Tag), der Speicherbedarf aber unabhängig von der Stream-Größe
+        self._check_open()
+        encryptor = Cipher(algorithms.AES(self.key), modes.GCM(nonce)).encryptor()
+        total = 0
+        while True:
+            block = input_stream.read(self.STREAM_BLOCK_SIZE)
+            if not block:
+                break
+            total += len(block)
+            output_stream.write(encryptor.update(block))
+        output_stream.write(encryptor.finalize())
+        output_stream.write(encryptor.tag)
+
+        logger.debug("Stream verschlüsselt: %d Bytes", total)
+        return nonce
 
     def decrypt_stream(self, input_stream: BinaryIO, output_stream: BinaryIO, nonce: bytes) -> None:
         """
@@ -319,13 +881,32 @@ class Encryptor:
             input_stream: Input-Stream (lesbar, verschlüsselt)
             output_stream: Output-Stream (schreibbar, entschlüsselt)
             nonce: Nonce der Verschlüsselung
-        """
-        # Kompletten Stream lesen und entschlüsseln
-        ciphertext = input_stream.read()
-        plaintext = self.decrypt_bytes(ciphertext, nonce)
-        output_stream.write(plaintext)
 
-        logger.debug(f"Stream entschlüsselt: {len(ciphertext):,} Bytes")
+        Raises:
+            InvalidTag: Bei falschem Key oder manipulierten Daten. Der Tag wird
+                erst am Stream-Ende geprüft – bereits geschriebene Ausgabe ist dann
+                nicht authentifiziert und muss verworfen werden.
+        """
+        self._check_open()
+        decryptor = Cipher(algorithms.AES(self.key), modes.GCM(nonce)).decryptor()
+        # Die letzten TAG_SIZE Bytes zurückhalten: am Stream-Ende sind sie der Tag
+        tail = b""
+        total = 0
+        while True:
+            block = input_stream.read(self.STREAM_BLOCK_SIZE)
+            if not block:
+                break
+            data = tail + block
+            tail = data[-self.TAG_SIZE :]
+            body = data[: -self.TAG_SIZE]
+            total += len(body)
+            output_stream.write(decryptor.update(body))
+
+        if len(tail) < self.TAG_SIZE:
+            raise InvalidTag()
+        output_stream.write(decryptor.finalize_with_tag(tail))
+
+        logger.debug("Stream entschlüsselt: %d Bytes", total)
 
     @staticmethod
     def generate_password(length: int = 32) -> str:
@@ -362,11 +943,16 @@ class Encryptor:
         if len(password) < min_length:
             return False, f"Passwort muss mindestens {min_length} Zeichen lang sein"
 
-        # Empfehlung: Mindestens Mix aus Zeichen-Typen
-        has_upper = any(c.isupper() for c in password)
-        has_lower = any(c.islower() for c in password)
-        has_digit = any(c.isdigit() for c in password)
-        has_special = any(not c.isalnum() for c in password)
+        # Empfehlung: Mindestens Mix aus Zeichen-Typen. Zeichenklassen in einem
+        # Durchlauf bestimmen (ASCII: per str.translate komplett in C)
+        if password.isascii():
+            classes = set(password.translate(_ASCII_CHAR_CLASSES))
+        else:
+            classes = {_char_class(c) for c in password}
+        has_upper = "U" in classes
+        has_lower = "L" in classes
+        has_digit = "D" in classes
+        has_special = "S" in classes
 
         if not (has_upper and has_lower and has_digit):
             return (
@@ -382,3 +968,162 @@ class Encryptor:
     def __repr__(self) -> str:
         """String-Repräsentation"""
         return f"Encryptor(key_hash={self.get_key_hash()[:16]}...)"
+
+
+class EncryptedFileWriter(io.RawIOBase):
+    """
+    Schreibbarer Stream, der Daten im Chunked-Format (SCRAT003) verschlüsselt
+
+    Chunks werden verschlüsselt und geschrieben, sobald ihnen weitere Daten
+    folgen – der letzte Chunk wird erst in close() als solcher markiert. Der erste
+    Chunk bleibt bis close() im Speicher, damit Schreiber wie py7zr am Ende
+    ihren Datei-Header (am Anfang der Datei) noch überschreiben können. Sein
+    Platz in der Datei wird dafür reserviert – ein voller Chunk hat immer
+    dieselbe verschlüsselte Länge.
+
+    Unterstützt nur Anhängen am Ende und Überschreiben innerhalb des ersten
+    Chunks; alles andere löst io.UnsupportedOperation aus.
+    """
+
+    _HEADER_SIZE = 8 + 4 + Encryptor.NONCE_SIZE  # Magic + Chunk-Größe + Basis-Nonce
+    _TAG_SIZE = Encryptor.TAG_SIZE
+
+    def __init__(
+        self, encryptor: Encryptor, output_path: Path, chunk_size: int, fsync: bool = False
+    ):
+        """
+        Initialisiert Writer
+
+        Args:
+            encryptor: Encryptor mit abgeleitetem Key
+            output_path: Ziel-Datei
+            chunk_size: Klartext-Größe pro Chunk
+            fsync: Datei in close() per os.fsync auf das Medium synchronisieren
+        """
+        super().__init__()
+        self.name = str(output_path)
+        self._encryptor = encryptor
+        self._chunk_size = chunk_size
+        self._fsync = fsync
+        self._head = bytearray()  # Erster Chunk (bleibt bis close() im Speicher)
+        self._buffer = bytearray()  # Angefangener Folge-Chunk
+        self._pos = 0  # Logische Klartext-Position
+        self._end = 0  # Logische Klartext-Länge
+        self._chunks_written = 0
+        self._base_nonce = secrets.token_bytes(Encryptor.NONCE_SIZE)
+        self.bytes_written = 0  # Größe der verschlüsselten Datei (nach close())
+
+        self._header = b"SCRAT003" + chunk_size.to_bytes(4, "big") + self._base_nonce
+
+        self._file = open(output_path, "wb")
+        self._file.write(self._header)
+        # Platz für den ersten (vollen) Chunk: Länge + Ciphertext + Tag
+        self._body_offset = self._HEADER_SIZE + 4 + chunk_size + self._TAG_SIZE
+
+    def writable(self) -> bool:
+        return True
+
+    def seekable(self) -> bool:
+        return True
+
+    def tell(self) -> int:
+        return self._pos
+
+    def seek(self, offset: int, whence: int = os.SEEK_SET) -> int:
+        if whence == os.SEEK_CUR:
+            offset += self._pos
+        elif whence == os.SEEK_END:
+            offset += self._end
+        if offset < 0 or offset > self._end:
+            raise io.UnsupportedOperation("Seek hinter das Dateiende nicht unterstützt")
+        self._pos = offset
+        return offset
+
+    def write(self, data) -> int:
+        if self.closed:
+            raise ValueError("Schreiben in geschlossenen Stream")
+        data = memoryview(data).cast("B")
+        size = len(data)
+
+        if self._pos != self._end:
+            # Überschreiben nur innerhalb des (noch nicht geschriebenen) ersten Chunks
+            if self._pos + size > len(self._head):
+                raise io.UnsupportedOperation(
+                    "Überschreiben ist nur im ersten Chunk möglich"
+                )
+            self._head[self._pos : self._pos + size] = data
+            self._pos += size
+            return size
+
+        # Anhängen: zuerst ersten Chunk füllen, Rest in den Puffer
+        room = self._chunk_size - len(self._head)
+        if room > 0:
+            self._head += data[:room]
+            data = data[room:]
+        if data:
+            self._buffer += data
+            # Mindestens ein Byte bleibt gepuffert: der letzte Chunk wird in close() geschrieben
+            while len(self._buffer) > self._chunk_size:
+                if self._chunks_written == 0:
+                    # Platz für den ersten Chunk überspringen
+                    self._file.seek(self._body_offset)
+                self._write_chunk(bytes(self._buffer[: self._chunk_size]))
+                del self._buffer[: self._chunk_size]
+
+        self._pos += size
+        self._end = self._pos
+        return size
+
+    def _write_chunk(self, plaintext: bytes, final: bool = False) -> None:
+        """Verschlüsselt einen Folge-Chunk an der aktuellen Datei-Position"""
+        # Index 0 gehört dem ersten Chunk, Folge-Chunks zählen ab 1
+        self._chunks_written += 1
+        self._write_encrypted(plaintext, self._chunks_written, final)
+
+    def close(self) -> None:
+        """Schreibt ausstehende Chunks, Ende-Marker und den ersten Chunk"""
+        if self.closed:
+            return
+        try:
+            if self._chunks_written:
+                # Puffer ist hier nie leer (siehe write())
+                self._write_chunk(bytes(self._buffer), final=True)
+                self._file.write(b"\x00\x00\x00\x00")  # Ende-Marker
+                # Ersten Chunk in den reservierten Platz schreiben
+                self._file.seek(self._HEADER_SIZE)
+                self._write_head(final=False)
+            else:
+                # Noch kein Folge-Chunk geschrieben: alles sequentiell schreiben.
+                # Der erste Chunk wird auch bei leerer Datei geschrieben, damit
+                # ein Abschneiden aller Chunks erkannt wird.
+                self._write_head(final=not self._buffer)
+                if self._buffer:
+                    self._write_chunk(bytes(self._buffer), final=True)
+                self._file.write(b"\x00\x00\x00\x00")  # Ende-Marker
+            self.bytes_written = self._file.seek(0, os.SEEK_END)
+            if self._fsync:
+                self._file.flush()
+                os.fsync(self._file.fileno())
+        finally:
+            self._file.close()
+            _wipe(self._head)
+            _wipe(self._buffer)
+            self._head = bytearray()
+            self._buffer = bytearray()
+            super().close()
+
+        logger.debug("Stream verschlüsselt: %s (%d Bytes Klartext)", self.name, self._end)
+
+    def _write_head(self, final: bool) -> None:
+        """Verschlüsselt den ersten Chunk an der aktuellen Datei-Position"""
+        self._write_encrypted(bytes(self._head), 0, final)
+
+    def _write_encrypted(self, plaintext: bytes, index: int, final: bool) -> None:
+        """Schreibt einen Chunk als [Länge][Ciphertext] mit abgeleitetem Nonce und AAD"""
+        nonce = Encryptor._chunk_nonce(self._base_nonce, index)
+        aad = Encryptor._chunk_aad(self._header, index, final)
+        ciphertext, _ = self._encryptor.encrypt_bytes(
+            plaintext, nonce=nonce, associated_data=aad
+        )
+        self._file.write(len(ciphertext).to_bytes(4, "big"))
+        self._file.write(ciphertext)
@@ -7,11 +7,28 @@ import logging
 import sqlite3
 from datetime import datetime, timedelta
 from pathlib import Path
-from typing import Any, Dict, List, Optional
+from typing import Any, Dict, Iterable, List, Optional, Tuple
 
 logger = logging.getLogger(__name__)
 
 
+def _convert_datetime(value: bytes) -> datetime:
+    """Konvertiert einen gespeicherten ISO-Zeitstempel direkt beim Lesen zu datetime"""
+    return datetime.fromisoformat(value.decode())
+
+
+# Eigener Converter-Name statt DATETIME: nur per Spalten-Alias
+# ("spalte [scrat_datetime]") aktiv, damit die GUI weiterhin Strings erhält
+sqlite3.register_converter("scrat_datetime", _convert_datetime)
+
+# Spaltenliste für Datei-Abfragen, modified_timestamp kommt als datetime zurück
+_FILE_COLUMNS = """
+    {t}id, {t}backup_id, {t}source_path, {t}relative_path, {t}file_size,
+    {t}modified_timestamp AS "modified_timestamp [scrat_datetime]",
+    {t}archive_name, {t}archive_path, {t}is_deleted, {t}checksum
+"""
+
+
 class MetadataManager:
     """
     Verwaltet Backup-Metadaten in SQLite-Datenbank
@@ -23,7 +40,7 @@ class MetadataManager:
     - Backup-Suche und Abfragen
     """
 
-    SCHEMA_VERSION = 2  # Version 2: salt-Spalte hinzugefügt
+    SCHEMA_VERSION = 3  # Version 2: salt-Spalte, Version 3: kdf-Spalte hinzugefügt
 
     def __init__(self, db_path: Path):
         """
@@ -106,6 +123,18 @@ class MetadataManager:
             )
         """)
 
+        # Dateistand-Cache: kumulativer Stand nach dem letzten abgeschlossenen
+        # Backup (erspart das Abspielen der ganzen Backup-Kette)
+        cursor.execute("""
+            CREATE TABLE IF NOT EXISTS files_cache (
+                relative_path TEXT PRIMARY KEY,
+                backup_id INTEGER NOT NULL,
+                file_id INTEGER NOT NULL,
+                FOREIGN KEY (backup_id) REFERENCES backups(id) ON DELETE CASCADE,
+                FOREIGN KEY (file_id) REFERENCES backup_files(id) ON DELETE CASCADE
+            )
+        """)
+
         # Quellen-Tabelle
         cursor.execute("""
             CREATE TABLE IF NOT EXISTS sources (
@@ -175,6 +204,11 @@ class MetadataManager:
             ON backup_files(source_path)
         """)
 
+        cursor.execute("""
+            CREATE INDEX IF NOT EXISTS idx_files_cache_file_id
+            ON files_cache(file_id)
+        """)
+
         cursor.execute("""
             CREATE INDEX IF NOT EXISTS idx_backups_timestamp
             ON backups(timestamp DESC)
@@ -185,6 +219,11 @@ class MetadataManager:
             ON backups(status)
         """)
 
+        cursor.execute("""
+            CREATE INDEX IF NOT EXISTS idx_backups_status_timestamp
+            ON backups(status, timestamp)
+        """)
+
         cursor.execute("""
             CREATE INDEX IF NOT EXISTS idx_logs_timestamp
             ON logs(timestamp DESC)
@@ -245,6 +284,14 @@ class MetadataManager:
             cursor.execute("INSERT OR REPLACE INTO schema_info (version) VALUES (?)", (2,))
             self.connection.commit()
             logger.info("Migration auf Version 2 abgeschlossen")
+
+        # Migration auf Version 3: kdf-Spalte (NULL = PBKDF2, Backups vor Version 3)
+        if "kdf" not in columns:
+            logger.info("Migration: Füge kdf-Spalte zur backups-Tabelle hinzu")
+            cursor.execute("ALTER TABLE backups ADD COLUMN kdf TEXT")
+            cursor.execute("INSERT OR REPLACE INTO schema_info (version) VALUES (?)", (3,))
+            self.connection.commit()
+            logger.info("Migration auf Version 3 abgeschlossen")
         else:
             logger.info(f"Datenbank ist aktuell (Version {current_version})")
 
@@ -256,6 +303,7 @@ class MetadataManager:
         encryption_key_hash: str,
         salt: bytes,
         base_backup_id: Optional[int] = None,
+        kdf: Optional[str] = None,
     ) -> int:
         """
         Erstellt neuen Backup-Eintrag
@@ -267,6 +315,7 @@ class MetadataManager:
             encryption_key_hash: Hash des Verschlüsselungs-Keys
             salt: Encryption-Salt (32 Bytes)
             base_backup_id: Bei incremental: ID des Base-Backups
+            kdf: KDF-Kennung des Encryptors (None = PBKDF2)
 
         Returns:
             ID des erstellten Backup-Eintrags
@@ -277,8 +326,8 @@ class MetadataManager:
             """
             INSERT INTO backups (
                 timestamp, type, base_backup_id, destination_type,
-                destination_path, status, encryption_key_hash, salt
-            ) VALUES (?, ?, ?, ?, ?, ?, ?, ?)
+                destination_path, status, encryption_key_hash, salt, kdf
+            ) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)
         """,
             (
                 datetime.now(),
@@ -289,6 +338,7 @@ class MetadataManager:
                 "running",
                 encryption_key_hash,
                 salt,
+                kdf,
             ),
         )
 
@@ -346,9 +396,105 @@ class MetadataManager:
             (files_total, datetime.now(), backup_id),
         )
 
+        self._update_files_cache(cursor, backup_id)
+
         self.connection.commit()
         logger.info(f"Backup abgeschlossen: ID={backup_id}, Files={files_total}")
 
+    def finalize_backup(
+        self, backup_id: int, files_total: int, size_original: int, size_compressed: int
+    ) -> None:
+        """
+        Schreibt die Endwerte und markiert das Backup als abgeschlossen
+
+        Fasst update_backup_progress() und mark_backup_completed() in einem
+        UPDATE und einer Transaktion zusammen.
+
+        Args:
+            backup_id: ID des Backups
+            files_total: Anzahl gesicherter Dateien (auch files_processed)
+            size_original: Original-Größe in Bytes
+            size_compressed: Komprimierte Größe in Bytes
+        """
+        cursor = self.connection.cursor()
+
+        cursor.execute(
+            """
+            UPDATE backups
+            SET status = 'completed',
+                files_total = ?,
+                files_processed = ?,
+                size_original = ?,
+                size_compressed = ?,
+                completed_at = ?
+            WHERE id = ?
+        """,
+            (files_total, files_total, size_original, size_compressed, datetime.now(), backup_id),
+        )
+
+        self._update_files_cache(cursor, backup_id)
+
+        self.connection.commit()
+        logger.info(f"Backup abgeschlossen: ID={backup_id}, Files={files_total}")
+
+    def _update_files_cache(self, cursor: sqlite3.Cursor, backup_id: int) -> None:
+        """
+        Schreibt den Dateistand-Cache für ein abgeschlossenes Backup fort
+
+        Vollbackup: Cache wird neu aus dessen Dateien aufgebaut.
+        Inkrementell: Gehört der Cache zum Basis-Backup, werden nur die
+        Änderungen angewendet – sonst wird die Kette einmal abgespielt.
+
+        Args:
+            cursor: Cursor der laufenden Transaktion
+            backup_id: ID des abgeschlossenen Backups
+        """
+        cursor.execute("SELECT type, base_backup_id FROM backups WHERE id = ?", (backup_id,))
+        row = cursor.fetchone()
+        if row is None:
+            return
+
+        cursor.execute("SELECT backup_id FROM files_cache LIMIT 1")
+        cached = cursor.fetchone()
+        cached_backup_id = cached[0] if cached else None
+
+        if row["type"] == "incremental" and cached_backup_id != row["base_backup_id"]:
+            # Cache passt nicht zur Basis → einmalig aus der Kette rekonstruieren
+            state = self._replay_backup_chain(cursor, backup_id)
+            cursor.execute("DELETE FROM files_cache")
+            cursor.executemany(
+                "INSERT INTO files_cache (relative_path, backup_id, file_id) VALUES (?, ?, ?)",
+                ((f["relative_path"], backup_id, f["id"]) for f in state),
+            )
+            logger.debug(f"Dateistand-Cache neu aufgebaut: {len(state)} Dateien")
+            return
+
+        if row["type"] == "full":
+            cursor.execute("DELETE FROM files_cache")
+        else:
+            # Gelöschte Dateien aus dem Stand entfernen
+            cursor.execute(
+                """
+                DELETE FROM files_cache WHERE relative_path IN (
+                    SELECT relative_path FROM backup_files
+                    WHERE backup_id = ? AND is_deleted = 1
+                )
+            """,
+                (backup_id,),
+            )
+            cursor.execute("UPDATE files_cache SET backup_id = ?", (backup_id,))
+
+        # Neue/geänderte Dateien übernehmen
+        cursor.execute(
+            """
+            INSERT OR REPLACE INTO files_cache (relative_path, backup_id, file_id)
+            SELECT relative_path, backup_id, id FROM backup_files
+            WHERE backup_id = ? AND is_deleted = 0
+            ORDER BY relative_path
+        """,
+            (backup_id,),
+        )
+
     def mark_backup_failed(self, backup_id: int, error_message: str) -> None:
         """
         Markiert Backup als fehlgeschlagen
@@ -397,7 +543,7 @@ class MetadataManager:
             archive_name: Name des Archivs
             archive_path: Pfad innerhalb des Archivs
             is_deleted: Ob Datei gelöscht wurde (für incremental)
-            checksum: Optional SHA-256 Checksum
+            checksum: Optional Inhalts-Fingerabdruck (Scanner.hash_file)
 
         Returns:
             ID des erstellten Datei-Eintrags
@@ -428,6 +574,89 @@ class MetadataManager:
         self.connection.commit()
         return cursor.lastrowid
 
+    def add_files_to_backup(
+        self,
+        backup_id: int,
+        files: Iterable[Tuple[str, str, int, datetime, str, str, bool, Optional[str]]],
+    ) -> int:
+        """
+        Fügt viele Dateien in einer einzigen Transaktion zu einem Backup hinzu
+
+        Deutlich schneller als add_file_to_backup() in einer Schleife, da nur
+        einmal committet wird (ein fsync statt einem pro Datei).
+
+        Args:
+            backup_id: ID des Backups
+            files: Tupel (source_path, relative_path, file_size,
+                modified_timestamp, archive_name, archive_path, is_deleted,
+                checksum) – checksum ist der Inhalts-Fingerabdruck aus
+                Scanner.hash_file() oder None
+
+        Returns:
+            Anzahl eingefügter Datei-Einträge
+        """
+        with self.connection:
+            cursor = self.connection.executemany(
+                """
+                INSERT INTO backup_files (
+                    backup_id, source_path, relative_path, file_size,
+                    modified_timestamp, archive_name, archive_path, is_deleted, checksum
+                ) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)
+            """,
+                ((backup_id, *row) for row in files),
+            )
+
+        logger.debug(f"{cursor.rowcount} Datei-Einträge zu Backup {backup_id} hinzugefügt")
+        return cursor.rowcount
+
+    def set_archive_name(self, backup_id: int, archive_name: str) -> int:
+        """
+        Trägt den Archiv-Namen für alle gesicherten Dateien eines Backups nach
+
+        Args:
+            backup_id: ID des Backups
+            archive_name: Name des (ersten) verschlüsselten Archivs
+
+        Returns:
+            Anzahl aktualisierter Datei-Einträge
+        """
+        with self.connection:
+            cursor = self.connection.execute(
+                "UPDATE backup_files SET archive_name = ? WHERE backup_id = ? AND is_deleted = 0",
+                (archive_name, backup_id),
+            )
+        return cursor.rowcount
+
+    def update_file_timestamps(self, updates: Iterable[Tuple[int, str, str, datetime]]) -> int:
+        """
+        Aktualisiert den Zeitstempel bereits gesicherter Dateien (eine Transaktion)
+
+        Für Dateien, deren Inhalt unverändert im Backup liegt, aber deren
+        Zeitstempel sich geändert hat – so gilt die Datei beim nächsten Scan
+        wieder als unverändert.
+
+        Args:
+            updates: (backup_id, source_path, relative_path, neuer Zeitstempel)
+
+        Returns:
+            Anzahl aktualisierter Datei-Einträge
+        """
+        with self.connection:
+            cursor = self.connection.executemany(
+                """
+                UPDATE backup_files SET modified_timestamp = ?
+                WHERE backup_id = ? AND source_path = ? AND relative_path = ?
+                AND is_deleted = 0
+            """,
+                (
+                    (modified, backup_id, source_path, relative_path)
+                    for backup_id, source_path, relative_path, modified in updates
+                ),
+            )
+
+        logger.debug(f"{cursor.rowcount} Datei-Zeitstempel aktualisiert")
+        return cursor.rowcount
+
     def get_backup(self, backup_id: int) -> Optional[Dict[str, Any]]:
         """
         Holt Backup-Informationen
@@ -483,6 +712,42 @@ class MetadataManager:
         cursor.execute(query, params)
         return [dict(row) for row in cursor.fetchall()]
 
+    def get_latest_completed_backup(self) -> Optional[Dict[str, Any]]:
+        """
+        Holt das neueste abgeschlossene Backup
+
+        Returns:
+            Dict mit Backup-Informationen oder None
+        """
+        cursor = self.connection.cursor()
+
+        cursor.execute("""
+            SELECT * FROM backups
+            WHERE status = 'completed'
+            ORDER BY timestamp DESC
+            LIMIT 1
+        """)
+
+        row = cursor.fetchone()
+        return dict(row) if row else None
+
+    def get_completed_backups(self) -> List[Dict[str, Any]]:
+        """
+        Holt alle abgeschlossenen Backups, älteste zuerst (ohne Limit)
+
+        Returns:
+            Liste von Backup-Dicts, aufsteigend nach Timestamp
+        """
+        cursor = self.connection.cursor()
+
+        cursor.execute("""
+            SELECT * FROM backups
+            WHERE status = 'completed'
+            ORDER BY timestamp ASC
+        """)
+
+        return [dict(row) for row in cursor.fetchall()]
+
     def get_backup_files(self, backup_id: int) -> List[Dict[str, Any]]:
         """
         Holt alle Dateien eines Backups
@@ -512,10 +777,35 @@ class MetadataManager:
         Vollbackup bis zu backup_id chronologisch abgespielt wird.
 
         Jedes Inkremental überschreibt den Stand des vorherigen – gelöschte
-        Dateien werden entfernt, neue/geänderte übernommen.
+        Dateien werden entfernt, neue/geänderte übernommen. Für das zuletzt
+        abgeschlossene Backup wird der Dateistand-Cache verwendet.
+        modified_timestamp wird bereits als datetime geliefert.
         """
         cursor = self.connection.cursor()
 
+        cursor.execute("SELECT backup_id FROM files_cache LIMIT 1")
+        cached = cursor.fetchone()
+        if cached and cached[0] == backup_id:
+            cursor.execute(f"""
+                SELECT {_FILE_COLUMNS.format(t="bf.")} FROM files_cache fc
+                JOIN backup_files bf ON bf.id = fc.file_id
+                ORDER BY fc.relative_path
+            """)
+            return [dict(row) for row in cursor.fetchall()]
+
+        return self._replay_backup_chain(cursor, backup_id)
+
+    def _replay_backup_chain(self, cursor: sqlite3.Cursor, backup_id: int) -> List[Dict[str, Any]]:
+        """
+        Spielt die Backup-Kette bis backup_id ab (ohne Cache)
+
+        Args:
+            cursor: Datenbank-Cursor
+            backup_id: ID des letzten Backups der Kette
+
+        Returns:
+            Liste der Datei-Dicts des kumulativen Stands
+        """
         # Kette rückwärts durchlaufen (neuestes → ältestes)
         chain_ids: list = []
         current_id: int | None = backup_id
@@ -531,7 +821,8 @@ class MetadataManager:
         cumulative: dict = {}
         for bid in chain_ids:
             cursor.execute(
-                "SELECT * FROM backup_files WHERE backup_id = ? ORDER BY relative_path",
+                f"SELECT {_FILE_COLUMNS.format(t='')} FROM backup_files "
+                "WHERE backup_id = ? ORDER BY relative_path",
                 (bid,),
             )
             for row in cursor.fetchall():
@@ -4,6 +4,9 @@ Wiederherstellung von Backups
 """
 
 import logging
+import os
+import stat
+import time
 from dataclasses import dataclass, field
 from datetime import datetime
 from pathlib import Path
@@ -123,6 +126,9 @@ class RestoreEngine:
     - Datei-Suche in Metadaten
     """
 
+    # Mindestabstand zwischen zwei Progress-Updates derselben Phase (100 ms)
+    PROGRESS_INTERVAL_NS = 100_000_000
+
     def __init__(
         self,
         metadata_manager: MetadataManager,
@@ -143,6 +149,8 @@ class RestoreEngine:
         self.storage = storage_backend
         self.config = config
         self.progress_callback = progress_callback
+        self._last_report_ns = 0
+        self._last_report_phase: Optional[str] = None
 
         # Initialisiere Komponenten
         self.compressor = Compressor()
@@ -190,7 +198,12 @@ class RestoreEngine:
                 )
 
             # Initialisiere Encryptor mit korrektem Salt
-            self.encryptor = Encryptor(password=self.config.password, salt=salt)
+            # Ohne gespeicherte KDF (Backups vor Schema-Version 3): PBKDF2
+            self.encryptor = Encryptor(
+                password=self.config.password,
+                salt=salt,
+                kdf=backup.get("kdf") or Encryptor.KDF_PBKDF2,
+            )
             logger.info(f"Encryptor initialisiert mit Salt aus Backup {backup_id}")
 
             # Log: Restore gestartet
@@ -355,7 +368,12 @@ class RestoreEngine:
             )
 
         # Initialisiere Encryptor mit korrektem Salt
-        self.encryptor = Encryptor(password=self.config.password, salt=salt)
+        # Ohne gespeicherte KDF (Backups vor Schema-Version 3): PBKDF2
+        self.encryptor = Encryptor(
+            password=self.config.password,
+            salt=salt,
+            kdf=base_backup.get("kdf") or Encryptor.KDF_PBKDF2,
+        )
         logger.info(f"Encryptor initialisiert mit Salt aus Backup {base_backup_id}")
 
         # Finde alle Incrementals nach dem Base-Backup bis zum Zeitpunkt
@@ -544,15 +562,9 @@ class RestoreEngine:
     def _extract_archives(
         self, archive_paths: List[Path], extract_dir: Path, progress: RestoreProgress
     ) -> List[Path]:
-        """Entpackt Archive"""
+        """Entpackt Archive (Teile eines Backups parallel)"""
         extract_dir.mkdir(parents=True, exist_ok=True)
-        all_extracted = []
-
-        for archive_path in archive_paths:
-            extracted = self.compressor.extract_archive(archive_path, extract_dir)
-            all_extracted.extend(extracted)
-
-        return all_extracted
+        return self.compressor.extract_split_archives(archive_paths, extract_dir)
 
     def _restore_files(
         self,
@@ -608,13 +620,16 @@ class RestoreEngine:
             # Direkter Lookup: extract_dir/relative_path
             source_file = extract_dir / relative_path
 
-            if not source_file.exists():
+            # Ein stat() statt exists() + is_file()
+            try:
+                source_mode = os.stat(source_file).st_mode
+            except FileNotFoundError:
                 logger.warning(f"Extrahierte Datei nicht gefunden: {source_file}")
-                logger.debug(f"Gesucht: {relative_path} in {extract_dir}")
+                logger.debug("Gesucht: %s in %s", relative_path, extract_dir)
                 continue
 
             # Prüfe ob source_file eine Datei ist (nicht Verzeichnis)
-            if not source_file.is_file():
+            if not stat.S_ISREG(source_mode):
                 logger.warning(f"Überspringe Verzeichnis: {source_file}")
                 continue
 
@@ -623,9 +638,14 @@ class RestoreEngine:
             logger.info(f"[RESTORE] Erstelle Parent-Dir: {parent_dir}")
             parent_dir.mkdir(parents=True, exist_ok=True)
 
-            # Prüfe ob Datei bereits existiert
-            if dest_path.exists():
-                if dest_path.is_dir():
+            # Prüfe ob Datei bereits existiert (ein stat() statt exists() + is_dir())
+            try:
+                dest_mode: Optional[int] = os.stat(dest_path).st_mode
+            except FileNotFoundError:
+                dest_mode = None
+
+            if dest_mode is not None:
+                if stat.S_ISDIR(dest_mode):
                     logger.warning(
                         f"⚠️  FEHLER: Ziel existiert bereits als VERZEICHNIS: {dest_path}"
                     )
@@ -704,11 +724,32 @@ class RestoreEngine:
         return False
 
     def _report_progress(self, progress: RestoreProgress) -> None:
-        """Meldet Fortschritt via Callback"""
+        """
+        Meldet Fortschritt via Callback
+
+        Updates innerhalb derselben Phase werden auf eines pro
+        PROGRESS_INTERVAL_NS gedrosselt; Phasenwechsel und das letzte
+        Update einer Phase (alle Dateien verarbeitet) werden immer gemeldet.
+
+        Args:
+            progress: Aktuelle Progress-Informationen
+        """
+        now = time.monotonic_ns()
+        if (
+            progress.phase == self._last_report_phase
+            and now - self._last_report_ns < self.PROGRESS_INTERVAL_NS
+            and progress.files_processed < progress.files_total
+        ):
+            return
+        self._last_report_ns = now
+        self._last_report_phase = progress.phase
+
         if self.progress_callback:
             self.progress_callback(progress)
 
         logger.debug(
-            f"Progress: {progress.phase}, "
-            f"{progress.files_processed}/{progress.files_total} Dateien"
+            "Progress: %s, %d/%d Dateien",
+            progress.phase,
+            progress.files_processed,
+            progress.files_total,
         )
@@ -3,14 +3,46 @@ Datei-Scanner für Scrat-Backup
 Scannt Quell-Ordner und erkennt Änderungen (Neu, Geändert, Gelöscht)
 """
 
+import hashlib
 import logging
-from dataclasses import dataclass
+import os
+from concurrent.futures import Future, ThreadPoolExecutor
+from dataclasses import dataclass, field
 from datetime import datetime
 from pathlib import Path
-from typing import Callable, Dict, Generator, List, Optional, Set
+from typing import Callable, Dict, Generator, List, Optional, Set, Tuple
+
+try:
+    import blake3  # Optional: SIMD-beschleunigt, deutlich schneller als SHA-256
+except ImportError:
+    blake3 = None
 
 logger = logging.getLogger(__name__)
 
+# Lesepuffer für Inhalts-Hashes
+_HASH_CHUNK_SIZE = 1024 * 1024  # 1 MB
+
+
+def _iter_blocks(path: Path, block_size: int) -> Generator[memoryview, None, None]:
+    """
+    Liest eine Datei blockweise in einen wiederverwendeten Puffer
+
+    Vermeidet pro Block ein neues bytes-Objekt (read() alloziert und kopiert
+    jedes Mal). Der gelieferte memoryview ist nur bis zum nächsten Block gültig.
+
+    Args:
+        path: Zu lesende Datei
+        block_size: Blockgröße in Bytes
+
+    Yields:
+        memoryview auf den jeweils gelesenen Block
+    """
+    buffer = bytearray(block_size)
+    view = memoryview(buffer)
+    with open(path, "rb", buffering=0) as f:
+        while n := f.readinto(buffer):
+            yield view[:n]
+
 
 @dataclass
 class FileInfo:
@@ -26,6 +58,9 @@ class FileInfo:
         is_new: Ist die Datei neu (nicht im letzten Backup)?
         is_modified: Wurde die Datei geändert?
         is_deleted: Wurde die Datei gelöscht?
+        path_str: path als String (vom Scanner vorberechnet)
+        relative_path_str: relative_path als String (vom Scanner vorberechnet)
+        checksum: Inhalts-Fingerabdruck (Scanner.hash_file), falls berechnet
     """
 
     path: Path
@@ -36,6 +71,16 @@ class FileInfo:
     is_new: bool = False
     is_modified: bool = False
     is_deleted: bool = False
+    path_str: str = field(default="", repr=False)
+    relative_path_str: str = field(default="", repr=False)
+    checksum: Optional[str] = field(default=None, repr=False)
+
+    def __post_init__(self) -> None:
+        """Ergänzt die String-Pfade, falls sie nicht mitgegeben wurden"""
+        if not self.path_str:
+            self.path_str = str(self.path)
+        if not self.relative_path_str:
+            self.relative_path_str = str(self.relative_path)
 
     def __hash__(self) -> int:
         """Ermöglicht Verwendung in Sets"""
@@ -61,6 +106,8 @@ class ScanResult:
         unchanged_files: Liste unveränderte Dateien
         total_size: Gesamtgröße aller Dateien in Bytes
         errors: Liste von Fehlern während des Scans
+        backup_paths: Pfade aller zu sichernden Dateien (neu + geändert, Scan-Reihenfolge)
+        backup_size: Gesamtgröße der zu sichernden Dateien in Bytes
     """
 
     total_files: int
@@ -70,6 +117,8 @@ class ScanResult:
     unchanged_files: List[FileInfo]
     total_size: int
     errors: List[str]
+    backup_paths: List[Path] = field(default_factory=list)
+    backup_size: int = 0
 
     @property
     def files_to_backup(self) -> List[FileInfo]:
@@ -88,6 +137,9 @@ class Scanner:
     - Exclude-Pattern-Unterstützung
     """
 
+    # Threads zum parallelen Lesen von Verzeichnissen (I/O-gebunden: scandir + stat)
+    WALK_WORKERS = 8
+
     DEFAULT_EXCLUDE_PATTERNS = {
         # Windows System-Dateien
         "Thumbs.db",
@@ -146,6 +198,9 @@ class Scanner:
         unchanged_files: List[FileInfo] = []
         errors: List[str] = []
         total_size = 0
+        # Beim Scan mitgeführt, damit der Aufrufer nicht erneut iterieren muss
+        backup_paths: List[Path] = []
+        backup_size = 0
 
         # Set für schnellere Lookups
         previous_files = previous_files or {}
@@ -153,7 +208,7 @@ class Scanner:
 
         # Rekursiv alle Dateien scannen
         try:
-            for file_path in self._walk_directory(source_path):
+            for file_path, stat in self._walk_directory(source_path, errors):
                 try:
                     # Progress-Callback aufrufen
                     if progress_callback:
@@ -163,8 +218,7 @@ class Scanner:
                     relative_path = file_path.relative_to(source_path)
                     relative_path_str = str(relative_path)
 
-                    # Datei-Info sammeln
-                    stat = file_path.stat()
+                    # Datei-Info sammeln (stat() lief bereits beim Verzeichnis-Lesen)
                     size = stat.st_size
                     modified = datetime.fromtimestamp(stat.st_mtime)
 
@@ -175,6 +229,7 @@ class Scanner:
                         relative_path=relative_path,
                         size=size,
                         modified=modified,
+                        relative_path_str=relative_path_str,
                     )
 
                     # Change Detection
@@ -189,12 +244,16 @@ class Scanner:
                         ):
                             file_info.is_modified = True
                             modified_files.append(file_info)
+                            backup_paths.append(file_path)
+                            backup_size += size
                         else:
                             unchanged_files.append(file_info)
                     else:
                         # Neue Datei
                         file_info.is_new = True
                         new_files.append(file_info)
+                        backup_paths.append(file_path)
+                        backup_size += size
 
                     # Tracking
                     scanned_paths.add(relative_path_str)
@@ -222,6 +281,7 @@ class Scanner:
                     size=previous_file.size,
                     modified=previous_file.modified,
                     is_deleted=True,
+                    relative_path_str=relative_path_str,
                 )
                 deleted_files.append(deleted_file)
 
@@ -241,34 +301,122 @@ class Scanner:
             unchanged_files=unchanged_files,
             total_size=total_size,
             errors=errors,
+            backup_paths=backup_paths,
+            backup_size=backup_size,
         )
 
-    def _walk_directory(self, path: Path) -> Generator[Path, None, None]:
+    def _walk_directory(
+        self, path: Path, errors: List[str]
+    ) -> Generator[Tuple[Path, os.stat_result], None, None]:
         """
         Generiert alle Dateien in einem Verzeichnis rekursiv
 
+        Unterverzeichnisse werden vorab an einen Thread-Pool übergeben und dort
+        parallel gelesen (scandir + stat); die Ausgabe-Reihenfolge bleibt
+        trotzdem deterministisch (Tiefensuche).
+
         Args:
             path: Verzeichnis zum Durchlaufen
+            errors: Liste, in die Lesefehler einzelner Dateien eingetragen werden
+
+        Yields:
+            (Pfad, stat-Ergebnis) jeder gefundenen Datei
+        """
+        with ThreadPoolExecutor(max_workers=self.WALK_WORKERS, thread_name_prefix="scan") as pool:
+            root_listing = pool.submit(self._list_directory, path, errors)
+            yield from self._walk_listing(pool, root_listing, errors)
+
+    def _walk_listing(
+        self, pool: ThreadPoolExecutor, listing: Future, errors: List[str]
+    ) -> Generator[Tuple[Path, os.stat_result], None, None]:
+        """
+        Gibt die Dateien eines gelesenen Verzeichnisses und rekursiv seiner
+        Unterverzeichnisse aus
+
+        Args:
+            pool: Thread-Pool für das Lesen der Unterverzeichnisse
+            listing: Future mit dem Ergebnis von _list_directory
+            errors: Fehlerliste (siehe _walk_directory)
 
         Yields:
-            Path: Jede gefundene Datei
+            (Pfad, stat-Ergebnis) jeder gefundenen Datei
         """
+        files, subdirs = listing.result()
+
+        # Unterverzeichnisse sofort einreihen, damit sie gelesen werden,
+        # während der Aufrufer noch die Dateien dieses Verzeichnisses verarbeitet
+        pending = [pool.submit(self._list_directory, subdir, errors) for subdir in subdirs]
+
+        yield from files
+        for future in pending:
+            yield from self._walk_listing(pool, future, errors)
+
+    def _list_directory(
+        self, path: Path, errors: List[str]
+    ) -> Tuple[List[Tuple[Path, os.stat_result]], List[Path]]:
+        """
+        Liest ein einzelnes Verzeichnis (läuft in einem Worker-Thread)
+
+        Args:
+            path: Zu lesendes Verzeichnis
+            errors: Fehlerliste (siehe _walk_directory)
+
+        Returns:
+            (Dateien mit stat-Ergebnis, Unterverzeichnisse)
+        """
+        files: List[Tuple[Path, os.stat_result]] = []
+        subdirs: List[Path] = []
+
         try:
-            for item in path.iterdir():
-                # Exclude-Pattern prüfen
-                if self._is_excluded(item):
-                    logger.debug(f"Ausgeschlossen: {item}")
-                    continue
-
-                if item.is_file():
-                    yield item
-                elif item.is_dir():
-                    # Rekursiv in Unterverzeichnis
-                    yield from self._walk_directory(item)
+            with os.scandir(path) as entries:
+                for entry in entries:
+                    item = Path(entry.path)
+
+                    # Exclude-Pattern prüfen
+                    if self._is_excluded(item):
+                        logger.debug("Ausgeschlossen: %s", item)
+                        continue
+
+                    if entry.is_file():
+                        try:
+                            files.append((item, entry.stat()))
+                        except OSError as e:
+                            error_msg = f"Fehler beim Lesen von {item}: {e}"
+                            logger.warning(error_msg)
+                            errors.append(error_msg)
+                    elif entry.is_dir():
+                        # Rekursiv in Unterverzeichnis (über _walk_listing)
+                        subdirs.append(item)
 
         except PermissionError as e:
             logger.warning(f"Keine Berechtigung für {path}: {e}")
 
+        return files, subdirs
+
+    @staticmethod
+    def hash_file(path: Path) -> str:
+        """
+        Berechnet einen Inhalts-Fingerabdruck einer Datei
+
+        Nutzt BLAKE3 (falls installiert), sonst BLAKE2b aus hashlib. Dient nur
+        dem Vergleich von Dateiinhalten, nicht als kryptographische Identität.
+
+        Args:
+            path: Zu hashende Datei
+
+        Returns:
+            Hex-Digest (32 Bytes), mit Präfix des Algorithmus (z.B. "blake3:...")
+        """
+        if blake3 is not None:
+            hasher = blake3.blake3(max_threads=blake3.blake3.AUTO)
+            hasher.update_mmap(path)
+            return f"blake3:{hasher.hexdigest()}"
+
+        hasher = hashlib.blake2b(digest_size=32)
+        for block in _iter_blocks(path, _HASH_CHUNK_SIZE):
+            hasher.update(block)
+        return f"blake2b:{hasher.hexdigest()}"
+
     def _is_excluded(self, path: Path) -> bool:
         """
         Prüft ob ein Pfad durch Exclude-Pattern ausgeschlossen ist
@@ -467,6 +467,7 @@ class BackupTab(QWidget):
             destination_type=destination["type"],
             password=password,
             compression_level=5,
+            max_threads=self.config_manager.get("advanced", "max_threads", 4),
         )
 
         # UI vorbereiten
@@ -606,6 +606,7 @@ class MainWindow(QMainWindow):
             password=password,
             compression_level=1,
             auto_rotate=True,
+            max_threads=self.config_manager.get("advanced", "max_threads", 4),
         )
 
         # Starte Backup in Thread
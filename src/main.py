@@ -66,8 +66,7 @@ def _decide_backup_type(metadata_manager, frequency: str = "daily") -> str:
     """
     max_incrementals = {"monthly": 0, "weekly": 3, "daily": 6}.get(frequency, 2)
 
-    all_backups = metadata_manager.get_all_backups()
-    completed = [b for b in all_backups if b["status"] == "completed"]
+    completed = metadata_manager.get_completed_backups()
 
     if not completed:
         return "full"
@@ -75,8 +74,6 @@ def _decide_backup_type(metadata_manager, frequency: str = "daily") -> str:
     if max_incrementals == 0:
         return "full"
 
-    completed.sort(key=lambda b: b["timestamp"])
-
     last_full_idx = None
     for i, b in enumerate(completed):
         if b.get("type") == "full":
@@ -399,6 +396,7 @@ def start_backup_after_wizard(wizard_config: dict) -> bool:
         password=password,
         exclude_patterns=excludes if excludes else None,
         compression_level=1,
+        max_threads=config_manager.get("advanced", "max_threads", 4),
     )
 
     logger.info(f"Backup starten: {len(sources)} Quellen → {dest_path} (Typ: {dest_type})")
@@ -782,6 +780,7 @@ def run_backup_headless() -> int:
         password=password,
         compression_level=1,
         auto_rotate=True,
+        max_threads=config_manager.get("advanced", "max_threads", 4),
     )
 
     from src.utils.notifications import send_notification
@@ -824,6 +823,7 @@ def run_gui() -> int:
     from PySide6.QtCore import QLibraryInfo, QTranslator
     from PySide6.QtGui import QIcon
     from PySide6.QtWidgets import QApplication
+    from src.core.encryptor import Encryptor
     from src.core.update_checker import UpdateChecker
     from src.gui.main_window import MainWindow
     from src.gui.theme_manager import ThemeManager
@@ -892,6 +892,8 @@ def run_gui() -> int:
             _update_checker.terminate()
 
     app.aboutToQuit.connect(_stop_update_checker)
+    # Abgeleitete Schlüssel nicht über das Programmende hinaus im Cache halten
+    app.aboutToQuit.connect(Encryptor.clear_key_cache)
     _update_checker.start()
 
     # WIZARD IST IMMER DER EINSTIEGSPUNKT
@@ -10,6 +10,9 @@ import platform
 import os
 from pathlib import Path
 
+# Plattform ändert sich zur Laufzeit nicht – einmalig beim Import bestimmen
+_IS_WINDOWS = platform.system() == "Windows"
+
 
 def get_app_data_dir() -> Path:
     """
@@ -19,7 +22,7 @@ def get_app_data_dir() -> Path:
     Linux   : ~/.scrat-backup
     macOS   : ~/.scrat-backup
     """
-    if platform.system() == "Windows":
+    if _IS_WINDOWS:
         local_app_data = os.environ.get("LOCALAPPDATA")
         if local_app_data:
             return Path(local_app_data) / "Scrat-Backup"
@@ -115,6 +115,17 @@ class TestFullBackup:
         encrypted_files = list(backup_dirs[0].glob("*.enc"))
         assert len(encrypted_files) > 0
 
+    def test_full_backup_records_archive_name(self, metadata_db, backup_config):
+        """Test: Archiv-Name wird nach der parallel laufenden Komprimierung nachgetragen"""
+        engine = BackupEngine(metadata_db, backup_config)
+        result = engine.create_full_backup()
+
+        assert result.success is True
+        backup = metadata_db.get_all_backups()[0]
+        files = metadata_db.get_backup_files(backup["id"])
+        assert len(files) == 3
+        assert all(f["archive_name"] == "data.7z.enc" for f in files)
+
     def test_full_backup_with_progress_callback(self, metadata_db, backup_config, temp_source_dir):
         """Test Vollbackup mit Progress-Tracking"""
         progress_updates = []
@@ -175,10 +186,141 @@ class TestFullBackup:
         assert result.success is True
         assert result.files_total == 5  # 3 aus source1 + 2 aus source2
 
+    def test_full_backup_split_archives_encrypted(self, metadata_db, backup_config, tmp_path):
+        """Test Vollbackup mit mehreren Archiv-Teilen (Pipeline)"""
+        import os
+
+        source = tmp_path / "split_source"
+        source.mkdir()
+        for i in range(3):
+            (source / f"random_{i}.bin").write_bytes(os.urandom(1024 * 1024))
+
+        backup_config.sources = [source]
+        backup_config.split_size = 1024 * 1024
+
+        engine = BackupEngine(metadata_db, backup_config)
+        result = engine.create_full_backup()
+
+        assert result.success is True
+        backup_dir = next(p for p in backup_config.destination_path.iterdir() if p.is_dir())
+        assert len(list(backup_dir.glob("*.enc"))) == 3
+        # Unverschlüsselte Teile dürfen nicht liegen bleiben
+        assert list(backup_dir.glob("*.7z")) == []
+        assert result.size_compressed == sum(p.stat().st_size for p in backup_dir.glob("*.enc"))
+
+    def test_full_backup_pipeline_fallback(self, metadata_db, backup_config, tmp_path, monkeypatch):
+        """Test Vollbackup über .7z-Zwischendateien (Fallback ohne Streaming)"""
+        import io
+        import os
+
+        source = tmp_path / "pipeline_source"
+        source.mkdir()
+        for i in range(3):
+            (source / f"random_{i}.bin").write_bytes(os.urandom(1024 * 1024))
+
+        backup_config.sources = [source]
+        backup_config.split_size = 1024 * 1024
+
+        engine = BackupEngine(metadata_db, backup_config)
+
+        def no_streaming(*args, **kwargs):
+            raise io.UnsupportedOperation("kein Streaming")
+
+        monkeypatch.setattr(engine, "_compress_encrypt_streaming", no_streaming)
+        monkeypatch.setattr(engine, "_find_temp_dir", lambda size: (None, "kein Temp"))
+        result = engine.create_full_backup()
+
+        assert result.success is True
+        backup_dir = next(p for p in backup_config.destination_path.iterdir() if p.is_dir())
+        assert len(list(backup_dir.glob("*.enc"))) == 3
+        # .7z-Teile werden im Hintergrund gelöscht, müssen am Ende aber weg sein
+        assert [p.name for p in backup_dir.iterdir() if p.suffix != ".enc"] == []
+        assert result.size_compressed == sum(p.stat().st_size for p in backup_dir.glob("*.enc"))
+
+    def test_backup_stores_content_checksum(self, metadata_db, backup_config, temp_source_dir):
+        """Test: Große Dateien bekommen ihren Inhalts-Fingerabdruck in backup_files.checksum"""
+        import os
+
+        from src.core.scanner import Scanner
+
+        big = temp_source_dir / "image.bin"
+        big.write_bytes(os.urandom(2 * 1024 * 1024))
+        backup_config.dedup_min_size = 1024 * 1024
+
+        engine = BackupEngine(metadata_db, backup_config)
+        result = engine.create_full_backup()
+        assert result.success
+
+        backup = metadata_db.get_all_backups()[0]
+        checksums = {
+            f["relative_path"]: f["checksum"] for f in metadata_db.get_backup_files(backup["id"])
+        }
+        assert checksums["image.bin"] == Scanner.hash_file(big)
+        assert all(c is None for name, c in checksums.items() if name != "image.bin")
+
 
 class TestIncrementalBackup:
     """Tests für inkrementelles Backup"""
 
+    def test_incremental_skips_touched_files_with_same_content(
+        self, metadata_db, backup_config, temp_source_dir
+    ):
+        """Test: Fingerabdruck überspringt Dateien mit neuem Zeitstempel aber gleichem Inhalt"""
+        import os
+
+        big = temp_source_dir / "image.bin"
+        big.write_bytes(os.urandom(2 * 1024 * 1024))
+        backup_config.dedup_min_size = 1024 * 1024
+
+        engine = BackupEngine(metadata_db, backup_config)
+        assert engine.create_full_backup().success
+
+        # Nur Zeitstempel ändern → übersprungen
+        stat = big.stat()
+        os.utime(big, (stat.st_atime, stat.st_mtime + 60))
+        result = engine.create_incremental_backup()
+        assert result.success
+        assert result.files_total == 0
+
+        # Inhalt ändern → wird gesichert
+        with open(big, "r+b") as f:
+            f.seek(1024)
+            f.write(b"changed")
+        os.utime(big, (stat.st_atime, stat.st_mtime + 120))
+        result = engine.create_incremental_backup()
+        assert result.success
+        assert result.files_total == 1
+
+    def test_incremental_records_new_timestamp_of_skipped_files(
+        self, metadata_db, backup_config, temp_source_dir, monkeypatch
+    ):
+        """Test: Übersprungene Datei gilt beim nächsten Scan wieder als unverändert"""
+        import os
+
+        from src.core.scanner import Scanner
+
+        big = temp_source_dir / "image.bin"
+        big.write_bytes(os.urandom(2 * 1024 * 1024))
+        backup_config.dedup_min_size = 1024 * 1024
+
+        engine = BackupEngine(metadata_db, backup_config)
+        assert engine.create_full_backup().success
+
+        stat = big.stat()
+        os.utime(big, (stat.st_atime, stat.st_mtime + 60))
+        assert engine.create_incremental_backup().success
+
+        # Nächstes Backup darf die Datei nicht erneut einlesen
+        hashed = []
+        original = Scanner.hash_file
+        monkeypatch.setattr(
+            Scanner, "hash_file", staticmethod(lambda path: hashed.append(path) or original(path))
+        )
+        result = engine.create_incremental_backup()
+        assert result.success
+        assert result.files_total == 0
+        assert hashed == []
+
     def test_incremental_without_base_fails(self, metadata_db, backup_config):
         """Test inkrementelles Backup ohne Basis schlägt fehl"""
         engine = BackupEngine(metadata_db, backup_config)
@@ -231,6 +373,27 @@ class TestIncrementalBackup:
         assert incr_result.success is True
         assert incr_result.files_total == 0
 
+    def test_incremental_backup_multiple_sources(self, metadata_db, backup_config, tmp_path):
+        """Test inkrementelles Backup ordnet Basis-Dateien der richtigen Quelle zu"""
+        source2 = tmp_path / "source2"
+        source2.mkdir()
+        (source2 / "extra1.txt").write_text("Extra 1")
+
+        backup_config.sources = [backup_config.sources[0], source2]
+        engine = BackupEngine(metadata_db, backup_config)
+
+        full_result = engine.create_full_backup()
+        assert full_result.files_total == 4
+
+        time.sleep(1)
+        (source2 / "extra2.txt").write_text("Extra 2")
+
+        incr_result = engine.create_incremental_backup()
+
+        # Nur die neue Datei in source2, nichts aus source1
+        assert incr_result.success is True
+        assert incr_result.files_total == 1
+
     def test_incremental_backup_with_deletion(self, metadata_db, backup_config, temp_source_dir):
         """Test inkrementelles Backup mit gelöschten Dateien"""
         engine = BackupEngine(metadata_db, backup_config)
@@ -317,6 +480,36 @@ class TestBackupProgress:
 
         assert progress.progress_percentage == 0.0
 
+    def test_report_progress_throttled_within_phase(self, metadata_db, backup_config):
+        """Test Progress-Updates einer Phase werden gedrosselt, Phasenwechsel nicht"""
+        updates = []
+        engine = BackupEngine(metadata_db, backup_config, progress_callback=updates.append)
+
+        progress = BackupProgress(backup_id="test", phase="scanning")
+        for i in range(1000):
+            progress.files_processed = i
+            engine._report_progress(progress)
+        progress.phase = "compressing"
+        engine._report_progress(progress)
+
+        assert len(updates) < 1000
+        assert [p.phase for p in updates][0] == "scanning"
+        assert updates[-1].phase == "compressing"
+        assert updates[-1].files_processed == 999
+
+    def test_report_progress_sends_final_update_of_phase(self, metadata_db, backup_config):
+        """Test: Letztes Update einer Phase wird trotz Drosselung gemeldet"""
+        updates = []
+        engine = BackupEngine(metadata_db, backup_config, progress_callback=updates.append)
+
+        progress = BackupProgress(backup_id="test", phase="compressing", files_total=1000)
+        for i in range(1, 1001):
+            progress.files_processed = i
+            engine._report_progress(progress)
+
+        assert len(updates) < 1000
+        assert updates[-1].files_processed == 1000
+
 
 class TestBackupWithExcludePatterns:
     """Tests für Backup mit Exclude-Patterns"""
@@ -2,6 +2,9 @@
 Unit-Tests für Compressor
 """
 
+import os
+
+import py7zr
 import pytest
 
 from src.core.compressor import Compressor
@@ -76,6 +79,71 @@ class TestCompressorInit:
         with pytest.raises(ValueError, match="split_size muss mindestens 1MB sein"):
             Compressor(split_size=500 * 1024)  # 500KB
 
+    def test_zstd_multithread_compressor_registered(self):
+        """Test: zstd-Worker gelten nur innerhalb des Compressor-Schreibvorgangs"""
+        import src.core.compressor as compressor_module
+
+        if not compressor_module._ZSTD_MT_AVAILABLE:
+            pytest.skip("zstd ohne Multi-Thread-Unterstützung")
+
+        from py7zr import compressor as py7zr_compressor
+
+        original = py7zr_compressor.algorithm_class_map[py7zr.FILTER_ZSTD]
+        with compressor_module._zstd_worker_threads(2):
+            with compressor_module._zstd_worker_threads(2):
+                pass
+            # Verschachtelt/parallel: Eintrag bleibt bis zum letzten Block ersetzt
+            registered = py7zr_compressor.algorithm_class_map[py7zr.FILTER_ZSTD][0]
+            assert registered is compressor_module._MultiThreadZstdCompressor
+            assert compressor_module._zstd_settings.threads == 2
+            compressor = registered(level=3)
+            frame = compressor.compress(b"daten" * 1000) + compressor.flush()
+
+        # Außerhalb: py7zrs Original-Eintrag ist zurück, keine Worker
+        assert py7zr_compressor.algorithm_class_map[py7zr.FILTER_ZSTD] == original
+        assert compressor_module._zstd_settings.threads == 0
+        assert compressor_module._zstd.decompress(frame) == b"daten" * 1000
+
+    def test_split_divides_zstd_threads(self, temp_dir, monkeypatch):
+        """Test: Parallele Archiv-Teile teilen sich das zstd-Thread-Budget"""
+        import src.core.compressor as compressor_module
+
+        monkeypatch.setattr(compressor_module, "_ZSTD_THREADS", 8)
+        seen = []
+        original = Compressor._write_archive
+
+        def recording_write(self, files, target, base_dir, progress, zstd_threads):
+            seen.append(zstd_threads)
+            return original(self, files, target, base_dir, progress, zstd_threads)
+
+        monkeypatch.setattr(Compressor, "_write_archive", recording_write)
+        source = temp_dir / "source"
+        source.mkdir()
+        for index in range(4):
+            (source / f"file{index}.bin").write_bytes(os.urandom(1024 * 1024))
+
+        compressor = Compressor(split_size=1024 * 1024, max_workers=4)
+        compressor.compress_files(sorted(source.iterdir()), temp_dir / "out.7z", base_dir=source)
+
+        assert len(seen) == 4
+        assert set(seen) == {2}
+
+    def test_invalid_algorithm(self):
+        """Test: Unbekannter Algorithmus wird abgelehnt"""
+        with pytest.raises(ValueError, match="Unbekannter Algorithmus"):
+            Compressor(algorithm="rar")
+
+    @pytest.mark.parametrize("algorithm", ["lzma2", "copy"])
+    def test_alternative_algorithm_roundtrip(self, algorithm, sample_files, temp_dir, output_dir):
+        """Test: Alternative 7z-Filter lassen sich wie zstd entpacken"""
+        compressor = Compressor(compression_level=1, algorithm=algorithm)
+
+        archives = compressor.compress_files(sample_files, output_dir / "alt.7z", base_dir=temp_dir)
+        extracted = compressor.extract_archive(archives[0], output_dir / "out")
+
+        assert compressor.algorithm == algorithm
+        assert len(extracted) == len(sample_files)
+
 
 class TestCompressSingle:
     """Tests für Single-Archive-Komprimierung"""
@@ -128,6 +196,25 @@ class TestCompressSingle:
         assert (extract_dir / "subdir" / "file_0.txt").exists()
         assert (extract_dir / "subdir" / "file_1.txt").exists()
 
+    def test_compress_outside_base_dir_uses_file_name(self, temp_dir, output_dir):
+        """Test: Dateien außerhalb von base_dir landen mit Dateinamen im Archiv"""
+        inside = temp_dir / "a" / "b" / "inside.txt"
+        inside.parent.mkdir(parents=True)
+        inside.write_text("innen")
+        outside = output_dir / "outside.txt"
+        outside.write_text("außen")
+
+        compressor = Compressor()
+        archives = compressor.compress_files(
+            [inside, outside], output_dir / "test_outside.7z", base_dir=temp_dir
+        )
+
+        with py7zr.SevenZipFile(archives[0], "r") as archive:
+            names = set(archive.getnames())
+
+        assert "a/b/inside.txt" in names
+        assert "outside.txt" in names
+
     def test_compress_empty_list(self, output_dir):
         """Test: Fehler bei leerer Dateiliste"""
         compressor = Compressor()
@@ -162,6 +249,44 @@ class TestCompressSingle:
         assert progress_calls[-1][0] == 5
         assert all(call[1] == 5 for call in progress_calls)
 
+    def test_compress_with_readahead_window(self, temp_dir, output_dir, monkeypatch):
+        """Test: Readahead-Fenster kleiner als Dateianzahl, fehlende Datei wird ignoriert"""
+        monkeypatch.setattr(Compressor, "READAHEAD_FILES", 2)
+        files = []
+        for i in range(5):
+            file_path = temp_dir / f"ra_{i}.txt"
+            file_path.write_text(f"Inhalt {i}")
+            files.append(file_path)
+        files.append(temp_dir / "fehlt.txt")
+
+        compressor = Compressor()
+        archives = compressor.compress_files(files, output_dir / "ra.7z")
+
+        assert len(archives) == 1
+        assert archives[0].exists()
+
+    def test_compress_with_prefetch_thread(self, temp_dir, output_dir, monkeypatch):
+        """Test: Ohne posix_fadvise liest ein Thread vor, Ergebnis bleibt gleich"""
+        import threading
+
+        import src.core.compressor as compressor_module
+
+        monkeypatch.setattr(compressor_module, "_FADVISE_AVAILABLE", False)
+        monkeypatch.setattr(Compressor, "PREFETCH_FILES", 2)
+        files = []
+        for i in range(6):
+            file_path = temp_dir / f"pf_{i}.txt"
+            file_path.write_text(f"Inhalt {i}" * 1000)
+            files.append(file_path)
+        files.append(temp_dir / "fehlt.txt")
+
+        compressor = Compressor()
+        archives = compressor.compress_files(files, output_dir / "pf.7z", base_dir=temp_dir)
+        extracted = compressor.extract_archive(archives[0], output_dir / "out")
+
+        assert sorted(f.name for f in extracted) == sorted(f.name for f in files[:-1])
+        assert not any(t.name == "scrat-prefetch" for t in threading.enumerate())
+
 
 class TestCompressSplit:
     """Tests für Split-Archive-Komprimierung"""
@@ -191,6 +316,139 @@ class TestCompressSplit:
         assert archives[0].name == "split.001.7z"
         assert archives[1].name == "split.002.7z"
 
+    def test_archive_callback_per_part(self, temp_dir, output_dir):
+        """Test: archive_callback wird für jeden fertigen Teil aufgerufen"""
+        files = []
+        for i in range(3):
+            file_path = temp_dir / f"part_{i}.bin"
+            file_path.write_bytes(b"x" * (2 * 1024 * 1024))
+            files.append(file_path)
+
+        compressor = Compressor(split_size=3 * 1024 * 1024)
+        finished = []
+
+        archives = compressor.compress_files(
+            files, output_dir / "cb.7z", archive_callback=finished.append
+        )
+
+        assert finished == archives
+        assert len(finished) == 3
+
+    def test_parallel_split_matches_sequential(self, temp_dir, output_dir):
+        """Test: Parallel geschriebene Teile entsprechen der sequentiellen Aufteilung"""
+        files = []
+        for i in range(4):
+            file_path = temp_dir / f"par_{i}.bin"
+            file_path.write_bytes(bytes([i]) * (2 * 1024 * 1024))
+            files.append(file_path)
+
+        sequential = Compressor(split_size=3 * 1024 * 1024, max_workers=1)
+        parallel = Compressor(split_size=3 * 1024 * 1024, max_workers=4)
+
+        seq_archives = sequential.compress_files(files, output_dir / "seq.7z")
+
+        progress_calls = []
+        finished = []
+        par_archives = parallel.compress_files(
+            files,
+            output_dir / "par.7z",
+            progress_callback=lambda current, total, name: progress_calls.append(
+                (current, total)
+            ),
+            archive_callback=finished.append,
+        )
+
+        # Teil-Reihenfolge bleibt erhalten (erstes Archiv = Metadaten)
+        assert [a.name for a in par_archives] == [
+            a.name.replace("seq", "par") for a in seq_archives
+        ]
+        assert finished == par_archives
+
+        # Fortschritt zählt über alle Teile hinweg bis zur Gesamtanzahl
+        assert progress_calls == [(i, len(files)) for i in range(1, len(files) + 1)]
+
+        extracted = parallel.extract_split_archives(par_archives, output_dir / "out")
+        assert len(extracted) == len(files)
+
+    def test_pack_chunks_first_fit_decreasing(self, temp_dir):
+        """Test: Kleine Dateien füllen Lücken früherer Teile auf"""
+        mb = 1024 * 1024
+        compressor = Compressor(split_size=10 * mb)
+        sized = [
+            (6 * mb, temp_dir / "a"),
+            (4 * mb, temp_dir / "c"),
+            (6 * mb, temp_dir / "b"),
+            (4 * mb, temp_dir / "d"),
+            (12 * mb, temp_dir / "gross"),
+        ]
+
+        chunks = compressor._pack_chunks(sized)
+
+        # Next-Fit bräuchte [gross] [a] [b, c] [d] – First-Fit kommt mit drei aus
+        assert chunks == [
+            [temp_dir / "gross"],
+            [temp_dir / "a", temp_dir / "c"],
+            [temp_dir / "b", temp_dir / "d"],
+        ]
+
+    def test_stat_files_skips_missing(self, temp_dir):
+        """Test: _stat_files liefert Größen und überspringt fehlende Dateien"""
+        existing = temp_dir / "da.bin"
+        existing.write_bytes(b"x" * 1234)
+
+        sized = Compressor._stat_files([existing, temp_dir / "weg.bin"])
+
+        assert sized == [(1234, existing)]
+
+    def test_stat_files_uses_known_sizes(self, temp_dir):
+        """Test: Bekannte Größen aus dem Scan ersetzen stat()"""
+        known = temp_dir / "bekannt.bin"
+        known.write_bytes(b"x" * 10)
+        unknown = temp_dir / "unbekannt.bin"
+        unknown.write_bytes(b"x" * 20)
+
+        # Abweichende Scan-Größe zeigt, dass für known kein stat() erfolgt
+        sized = Compressor._stat_files([known, unknown], {known: 999})
+
+        assert sized == [(999, known), (20, unknown)]
+
+    def test_invalid_max_workers(self):
+        """Test: max_workers muss mindestens 1 sein"""
+        with pytest.raises(ValueError, match="max_workers muss mindestens 1"):
+            Compressor(max_workers=0)
+
+    def test_compress_into_sink(self, temp_dir, output_dir):
+        """Test: Archive werden in die Streams der sink_factory geschrieben"""
+        import io
+
+        import py7zr
+
+        files = []
+        for i in range(3):
+            file_path = temp_dir / f"sink_{i}.txt"
+            file_path.write_text(f"Inhalt {i}")
+            files.append(file_path)
+
+        sinks = {}
+
+        class KeepOpen(io.BytesIO):
+            def close(self):
+                sinks[self.name] = self.getvalue()
+                super().close()
+
+        def factory(archive_path):
+            sink = KeepOpen()
+            sink.name = archive_path.name
+            return sink
+
+        compressor = Compressor()
+        archives = compressor.compress_files(files, output_dir / "sink.7z", sink_factory=factory)
+
+        assert [a.name for a in archives] == ["sink.7z"]
+        assert not archives[0].exists()  # Nichts auf Platte geschrieben
+        with py7zr.SevenZipFile(io.BytesIO(sinks["sink.7z"]), "r") as archive:
+            assert sorted(archive.getnames()) == ["sink_0.txt", "sink_1.txt", "sink_2.txt"]
+
     def test_split_single_large_file(self, temp_dir, output_dir):
         """Test: Einzelne Datei größer als split_size"""
         # Erstelle Datei größer als split_size
@@ -274,6 +532,44 @@ class TestExtract:
         assert progress_calls[0][0] == 1
         assert progress_calls[-1][0] == 5
 
+    def test_extract_survives_failing_progress_callback(self, temp_dir, output_dir):
+        """Test: Fehler im Progress-Callback brechen das Entpacken nicht ab"""
+        files = []
+        for i in range(3):
+            file_path = temp_dir / f"file_{i}.txt"
+            file_path.write_text(f"Content {i}")
+            files.append(file_path)
+
+        compressor = Compressor()
+        archive_path = output_dir / "test.7z"
+        compressor.compress_files(files, archive_path)
+
+        def failing_callback(current, total, filename):
+            raise RuntimeError("GUI weg")
+
+        extracted = compressor.extract_archive(
+            archive_path, output_dir / "extracted", progress_callback=failing_callback
+        )
+
+        assert len(extracted) == 3
+
+    def test_extract_skips_directory_entries(self, temp_dir, output_dir):
+        """Test: Verzeichnis-Einträge im Archiv werden nicht als Dateien gemeldet"""
+        sub_dir = temp_dir / "subdir"
+        sub_dir.mkdir()
+        (sub_dir / "file.txt").write_text("Inhalt")
+
+        archive_path = output_dir / "dirs.7z"
+        with py7zr.SevenZipFile(archive_path, "w") as archive:
+            archive.write(sub_dir, arcname="subdir")
+            archive.write(sub_dir / "file.txt", arcname="subdir/file.txt")
+
+        extract_dir = output_dir / "extracted"
+        extracted = Compressor().extract_archive(archive_path, extract_dir)
+
+        assert extracted == [extract_dir / "subdir" / "file.txt"]
+        assert (extract_dir / "subdir").is_dir()
+
     def test_extract_split_archives(self, temp_dir, output_dir):
         """Test: Extrahiere Split-Archive"""
         # Erstelle Split-Archive
@@ -295,6 +591,33 @@ class TestExtract:
         assert len(extracted) == 5
         assert all(f.exists() for f in extracted)
 
+    def test_extract_split_archives_parallel_order(self, temp_dir, output_dir):
+        """Test: Paralleles Entpacken liefert Dateien in Archiv-Reihenfolge"""
+        files = []
+        for i in range(4):
+            file_path = temp_dir / f"file_{i}.bin"
+            file_path.write_bytes(bytes([i]) * (2 * 1024 * 1024))
+            files.append(file_path)
+
+        archives = Compressor(split_size=3 * 1024 * 1024).compress_files(
+            files, output_dir / "split.7z"
+        )
+
+        sequential = Compressor(max_workers=1).extract_split_archives(
+            archives, output_dir / "seq"
+        )
+        progress_calls = []
+        parallel = Compressor(max_workers=4).extract_split_archives(
+            archives,
+            output_dir / "par",
+            progress_callback=lambda current, total, name: progress_calls.append(name),
+        )
+
+        assert [f.name for f in parallel] == [f.name for f in sequential]
+        assert sorted(progress_calls) == sorted(f.name for f in files)
+        for extracted in parallel:
+            assert extracted.read_bytes() == (temp_dir / extracted.name).read_bytes()
+
 
 class TestArchiveInfo:
     """Tests für Archive-Informationen"""
@@ -327,6 +650,35 @@ class TestArchiveInfo:
         assert info["uncompressed_size"] > 0
         assert 0 <= info["compression_ratio"] <= 1
 
+    def test_get_archive_info_cached_until_modified(self, temp_dir, output_dir, monkeypatch):
+        """Test: Unverändertes Archiv wird nicht erneut geöffnet"""
+        file_path = temp_dir / "file.txt"
+        file_path.write_text("x" * 1000)
+
+        compressor = Compressor()
+        archive_path = output_dir / "test.7z"
+        compressor.compress_files([file_path], archive_path)
+        first = compressor.get_archive_info(archive_path)
+
+        opened = []
+        original = py7zr.SevenZipFile
+
+        def counting_open(*args, **kwargs):
+            opened.append(args[0])
+            return original(*args, **kwargs)
+
+        monkeypatch.setattr("src.core.compressor.py7zr.SevenZipFile", counting_open)
+
+        assert compressor.get_archive_info(archive_path) == first
+        assert opened == []
+
+        # Neu geschriebenes Archiv → neue Informationen
+        (temp_dir / "second.txt").write_text("y" * 1000)
+        compressor.compress_files([file_path, temp_dir / "second.txt"], archive_path)
+
+        assert compressor.get_archive_info(archive_path)["files"] == 2
+        assert len(opened) >= 1
+
     def test_get_archive_info_nonexistent(self, output_dir):
         """Test: Fehler bei nicht existierendem Archiv"""
         compressor = Compressor()
@@ -56,6 +56,15 @@ class TestConfigManagerInit:
 class TestConfigManagerLoadSave:
     """Tests für Laden/Speichern"""
 
+    def test_from_dict_merges_defaults(self, temp_config_file):
+        """Test dass from_dict() ohne Datei-Lesen mit Defaults merged"""
+        manager = ConfigManager.from_dict({"general": {"language": "en"}}, temp_config_file)
+
+        assert manager.config_file == temp_config_file
+        assert manager.get("general", "language") == "en"
+        assert manager.get("general", "theme") == "system"
+        assert not temp_config_file.exists()
+
     def test_save_creates_file(self, config_manager):
         """Test dass save() Datei erstellt"""
         config_manager.save()
@@ -105,6 +114,24 @@ class TestConfigManagerLoadSave:
         assert config_file.parent.exists()
         assert config_file.exists()
 
+    def test_save_failure_keeps_previous_file(self, temp_config_file, monkeypatch):
+        """Test dass ein fehlgeschlagenes Speichern die alte Datei unverändert lässt"""
+        manager = ConfigManager(config_file=temp_config_file)
+        manager.save()
+        previous = temp_config_file.read_bytes()
+
+        def broken_replace(src, dst):
+            raise OSError("Datenträger voll")
+
+        monkeypatch.setattr("src.core.config_manager.os.replace", broken_replace)
+        manager.set("general", "language", "en")
+
+        with pytest.raises(OSError):
+            manager.save()
+
+        assert temp_config_file.read_bytes() == previous
+        assert list(temp_config_file.parent.glob("*.tmp")) == []
+
     def test_saved_json_format(self, config_manager):
         """Test dass gespeichertes JSON korrekt formatiert ist"""
         config_manager.set("general", "language", "en")
@@ -117,6 +144,14 @@ class TestConfigManagerLoadSave:
         assert data["general"]["language"] == "en"
         assert isinstance(data, dict)
 
+    def test_dump_json_matches_stdlib_format(self):
+        """Test dass das Format unabhängig vom JSON-Backend gleich bleibt"""
+        config = {"general": {"language": "de", "name": "Müll"}, "big": 2**70}
+
+        dumped = ConfigManager._dump_json(config)
+
+        assert dumped == json.dumps(config, indent=2, ensure_ascii=False).encode("utf-8")
+
 
 class TestConfigManagerGetSet:
     """Tests für Getter/Setter"""
@@ -249,6 +284,15 @@ class TestConfigManagerMerge:
         assert manager.get("general", "language") == "en"
         assert manager.get("general", "custom_key") == "custom_value"
 
+    def test_merge_does_not_modify_defaults(self):
+        """Test dass der Merge die Klassen-Defaults nicht verändert"""
+        manager = ConfigManager.from_dict({"general": {"language": "en"}})
+
+        manager.config["storage"]["smb_shares"].append({"name": "nas"})
+
+        assert ConfigManager.DEFAULTS["general"]["language"] == "de"
+        assert ConfigManager.DEFAULTS["storage"]["smb_shares"] == []
+
 
 class TestConfigManagerDefaults:
     """Tests für Default-Werte"""
@@ -147,6 +147,22 @@ class TestScanDirectory:
         assert str(Path("subdir") / "file3.txt") in relative_paths
         assert str(Path("subdir") / "nested" / "file5.txt") in relative_paths
 
+    def test_parallel_walk_matches_single_thread(self, tmp_path, monkeypatch):
+        """Test: Paralleles Verzeichnis-Lesen liefert dieselbe Reihenfolge wie ein Thread"""
+        for i in range(5):
+            sub = tmp_path / f"dir{i}" / "deep"
+            sub.mkdir(parents=True)
+            for j in range(3):
+                (sub / f"f{j}.txt").write_text(f"{i}-{j}")
+                (sub.parent / f"g{j}.txt").write_text(f"{i}-{j}")
+
+        parallel = Scanner().scan_directory(tmp_path)
+        monkeypatch.setattr(Scanner, "WALK_WORKERS", 1)
+        single = Scanner().scan_directory(tmp_path)
+
+        assert parallel.total_files == 30
+        assert parallel.backup_paths == single.backup_paths
+
     def test_scan_with_progress_callback(self, sample_directory):
         """Test: Progress-Callback wird aufgerufen"""
         scanner = Scanner()
@@ -407,6 +423,23 @@ class TestScanResult:
         assert any(f.relative_path == Path("new.txt") for f in files_to_backup)
         assert any(f.relative_path == Path("old.txt") for f in files_to_backup)
 
+    def test_backup_paths_and_size(self, temp_source_dir):
+        """Test: backup_paths/backup_size entsprechen files_to_backup"""
+        (temp_source_dir / "old.txt").write_text("Old")
+        (temp_source_dir / "same.txt").write_text("Same")
+        scanner = Scanner()
+        first_result = scanner.scan_directory(temp_source_dir)
+        previous_files = {str(f.relative_path): f for f in first_result.new_files}
+
+        (temp_source_dir / "new.txt").write_text("New")
+        (temp_source_dir / "old.txt").write_text("Modified")
+
+        result = scanner.scan_directory(temp_source_dir, previous_files=previous_files)
+
+        files_to_backup = result.files_to_backup
+        assert sorted(result.backup_paths) == sorted(f.path for f in files_to_backup)
+        assert result.backup_size == sum(f.size for f in files_to_backup)
+
 
 class TestErrorHandling:
     """Tests für Fehlerbehandlung"""
@@ -454,6 +487,23 @@ class TestFileInfo:
         assert not file_info.is_modified
         assert not file_info.is_deleted
 
+    def test_file_info_path_strings(self, sample_directory):
+        """Test: String-Pfade werden vom Scanner mitgeliefert bzw. ergänzt"""
+        file_info = FileInfo(
+            path=Path("/test/sub/file.txt"),
+            source_dir=Path("/test"),
+            relative_path=Path("sub/file.txt"),
+            size=1024,
+            modified=datetime.now(),
+        )
+        assert file_info.path_str == str(Path("/test/sub/file.txt"))
+        assert file_info.relative_path_str == str(Path("sub/file.txt"))
+
+        result = Scanner().scan_directory(sample_directory)
+        for f in result.new_files:
+            assert f.path_str == str(f.path)
+            assert f.relative_path_str == str(f.relative_path)
+
     def test_file_info_hashable(self):
         """Test: FileInfo kann in Sets verwendet werden"""
         file_info1 = FileInfo(
@@ -473,3 +523,29 @@ class TestFileInfo:
         # Gleicher Pfad -> gleicher Hash
         file_set = {file_info1, file_info2}
         assert len(file_set) == 1
+
+
+class TestHashFile:
+    """Tests für Inhalts-Fingerabdrücke"""
+
+    def test_hash_file_content_based(self, temp_source_dir):
+        """Test: Gleicher Inhalt -> gleicher Hash, anderer Inhalt -> anderer Hash"""
+        a = temp_source_dir / "a.bin"
+        b = temp_source_dir / "b.bin"
+        c = temp_source_dir / "c.bin"
+        a.write_bytes(b"x" * 100_000)
+        b.write_bytes(b"x" * 100_000)
+        c.write_bytes(b"y" * 100_000)
+
+        assert Scanner.hash_file(a) == Scanner.hash_file(b)
+        assert Scanner.hash_file(a) != Scanner.hash_file(c)
+
+    def test_hash_file_without_blake3(self, temp_source_dir, monkeypatch):
+        """Test: Fallback auf BLAKE2b ohne blake3-Modul"""
+        import src.core.scanner as scanner_module
+
+        monkeypatch.setattr(scanner_module, "blake3", None)
+        empty = temp_source_dir / "empty.bin"
+        empty.write_bytes(b"")
+
+        assert Scanner.hash_file(empty).startswith("blake2b:")
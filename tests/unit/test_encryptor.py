@@ -58,6 +58,85 @@ class TestEncryptor:
         assert enc1.key == enc2.key
         assert enc1.get_key_hash() == enc2.get_key_hash()
 
+    def test_key_derivation_cached_per_salt(self, password, monkeypatch):
+        """Test: Key wird pro (Passwort, Salt) nur einmal abgeleitet"""
+        from src.core import encryptor as encryptor_module
+
+        Encryptor.clear_key_cache()
+        derive_calls = []
+        original_derive = encryptor_module.PBKDF2HMAC.derive
+
+        def counting_derive(self, key_material):
+            derive_calls.append(key_material)
+            return original_derive(self, key_material)
+
+        monkeypatch.setattr(encryptor_module.PBKDF2HMAC, "derive", counting_derive)
+        salt = secrets.token_bytes(Encryptor.SALT_SIZE)
+
+        enc1 = Encryptor(password, salt=salt)
+        enc2 = Encryptor(password, salt=salt)
+        assert enc1.key == enc2.key
+        assert len(derive_calls) == 1
+
+        Encryptor.clear_key_cache()
+        Encryptor(password, salt=salt)
+        assert len(derive_calls) == 2
+
+    def test_key_cache_evicts_and_wipes_oldest(self, password, monkeypatch):
+        """Test: Key-Cache ist begrenzt, hält kein Klartext-Passwort und überschreibt Keys"""
+        from core import encryptor as encryptor_module
+
+        Encryptor.clear_key_cache()
+        monkeypatch.setattr(encryptor_module, "KEY_CACHE_SIZE", 2)
+        salts = [secrets.token_bytes(Encryptor.SALT_SIZE) for _ in range(3)]
+
+        Encryptor(password, salt=salts[0])
+        oldest = next(iter(encryptor_module._key_cache.values()))
+        Encryptor(password, salt=salts[1])
+        Encryptor(password, salt=salts[2])
+
+        cache_keys = list(encryptor_module._key_cache)
+        assert [key[1] for key in cache_keys] == salts[1:]
+        assert all(password.encode() not in key for key in cache_keys)
+        assert oldest == bytes(Encryptor.KEY_SIZE)
+        Encryptor.clear_key_cache()
+
+    def test_close_wipes_key(self, password):
+        """Test: close() überschreibt den Key und sperrt weitere Verschlüsselung"""
+        with Encryptor(password) as enc:
+            key = enc.key
+            ciphertext, nonce = enc.encrypt_bytes(b"daten")
+
+        assert key == bytes(Encryptor.KEY_SIZE)
+        assert enc.password is None
+        with pytest.raises(ValueError, match="geschlossen"):
+            enc.decrypt_bytes(ciphertext, nonce)
+        with pytest.raises(ValueError, match="geschlossen"):
+            enc.encrypt_stream(BytesIO(b"daten"), BytesIO())
+        enc.close()  # Mehrfacher Aufruf ist erlaubt
+
+    def test_scrypt_kdf(self, password):
+        """Test: scrypt leitet reproduzierbar einen anderen Key als PBKDF2 ab"""
+        salt = secrets.token_bytes(Encryptor.SALT_SIZE)
+
+        enc1 = Encryptor(password, salt=salt, kdf=Encryptor.KDF_SCRYPT)
+        enc2 = Encryptor(password, salt=salt, kdf=Encryptor.KDF_SCRYPT)
+        legacy = Encryptor(password, salt=salt)
+
+        assert enc1.kdf == Encryptor.KDF_SCRYPT
+        assert legacy.kdf == Encryptor.KDF_PBKDF2
+        assert enc1.key == enc2.key
+        assert len(enc1.key) == Encryptor.KEY_SIZE
+        assert enc1.key != legacy.key
+
+    def test_unknown_kdf_rejected(self, password):
+        """Test: Unbekannte oder unvollständige KDF-Kennungen werden abgelehnt"""
+        with pytest.raises(ValueError, match="Unbekannte Key-Derivation"):
+            Encryptor(password, kdf="md5")
+
+        with pytest.raises(ValueError, match="scrypt benötigt"):
+            Encryptor(password, kdf="scrypt:n=1024")
+
     def test_different_salt_different_key(self, password):
         """Test: Unterschiedliche Salts = Unterschiedliche Keys"""
         enc1 = Encryptor(password)
@@ -241,6 +320,408 @@ class TestEncryptor:
 
         assert decrypted == plaintext
 
+    def test_stream_blocks_compatible_with_bytes(self, encryptor, monkeypatch):
+        """Test: Blockweise Stream-Verschlüsselung entspricht encrypt_bytes"""
+        monkeypatch.setattr(Encryptor, "STREAM_BLOCK_SIZE", 7)
+        plaintext = secrets.token_bytes(100)
+
+        encrypted_stream = BytesIO()
+        nonce = encryptor.encrypt_stream(BytesIO(plaintext), encrypted_stream)
+        ciphertext, _ = encryptor.encrypt_bytes(plaintext, nonce=nonce)
+        assert encrypted_stream.getvalue() == ciphertext
+
+        decrypted_stream = BytesIO()
+        encryptor.decrypt_stream(BytesIO(ciphertext), decrypted_stream, nonce)
+        assert decrypted_stream.getvalue() == plaintext
+
+    def test_decrypt_stream_detects_tampering(self, encryptor, monkeypatch):
+        """Test: Manipulierte oder zu kurze Streams schlagen fehl"""
+        monkeypatch.setattr(Encryptor, "STREAM_BLOCK_SIZE", 7)
+        ciphertext, nonce = encryptor.encrypt_bytes(b"x" * 50)
+        tampered = bytearray(ciphertext)
+        tampered[3] ^= 1
+
+        with pytest.raises(InvalidTag):
+            encryptor.decrypt_stream(BytesIO(bytes(tampered)), BytesIO(), nonce)
+        with pytest.raises(InvalidTag):
+            encryptor.decrypt_stream(BytesIO(ciphertext[:10]), BytesIO(), nonce)
+
+    def test_encrypted_writer_roundtrip(self, encryptor, tmp_path, monkeypatch):
+        """Test: Verschlüsselungs-Stream ist mit decrypt_file lesbar (mehrere Chunks)"""
+        monkeypatch.setattr(Encryptor, "CHUNK_SIZE", 1024)
+        data = secrets.token_bytes(5000)
+        encrypted = tmp_path / "stream.enc"
+
+        with encryptor.open_encrypted_writer(encrypted) as writer:
+            for i in range(0, len(data), 700):
+                writer.write(data[i : i + 700])
+            # Wie py7zr: Header am Dateianfang nachträglich überschreiben
+            writer.seek(0)
+            writer.write(b"HEAD")
+            writer.seek(0, 2)
+
+        decrypted = tmp_path / "stream.out"
+        encryptor.decrypt_file(encrypted, decrypted)
+        assert decrypted.read_bytes() == b"HEAD" + data[4:]
+        assert writer.bytes_written == encrypted.stat().st_size
+
+    def test_decrypt_file_parallel_chunks(self, encryptor, tmp_path, monkeypatch):
+        """Test: Parallel entschlüsselte Chunks werden in Datei-Reihenfolge geschrieben"""
+        monkeypatch.setattr(Encryptor, "CHUNK_SIZE", 1024)
+        data = secrets.token_bytes(10_000)
+        encrypted = tmp_path / "stream.enc"
+        with encryptor.open_encrypted_writer(encrypted) as writer:
+            writer.write(data)
+
+        monkeypatch.setattr(Encryptor, "_chunk_workers", lambda self, size, chunk: 3)
+        decrypted = tmp_path / "stream.out"
+        encryptor.decrypt_file(encrypted, decrypted)
+
+        assert decrypted.read_bytes() == data
+
+    def test_decrypt_legacy_chunked_format(self, encryptor, tmp_path):
+        """Test: SCRAT001-Dateien (Nonce pro Chunk gespeichert) bleiben lesbar"""
+        chunks = [b"a" * 100, b"b" * 50]
+        legacy = bytearray(b"SCRAT001" + (100).to_bytes(4, "big"))
+        for chunk in chunks:
+            ciphertext, nonce = encryptor.encrypt_bytes(chunk)
+            legacy += len(ciphertext).to_bytes(4, "big") + nonce + ciphertext
+        legacy += b"\x00\x00\x00\x00"
+
+        encrypted = tmp_path / "legacy.enc"
+        encrypted.write_bytes(bytes(legacy))
+        decrypted = tmp_path / "legacy.out"
+        encryptor.decrypt_file(encrypted, decrypted)
+
+        assert decrypted.read_bytes() == b"".join(chunks)
+
+    def _split_chunks(self, path):
+        """Zerlegt eine SCRAT003-Datei in Header und Chunk-Records"""
+        raw = path.read_bytes()
+        header_size = 8 + 4 + Encryptor.NONCE_SIZE
+        header, pos, records = raw[:header_size], header_size, []
+        while raw[pos : pos + 4] != b"\x00\x00\x00\x00":
+            length = int.from_bytes(raw[pos : pos + 4], "big")
+            records.append(raw[pos : pos + 4 + length])
+            pos += 4 + length
+        return header, records
+
+    def test_decrypt_detects_truncated_file(self, encryptor, tmp_path, monkeypatch):
+        """Test: Abgeschnittene letzte Chunks werden trotz Ende-Marker erkannt"""
+        monkeypatch.setattr(Encryptor, "CHUNK_SIZE", 1024)
+        encrypted = tmp_path / "stream.enc"
+        with encryptor.open_encrypted_writer(encrypted) as writer:
+            writer.write(secrets.token_bytes(5000))
+
+        header, records = self._split_chunks(encrypted)
+        encrypted.write_bytes(header + b"".join(records[:-1]) + b"\x00\x00\x00\x00")
+
+        with pytest.raises(InvalidTag):
+            encryptor.decrypt_file(encrypted, tmp_path / "out")
+
+        # Auch das Entfernen aller Chunks fällt auf
+        encrypted.write_bytes(header + b"\x00\x00\x00\x00")
+        with pytest.raises(ValueError):
+            encryptor.decrypt_file(encrypted, tmp_path / "out")
+
+    def _patch_short_reads(self, monkeypatch):
+        """Lässt open(..., "rb") im Encryptor höchstens 1000 Bytes pro Read liefern"""
+        import builtins
+        import io
+
+        from core import encryptor as encryptor_module
+
+        class ShortReads(io.RawIOBase):
+            def __init__(self, path):
+                self._file = builtins.open(path, "rb", buffering=0)
+
+            def readable(self):
+                return True
+
+            def fileno(self):
+                return self._file.fileno()
+
+            def seekable(self):
+                return True
+
+            def seek(self, offset, whence=0):
+                return self._file.seek(offset, whence)
+
+            def tell(self):
+                return self._file.tell()
+
+            def readinto(self, buffer):
+                return self._file.readinto(memoryview(buffer)[:1000])
+
+            def close(self):
+                self._file.close()
+                super().close()
+
+        def short_open(path, mode="r", *args, **kwargs):
+            if mode == "rb":
+                return ShortReads(path)
+            return builtins.open(path, mode, *args, **kwargs)
+
+        monkeypatch.setattr(encryptor_module, "open", short_open, raising=False)
+
+    def test_decrypt_file_tolerates_short_reads(self, encryptor, tmp_path, monkeypatch):
+        """Test: Kurze Reads (z.B. SMB/FUSE) werden bis zum vollen Chunk wiederholt"""
+        monkeypatch.setattr(Encryptor, "CHUNK_SIZE", 4096)
+        data = secrets.token_bytes(20_000)
+        encrypted = tmp_path / "stream.enc"
+        with encryptor.open_encrypted_writer(encrypted) as writer:
+            writer.write(data)
+
+        self._patch_short_reads(monkeypatch)
+        decrypted = tmp_path / "stream.out"
+        encryptor.decrypt_file(encrypted, decrypted)
+
+        assert decrypted.read_bytes() == data
+
+    def test_encrypt_small_file_tolerates_short_reads(self, encryptor, tmp_path, monkeypatch):
+        """Test: Kleine Dateien werden trotz kurzer Reads vollständig verschlüsselt"""
+        data = secrets.token_bytes(5000)
+        source = tmp_path / "small.bin"
+        source.write_bytes(data)
+        encrypted = tmp_path / "small.enc"
+
+        with monkeypatch.context() as patch:
+            self._patch_short_reads(patch)
+            encryptor.encrypt_file(source, encrypted)
+
+        decrypted = tmp_path / "small.out"
+        encryptor.decrypt_file(encrypted, decrypted)
+        assert decrypted.read_bytes() == data
+
+    def test_encrypt_file_fills_chunks_despite_short_reads(self, encryptor, tmp_path, monkeypatch):
+        """Test: Kurze Reads beim Verschlüsseln ergeben trotzdem volle Chunks"""
+        monkeypatch.setattr(Encryptor, "CHUNK_SIZE", 4096)
+        data = secrets.token_bytes(20_000)
+        source = tmp_path / "large.bin"
+        source.write_bytes(data)
+        encrypted = tmp_path / "large.enc"
+
+        with monkeypatch.context() as patch:
+            self._patch_short_reads(patch)
+            encryptor.encrypt_file(source, encrypted)
+
+        _, records = self._split_chunks(encrypted)
+        assert [len(r) - 4 - 16 for r in records] == [4096] * 4 + [20_000 - 4 * 4096]
+
+        decrypted = tmp_path / "large.out"
+        encryptor.decrypt_file(encrypted, decrypted)
+        assert decrypted.read_bytes() == data
+
+    def test_decrypt_detects_missing_end_marker(self, encryptor, tmp_path, monkeypatch):
+        """Test: Mitten im Chunk-Kopf abgeschnittene Dateien werden abgelehnt"""
+        monkeypatch.setattr(Encryptor, "CHUNK_SIZE", 1024)
+        encrypted = tmp_path / "stream.enc"
+        with encryptor.open_encrypted_writer(encrypted) as writer:
+            writer.write(secrets.token_bytes(5000))
+
+        header, records = self._split_chunks(encrypted)
+        encrypted.write_bytes(header + b"".join(records[:2]) + records[2][:2])
+
+        with pytest.raises(ValueError, match="abgeschnitten"):
+            encryptor.decrypt_file(encrypted, tmp_path / "out")
+
+    def test_decrypt_rejects_oversized_chunk_length(self, encryptor, tmp_path, monkeypatch):
+        """Test: Manipulierte Chunk-Längen werden vor dem Allokieren abgelehnt"""
+        monkeypatch.setattr(Encryptor, "CHUNK_SIZE", 1024)
+        encrypted = tmp_path / "stream.enc"
+        with encryptor.open_encrypted_writer(encrypted) as writer:
+            writer.write(secrets.token_bytes(5000))
+
+        header, records = self._split_chunks(encrypted)
+        oversized = b"\xff\xff\xff\xff" + records[0][4:]
+        encrypted.write_bytes(header + oversized + b"".join(records[1:]) + b"\x00\x00\x00\x00")
+
+        with pytest.raises(ValueError, match="Ungültige Chunk-Länge"):
+            encryptor.decrypt_file(encrypted, tmp_path / "out")
+
+    def test_decrypt_detects_reordered_chunks(self, encryptor, tmp_path, monkeypatch):
+        """Test: Vertauschte Chunks schlagen bei der Tag-Prüfung fehl"""
+        monkeypatch.setattr(Encryptor, "CHUNK_SIZE", 1024)
+        encrypted = tmp_path / "stream.enc"
+        with encryptor.open_encrypted_writer(encrypted) as writer:
+            writer.write(secrets.token_bytes(5000))
+
+        header, records = self._split_chunks(encrypted)
+        records[1], records[2] = records[2], records[1]
+        encrypted.write_bytes(header + b"".join(records) + b"\x00\x00\x00\x00")
+
+        with pytest.raises(InvalidTag):
+            encryptor.decrypt_file(encrypted, tmp_path / "out")
+
+    def test_decrypt_scrat002_format(self, encryptor, tmp_path):
+        """Test: SCRAT002-Dateien (ohne AAD) bleiben lesbar"""
+        chunks = [b"a" * 100, b"b" * 50]
+        base_nonce = secrets.token_bytes(Encryptor.NONCE_SIZE)
+        legacy = bytearray(b"SCRAT002" + (100).to_bytes(4, "big") + base_nonce)
+        for index, chunk in enumerate(chunks):
+            nonce = Encryptor._chunk_nonce(base_nonce, index)
+            ciphertext, _ = encryptor.encrypt_bytes(chunk, nonce=nonce)
+            legacy += len(ciphertext).to_bytes(4, "big") + ciphertext
+        legacy += b"\x00\x00\x00\x00"
+
+        encrypted = tmp_path / "legacy.enc"
+        encrypted.write_bytes(bytes(legacy))
+        decrypted = tmp_path / "legacy.out"
+        encryptor.decrypt_file(encrypted, decrypted)
+
+        assert decrypted.read_bytes() == b"".join(chunks)
+
+    @pytest.mark.parametrize("size", [0, 1024, 3000])
+    def test_encrypt_file_roundtrip_chunk_boundaries(self, encryptor, tmp_path, size):
+        """Test: Leere Dateien und volle Chunks werden korrekt als letzter Chunk markiert"""
+        data = secrets.token_bytes(size)
+        source = tmp_path / "source.bin"
+        source.write_bytes(data)
+
+        for name in ("file", "stream"):
+            encrypted = tmp_path / f"{name}.enc"
+            if name == "file":
+                encryptor.encrypt_file(source, encrypted)
+            else:
+                with encryptor.open_encrypted_writer(encrypted) as writer:
+                    writer.write(data)
+            decrypted = tmp_path / f"{name}.out"
+            encryptor.decrypt_file(encrypted, decrypted)
+            assert decrypted.read_bytes() == data
+
+    def test_encrypt_file_uses_small_chunks(self, encryptor, tmp_path):
+        """Test: Große Dateien werden in Chunks von höchstens 4 MB verschlüsselt"""
+        data = secrets.token_bytes(9 * 1024 * 1024)
+        source = tmp_path / "large.bin"
+        source.write_bytes(data)
+        encrypted = tmp_path / "large.enc"
+        encryptor.encrypt_file(source, encrypted)
+
+        header, records = self._split_chunks(encrypted)
+        assert int.from_bytes(header[8:12], "big") == 4 * 1024 * 1024
+        assert len(records) == 3
+
+        decrypted = tmp_path / "large.out"
+        encryptor.decrypt_file(encrypted, decrypted)
+        assert decrypted.read_bytes() == data
+
+    def test_encrypt_file_returns_base_nonce(self, encryptor, tmp_path):
+        """Test: Ohne übergebenen Nonce wird der Basis-Nonce aus dem Header zurückgegeben"""
+        source = tmp_path / "source.bin"
+        source.write_bytes(b"x" * (4 * 1024 * 1024 + 1))  # Chunked-Format
+        encrypted = tmp_path / "source.enc"
+
+        nonce = encryptor.encrypt_file(source, encrypted)
+
+        header, _ = self._split_chunks(encrypted)
+        assert nonce == header[12:]
+
+    def test_encrypt_small_file_single_block(self, encryptor, tmp_path):
+        """Test: Kleine Dateien werden als ein GCM-Block (SCRAT000) verschlüsselt"""
+        source = tmp_path / "small.txt"
+        source.write_bytes(b"kleine Datei")
+        encrypted = tmp_path / "small.enc"
+
+        nonce = encryptor.encrypt_file(source, encrypted)
+
+        raw = encrypted.read_bytes()
+        assert raw[:8] == b"SCRAT000"
+        assert raw[8:20] == nonce
+        assert len(raw) == 8 + Encryptor.NONCE_SIZE + len(b"kleine Datei") + 16
+
+        decrypted = tmp_path / "small.out"
+        encryptor.decrypt_file(encrypted, decrypted)
+        assert decrypted.read_bytes() == b"kleine Datei"
+
+        # Magic ist authentifiziert: ohne Magic (als Legacy-Format gelesen) schlägt es fehl
+        encrypted.write_bytes(raw[8:])
+        with pytest.raises(InvalidTag):
+            encryptor.decrypt_file(encrypted, decrypted)
+
+    def test_encrypt_file_ignores_fadvise_errors(self, encryptor, tmp_path, monkeypatch):
+        """Test: Abgelehnte Page-Cache-Hinweise brechen die Verschlüsselung nicht ab"""
+        import os
+
+        def failing_fadvise(*args):
+            raise OSError("nicht unterstützt")
+
+        monkeypatch.setattr(os, "posix_fadvise", failing_fadvise, raising=False)
+        source = tmp_path / "source.bin"
+        source.write_bytes(b"daten" * 100)
+
+        encrypted = tmp_path / "source.enc"
+        encryptor.encrypt_file(source, encrypted)
+        decrypted = tmp_path / "source.out"
+        encryptor.decrypt_file(encrypted, decrypted)
+
+        assert decrypted.read_bytes() == source.read_bytes()
+
+    def test_check_aes_throughput_warns_when_slow(self, monkeypatch, caplog):
+        """Test: Langsames AES-GCM auf x86_64 wird als Warnung geloggt"""
+        import logging
+
+        from core import encryptor as encryptor_module
+
+        ticks = iter([0.0, 1.0])  # 1 MB in 1 s gemessen
+        monkeypatch.setattr(encryptor_module.time, "perf_counter", lambda: next(ticks))
+        monkeypatch.setattr(encryptor_module.platform, "machine", lambda: "x86_64")
+
+        with caplog.at_level(logging.WARNING, logger=encryptor_module.logger.name):
+            mbps = encryptor_module.check_aes_throughput.__wrapped__(1024 * 1024)
+
+        assert mbps == pytest.approx(1.0)
+        assert "AES-NI" in caplog.text
+
+    def test_chunk_nonces_unique_per_file(self):
+        """Test: Abgeleitete Chunk-Nonces unterscheiden sich je Chunk"""
+        base = secrets.token_bytes(Encryptor.NONCE_SIZE)
+        nonces = {Encryptor._chunk_nonce(base, i) for i in range(1000)}
+
+        assert len(nonces) == 1000
+        assert Encryptor._chunk_nonce(base, 0) == base
+        assert all(len(nonce) == Encryptor.NONCE_SIZE for nonce in nonces)
+
+    def test_run_chunks_keeps_order(self):
+        """Test: Ergebnisse kommen unabhängig von der Laufzeit in Reihenfolge an"""
+        import time
+
+        def slow_first(value):
+            time.sleep(0.05 if value == 0 else 0)
+            return value
+
+        results = []
+        count = Encryptor._run_chunks(
+            slow_first, ((i,) for i in range(10)), lambda i, r: results.append((i, r)), 4
+        )
+
+        assert count == 10
+        assert results == [(i + 1, i) for i in range(10)]
+
+    def test_run_chunks_propagates_write_errors(self):
+        """Test: Fehler im Schreib-Thread werden an den Aufrufer weitergereicht"""
+
+        def failing_write(index, result):
+            if index == 3:
+                raise OSError("Datenträger voll")
+
+        with pytest.raises(OSError, match="Datenträger voll"):
+            Encryptor._run_chunks(lambda v: v, ((i,) for i in range(10)), failing_write, 4)
+
+    def test_encrypted_writer_rejects_rewrite_after_first_chunk(
+        self, encryptor, tmp_path, monkeypatch
+    ):
+        """Test: Überschreiben bereits verschlüsselter Chunks wird abgelehnt"""
+        import io
+
+        monkeypatch.setattr(Encryptor, "CHUNK_SIZE", 1024)
+        writer = encryptor.open_encrypted_writer(tmp_path / "stream.enc")
+        writer.write(b"x" * 4096)
+        writer.seek(2048)
+
+        with pytest.raises(io.UnsupportedOperation):
+            writer.write(b"y")
+        writer.close()
+
     def test_generate_password(self):
         """Test: Passwort-Generierung"""
         password = Encryptor.generate_password()
@@ -297,6 +778,11 @@ class TestEncryptor:
         assert is_valid is True
         assert "sicher" in msg.lower()
 
+    def test_validate_password_strength_non_ascii(self):
+        """Test: Umlaute zählen wie bisher als Groß-/Kleinbuchstaben"""
+        assert Encryptor.validate_password_strength("ÄÖÜäöü123456")[0] is True
+        assert Encryptor.validate_password_strength("äöüäöü123456")[0] is False
+
     def test_repr(self, encryptor):
         """Test: String-Repräsentation"""
         repr_str = repr(encryptor)
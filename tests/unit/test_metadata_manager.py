@@ -76,6 +76,45 @@ class TestMetadataManager:
         assert backup["status"] == "running"
         assert backup["destination_type"] == "usb"
 
+    def test_backup_record_stores_kdf(self, manager):
+        """Test: KDF-Kennung wird mit dem Salt gespeichert (Standard: NULL)"""
+        salt = b"s" * 32
+        scrypt_id = manager.create_backup_record(
+            backup_type="full",
+            destination_type="usb",
+            destination_path="/mnt/usb/backup",
+            encryption_key_hash="abcd1234",
+            salt=salt,
+            kdf="scrypt:n=32768,r=8,p=1",
+        )
+        legacy_id = manager.create_backup_record(
+            backup_type="full",
+            destination_type="usb",
+            destination_path="/mnt/usb/backup",
+            encryption_key_hash="abcd1234",
+            salt=salt,
+        )
+
+        assert manager.get_backup(scrypt_id)["kdf"] == "scrypt:n=32768,r=8,p=1"
+        assert manager.get_backup(legacy_id)["kdf"] is None
+
+    def test_migration_adds_kdf_column(self, db_path):
+        """Test: Bestehende Datenbank (Version 2) bekommt die kdf-Spalte"""
+        with MetadataManager(db_path) as mgr:
+            cursor = mgr.connection.cursor()
+            cursor.execute("ALTER TABLE backups DROP COLUMN kdf")
+            cursor.execute("DELETE FROM schema_info WHERE version = 3")
+            mgr.connection.commit()
+
+        with MetadataManager(db_path) as mgr:
+            cursor = mgr.connection.cursor()
+            cursor.execute("PRAGMA table_info(backups)")
+            columns = [row[1] for row in cursor.fetchall()]
+            cursor.execute("SELECT MAX(version) FROM schema_info")
+
+            assert "kdf" in columns
+            assert cursor.fetchone()[0] == MetadataManager.SCHEMA_VERSION
+
     def test_update_backup_progress(self, manager):
         """Test: Backup-Fortschritt aktualisieren"""
         backup_id = manager.create_backup_record(
@@ -110,6 +149,26 @@ class TestMetadataManager:
         assert backup["files_total"] == 100
         assert backup["completed_at"] is not None
 
+    def test_finalize_backup(self, manager):
+        """Test: Endwerte und Status in einem Schritt schreiben"""
+        backup_id = manager.create_backup_record(
+            backup_type="full",
+            destination_type="usb",
+            destination_path="/backup",
+            encryption_key_hash="hash",
+            salt=b"\x00" * 32,
+        )
+
+        manager.finalize_backup(backup_id, files_total=10, size_original=1000, size_compressed=400)
+
+        backup = manager.get_backup(backup_id)
+        assert backup["status"] == "completed"
+        assert backup["files_total"] == 10
+        assert backup["files_processed"] == 10
+        assert backup["size_original"] == 1000
+        assert backup["size_compressed"] == 400
+        assert backup["completed_at"] is not None
+
     def test_mark_backup_failed(self, manager):
         """Test: Backup als fehlgeschlagen markieren"""
         backup_id = manager.create_backup_record(
@@ -154,6 +213,76 @@ class TestMetadataManager:
         assert files[0]["source_path"] == "/home/user/test.txt"
         assert files[0]["file_size"] == 1024
 
+    def test_add_files_to_backup_bulk(self, manager):
+        """Test: Viele Dateien in einer Transaktion hinzufügen"""
+        backup_id = manager.create_backup_record(
+            backup_type="full",
+            destination_type="usb",
+            destination_path="/backup",
+            encryption_key_hash="hash",
+            salt=b"\x00" * 32,
+        )
+
+        now = datetime.now()
+        rows = [
+            ("/home/user", f"file_{i}.txt", i, now, "data.7z.enc", "/backup", False, None)
+            for i in range(50)
+        ]
+        rows.append(("/home/user/gone.txt", "gone.txt", 0, now, "", "", True, None))
+
+        inserted = manager.add_files_to_backup(backup_id, rows)
+
+        assert inserted == 51
+        files = manager.get_backup_files(backup_id)
+        assert len(files) == 51
+        deleted = [f for f in files if f["is_deleted"]]
+        assert [f["relative_path"] for f in deleted] == ["gone.txt"]
+
+    def test_cumulative_files_cache_matches_chain(self, manager):
+        """Test: Dateistand-Cache liefert denselben Stand wie die Ketten-Rekonstruktion"""
+        now = datetime.now()
+        full_id = manager.create_backup_record(
+            backup_type="full",
+            destination_type="usb",
+            destination_path="/backup",
+            encryption_key_hash="hash",
+            salt=b"\x00" * 32,
+        )
+        manager.add_files_to_backup(
+            full_id,
+            [
+                ("/src", "a.txt", 1, now, "data.7z.enc", "/backup", False, None),
+                ("/src", "b.txt", 2, now, "data.7z.enc", "/backup", False, None),
+            ],
+        )
+        manager.mark_backup_completed(full_id, files_total=2)
+
+        incr_id = manager.create_backup_record(
+            backup_type="incremental",
+            destination_type="usb",
+            destination_path="/backup",
+            encryption_key_hash="hash",
+            salt=b"\x00" * 32,
+            base_backup_id=full_id,
+        )
+        manager.add_files_to_backup(
+            incr_id,
+            [
+                ("/src", "b.txt", 3, now, "data.7z.enc", "/backup", False, None),
+                ("/src/a.txt", "a.txt", 0, now, "", "", True, None),
+                ("/src", "c.txt", 4, now, "data.7z.enc", "/backup", False, None),
+            ],
+        )
+        manager.mark_backup_completed(incr_id, files_total=2)
+
+        cached = manager.get_cumulative_backup_files(incr_id)
+        replayed = manager._replay_backup_chain(manager.connection.cursor(), incr_id)
+
+        assert sorted(f["id"] for f in cached) == sorted(f["id"] for f in replayed)
+        assert {f["relative_path"]: f["file_size"] for f in cached} == {"b.txt": 3, "c.txt": 4}
+        # Zeitstempel kommen bereits als datetime aus der Datenbank
+        assert all(f["modified_timestamp"] == now for f in cached + replayed)
+
     def test_get_all_backups(self, manager):
         """Test: Alle Backups abrufen"""
         # Erstelle mehrere Backups
@@ -196,6 +325,27 @@ class TestMetadataManager:
         assert len(running) == 1
         assert running[0]["id"] == backup2
 
+    def test_completed_backups_ordering(self, manager):
+        """Test: Neuestes und aufsteigend sortierte abgeschlossene Backups"""
+        assert manager.get_latest_completed_backup() is None
+
+        ids = []
+        for i in range(3):
+            backup_id = manager.create_backup_record(
+                backup_type="full",
+                destination_type="usb",
+                destination_path=f"/backup{i}",
+                encryption_key_hash=f"hash{i}",
+                salt=b"\x00" * 32,
+            )
+            ids.append(backup_id)
+        manager.mark_backup_completed(ids[0], files_total=1)
+        manager.mark_backup_completed(ids[1], files_total=1)
+        # ids[2] bleibt 'running'
+
+        assert manager.get_latest_completed_backup()["id"] == ids[1]
+        assert [b["id"] for b in manager.get_completed_backups()] == ids[:2]
+
     def test_search_files(self, manager):
         """Test: Dateien über alle Backups suchen"""
         backup_id = manager.create_backup_record(